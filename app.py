@@ -3,30 +3,60 @@ Application principale Flask pour la gestion de clinique médicale
 Point d'entrée de l'application backend
 """
 
-from flask import Flask
-from flask_cors import CORS
-from flask_session import Session
-import os
-from dotenv import load_dotenv
+import time
+_start = time.perf_counter()
 
-# Chargement des variables d'environnement
-load_dotenv()
+# Chargement unique des variables d'environnement (config/__init__.py)
+import config
 
-# Importation des routes
-from routes import auth_routes, admin_routes, medecin_routes, secretaire_routes, patient_routes, public_routes
+from flask import Flask, Response, request
+from flask_cors import CORS
+import os
+import importlib
 
 # Importation de la configuration de la base de données
 from config.database import init_db
+from config.session import init_session
+from config.logger import get_logger
+from middleware.query_monitor import init_query_monitor
+from middleware.metrics import init_metrics
+from middleware.profiler import init_profiler
+from middleware.request_log import init_request_log
+from middleware.json_response import init_json_response
+from middleware.compression import init_compression
+
+# Modules de routes et préfixes, importés dans create_app (temps mesuré)
+ROUTE_MODULES = [
+    ('routes.public_routes', '/api/public'),
+    ('routes.auth_routes', '/api/auth'),
+    ('routes.admin_routes', '/api/admin'),
+    ('routes.medecin_routes', '/api/medecin'),
+    ('routes.secretaire_routes', '/api/secretaire'),
+    ('routes.patient_routes', '/api/patient')
+]
+
+logger = get_logger(__name__)
+
+# Temps d'import du module app (flask, pymongo, config)
+_IMPORT_TIME = time.perf_counter() - _start
 
 def create_app():
     """
     Factory function pour créer et configurer l'application Flask
     """
+    timings = {'import app': _IMPORT_TIME}
+    step_start = time.perf_counter()
+    
     app = Flask(__name__)
     
+    # Encodeur JSON rapide (orjson si installé) pour jsonify
+    init_json_response(app)
+    
+    # Compression gzip/brotli (enregistrée en premier: s'applique en dernier)
+    init_compression(app)
+    
     # Configuration de l'application
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-    app.config['SESSION_TYPE'] = 'filesystem'
     app.config['SESSION_COOKIE_SECURE'] = os.getenv('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     app.config['SESSION_COOKIE_HTTPONLY'] = os.getenv('SESSION_COOKIE_HTTPONLY', 'True').lower() == 'true'
     app.config['SESSION_COOKIE_SAMESITE'] = os.getenv('SESSION_COOKIE_SAMESITE', 'Lax')
@@ -50,19 +80,37 @@ def create_app():
          methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     )
     
-    # Initialisation de la session
-    Session(app)
+    # Instrumentation MongoDB par requête (Server-Timing, détection N+1)
+    init_query_monitor(app)
+    
+    # Métriques Prometheus (latences, statuts, MongoDB, pool)
+    init_metrics(app)
+    
+    # Profilage à la demande (déclenché par l'admin)
+    init_profiler(app)
+    
+    # Journal structuré des requêtes lentes
+    init_request_log(app)
+    
+    timings['flask + cors'] = time.perf_counter() - step_start
+    
+    # Initialisation de la session (stockage partagé MongoDB/Redis)
+    step_start = time.perf_counter()
+    init_session(app)
+    timings['init_session'] = time.perf_counter() - step_start
     
     # Initialisation de la base de données MongoDB
+    step_start = time.perf_counter()
     init_db()
+    timings['init_db'] = time.perf_counter() - step_start
     
-    # Enregistrement des routes
-    app.register_blueprint(public_routes.bp, url_prefix='/api/public')
-    app.register_blueprint(auth_routes.bp, url_prefix='/api/auth')
-    app.register_blueprint(admin_routes.bp, url_prefix='/api/admin')
-    app.register_blueprint(medecin_routes.bp, url_prefix='/api/medecin')
-    app.register_blueprint(secretaire_routes.bp, url_prefix='/api/secretaire')
-    app.register_blueprint(patient_routes.bp, url_prefix='/api/patient')
+    # Enregistrement des routes (les services lourds - PDF, SMTP, bcrypt -
+    # ne sont importés qu'à leur première utilisation)
+    for module_name, url_prefix in ROUTE_MODULES:
+        step_start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        app.register_blueprint(module.bp, url_prefix=url_prefix)
+        timings[module_name] = time.perf_counter() - step_start
     
     # Route de health check pour Render
     @app.route('/health')
@@ -75,6 +123,34 @@ def create_app():
             'environment': os.getenv('FLASK_ENV', 'development')
         }, 200
     
+    # Sondes Kubernetes/load balancer: liveness (processus) et readiness (dépendances)
+    @app.route('/health/live')
+    @app.route('/api/health/live')
+    def liveness_probe():
+        """Le processus répond"""
+        from services.health_service import HealthService
+        return HealthService.liveness(), 200
+    
+    @app.route('/health/ready')
+    @app.route('/api/health/ready')
+    def readiness_probe():
+        """MongoDB, pool et envois en cours dans les seuils (503 sinon)"""
+        from services.health_service import HealthService
+        ready, detail = HealthService.readiness()
+        return detail, 200 if ready else 503
+    
+    # Métriques au format Prometheus (agrégées sur tous les workers)
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Métriques Prometheus, protégées par METRICS_TOKEN si défini"""
+        from services.metrics_service import metrics
+        
+        token = os.getenv('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return {'error': 'Non autorisé'}, 401
+        
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+    
     # Route racine
     @app.route('/')
     def index():
@@ -85,8 +161,28 @@ def create_app():
             'status': 'running'
         }, 200
     
+    # Rapport des temps de démarrage
+    app.config['STARTUP_TIMINGS'] = timings
+    if os.getenv('STARTUP_TIMING_REPORT', 'False').lower() == 'true':
+        print_startup_report(timings)
+    
     return app
 
+def print_startup_report(timings):
+    """
+    Affiche le détail des temps de démarrage (en millisecondes)
+    
+    Args:
+        timings: Dictionnaire étape -> durée en secondes
+    """
+    logger.info("Temps de démarrage", extra={'fields': {
+        'timings_ms': {
+            step: round(duration * 1000, 1)
+            for step, duration in sorted(timings.items(), key=lambda item: -item[1])
+        },
+        'total_ms': round(sum(timings.values()) * 1000, 1)
+    }})
+
 if __name__ == '__main__':
     app = create_app()
     app.run(debug=os.getenv('FLASK_DEBUG', 'True').lower() == 'true', port=5000)
@@ -0,0 +1,8 @@
+"""
+ASGI entry point (uvicorn asgi:application --workers N)
+"""
+from app import create_app
+from middleware.asgi_bridge import WSGIBridge
+
+app = create_app()
+application = WSGIBridge(app)
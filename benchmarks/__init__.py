@@ -0,0 +1,13 @@
+# Module de benchmarks (charge et régressions de performance)
+
+import os
+
+def configure_environment():
+    """
+    Configuration de benchmark, à appliquer avant tout import de l'application
+    """
+    os.environ.setdefault('MONGODB_DB_NAME', 'clinique_bench')
+    os.environ.setdefault('BCRYPT_ROUNDS', '4')
+    os.environ.setdefault('SESSION_BACKEND', 'mongodb')
+    # Tous les utilisateurs virtuels se connectent depuis la même adresse
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'False')
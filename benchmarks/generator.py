@@ -0,0 +1,432 @@
+"""
+Générateur de données synthétiques à grande échelle (10k, 100k, 1M patients)
+
+Exécuter depuis la racine du backend:
+    python -m benchmarks.generator --patients 100k [--seed 42] [--workers 4]
+        [--batch 1000] [--drop]
+
+Les documents sont construits par les modèles (to_document) pour respecter le
+format stocké par l'application, puis insérés par lots (insert_many) dans des
+processus parallèles. Le résultat ne dépend que de la graine et de la date de
+référence: chaque patient a son propre générateur aléatoire et des
+identifiants ObjectId déterministes, quel que soit le découpage en lots
+"""
+
+import calendar
+import os
+import random
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+BENCH_PASSWORD = 'Bench123!'
+
+SPECIALITES = [
+    "Médecine générale", "Cardiologie", "Dermatologie", "Pédiatrie",
+    "Gynécologie", "Ophtalmologie", "Neurologie", "Radiologie"
+]
+
+VILLES = ["Tunis", "Sousse", "Sfax", "Paris", "Lyon", "Marseille"]
+
+HORAIRES = {jour: "08:00-18:00" for jour in ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi']}
+
+# Code de collection dans les ObjectId générés (1 octet)
+KINDS = {
+    'users': 1, 'patients': 2, 'medecins': 3, 'rendezvous': 4,
+    'dossiers_medicaux': 5, 'ordonnances': 6, 'documents_medicaux': 7, 'notifications': 8
+}
+
+# Nombre maximal de documents d'un même type par patient (espace d'identifiants)
+PER_PATIENT = 64
+# Début de l'espace d'identifiants des patients (le personnel est en dessous)
+PATIENT_ID_SPACE = 1 << 40
+
+# Proportions réalistes d'une clinique
+PATIENTS_PER_MEDECIN = 400
+PATIENTS_PER_SECRETAIRE = 2500
+ACCOUNT_RATIO = 0.85          # patients ayant un compte en ligne
+MEDECIN_TRAITANT_RATIO = 0.7  # rendez-vous avec le médecin habituel
+ORDONNANCE_RATIO = 0.7        # consultations donnant lieu à une ordonnance
+DOCUMENT_RATIO = 0.3          # consultations avec un document joint
+
+def _oid(kind, index, epoch):
+    """
+    ObjectId déterministe: horodatage de référence, type de document, index
+    """
+    return ObjectId(struct.pack('>IB', epoch, KINDS[kind]) + index.to_bytes(7, 'big'))
+
+def parse_count(value):
+    """
+    Convertit '10k', '100k', '1m' ou '2500' en entier
+    """
+    value = str(value).strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+def _password_hash(seed):
+    """
+    Hachage bcrypt unique partagé par tous les comptes générés
+    
+    Le sel est dérivé de la graine pour que le jeu de données soit reproductible
+    """
+    import bcrypt
+    
+    rng = random.Random(f"{seed}:password")
+    alphabet = './ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+    rounds = int(os.getenv('BCRYPT_ROUNDS', 12))
+    # 21 caractères libres + un dernier limité aux valeurs dont les bits de poids faible sont nuls
+    salt = ''.join(rng.choice(alphabet) for _ in range(21)) + rng.choice('.Oeu')
+    return bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'), f"$2b${rounds:02d}${salt}".encode('ascii'))
+
+def dataset_shape(patients):
+    """
+    Nombre de médecins et de secrétaires pour une clinique de cette taille
+    """
+    return {
+        'medecins': max(5, patients // PATIENTS_PER_MEDECIN),
+        'secretaires': max(2, patients // PATIENTS_PER_SECRETAIRE)
+    }
+
+def _staff_documents(shape, password_hash, epoch, reference):
+    """
+    Comptes médecins et secrétaires (peu nombreux, générés dans le processus principal)
+    """
+    from models.user import User
+    from models.medecin import Medecin
+    
+    docs = {'users': [], 'medecins': []}
+    accounts = {'medecins': [], 'secretaires': []}
+    
+    for i in range(shape['medecins']):
+        user = User(
+            email=f"bench.medecin{i + 1}@clinique.com",
+            password=None,
+            role='medecin',
+            nom=f"Medecin{i + 1}",
+            prenom="Bench",
+            _id=_oid('users', i, epoch)
+        )
+        user.password_hash = password_hash
+        user.created_at = user.updated_at = reference
+        docs['users'].append(user.to_document())
+        
+        medecin = Medecin(
+            user_id=user._id,
+            specialite=SPECIALITES[i % len(SPECIALITES)],
+            numero_ordre=f"ORD{100000 + i}",
+            horaires_travail=HORAIRES,
+            _id=_oid('medecins', i, epoch)
+        )
+        medecin.created_at = medecin.updated_at = reference
+        docs['medecins'].append(medecin.to_document())
+        accounts['medecins'].append({'email': user.email, 'user_id': str(user._id)})
+    
+    for i in range(shape['secretaires']):
+        user = User(
+            email=f"bench.secretaire{i + 1}@clinique.com",
+            password=None,
+            role='secretaire',
+            nom=f"Secretaire{i + 1}",
+            prenom="Bench",
+            _id=_oid('users', shape['medecins'] + i, epoch)
+        )
+        user.password_hash = password_hash
+        user.created_at = user.updated_at = reference
+        docs['users'].append(user.to_document())
+        accounts['secretaires'].append({'email': user.email, 'user_id': str(user._id)})
+    
+    return docs, accounts
+
+def _patient_documents(index, medecin_ids, password_hash, seed, epoch, reference, document_size):
+    """
+    Documents d'un patient et de son historique
+    
+    Returns:
+        Tuple (documents par collection, compte ou None)
+    """
+    from models.user import User
+    from models.patient import Patient
+    from models.rendezvous import RendezVous
+    from models.dossier_medical import DossierMedical
+    from models.ordonnance import Ordonnance
+    from models.document_medical import DocumentMedical
+    from models.notification import Notification
+    
+    rng = random.Random(f"{seed}:{index}")
+    docs = {kind: [] for kind in KINDS}
+    base = PATIENT_ID_SPACE + index * PER_PATIENT
+    counters = dict.fromkeys(KINDS, 0)
+    
+    def next_id(kind):
+        counters[kind] += 1
+        return _oid(kind, base + counters[kind], epoch)
+    
+    # Compte utilisateur
+    user_id = None
+    email = f"bench.patient{index + 1}@email.com"
+    created = reference - timedelta(days=rng.randint(30, 3650))
+    if rng.random() < ACCOUNT_RATIO:
+        user = User(
+            email=email,
+            password=None,
+            role='patient',
+            nom=f"Patient{index + 1}",
+            prenom="Bench",
+            _id=next_id('users')
+        )
+        user.password_hash = password_hash
+        user.created_at = user.updated_at = created
+        docs['users'].append(user.to_document())
+        user_id = user._id
+    
+    patient = Patient(
+        nom=f"Patient{index + 1}",
+        prenom="Bench",
+        email=email,
+        telephone=f"+216 {rng.randint(20000000, 99999999)}",
+        date_naissance=f"{rng.randint(1935, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        adresse=f"{rng.randint(1, 200)} Rue de la Santé",
+        ville=rng.choice(VILLES),
+        code_postal=f"{rng.randint(1000, 9999)}",
+        sexe=rng.choice(['M', 'F']),
+        user_id=user_id,
+        _id=next_id('patients')
+    )
+    patient.created_at = patient.updated_at = created
+    docs['patients'].append(patient.to_document())
+    
+    medecin_traitant = rng.choice(medecin_ids)
+    for _ in range(rng.randint(1, 10)):
+        medecin_id = medecin_traitant if rng.random() < MEDECIN_TRAITANT_RATIO else rng.choice(medecin_ids)
+        date = reference + timedelta(days=rng.randint(-365, 30))
+        if date < reference:
+            statut = RendezVous.STATUT_TERMINE if rng.random() < 0.9 else RendezVous.STATUT_ANNULE
+        else:
+            statut = rng.choice([RendezVous.STATUT_DEMANDE, RendezVous.STATUT_CONFIRME])
+        
+        rdv = RendezVous(
+            patient_id=patient._id,
+            medecin_id=medecin_id,
+            date_rdv=date,
+            heure_rdv=f"{rng.randint(8, 17):02d}:{rng.choice([0, 30]):02d}",
+            motif=rng.choice(["Consultation", "Suivi médical", "Contrôle de routine", "Renouvellement"]),
+            statut=statut,
+            _id=next_id('rendezvous')
+        )
+        rdv.created_at = rdv.updated_at = date - timedelta(days=rng.randint(1, 20))
+        docs['rendezvous'].append(rdv.to_document())
+        
+        if statut != RendezVous.STATUT_TERMINE:
+            continue
+        
+        # Consultation effectuée: dossier, ordonnance et documents éventuels
+        dossier = DossierMedical(
+            patient_id=patient._id,
+            medecin_id=medecin_id,
+            date_consultation=date,
+            observations="Observation de suivi",
+            diagnostic=rng.choice(["RAS", "Hypertension", "Grippe", "Diabète type 2", "Allergie"]),
+            poids=rng.randint(40, 110),
+            taille=rng.randint(150, 195),
+            tension_arterielle=f"{rng.randint(10, 15)}/{rng.randint(6, 9)}",
+            temperature=round(rng.uniform(36.2, 38.5), 1),
+            _id=next_id('dossiers_medicaux')
+        )
+        dossier.created_at = dossier.updated_at = date
+        docs['dossiers_medicaux'].append(dossier.to_document())
+        
+        if rng.random() < ORDONNANCE_RATIO:
+            ordonnance = Ordonnance(
+                patient_id=patient._id,
+                medecin_id=medecin_id,
+                date_ordonnance=date,
+                traitements=[{'medicament': 'Paracétamol', 'posologie': '1g x3/jour', 'duree': '5 jours'}],
+                _id=next_id('ordonnances')
+            )
+            ordonnance.created_at = ordonnance.updated_at = date
+            docs['ordonnances'].append(ordonnance.to_document())
+        
+        if rng.random() < DOCUMENT_RATIO:
+            document = DocumentMedical(
+                patient_id=patient._id,
+                dossier_id=dossier._id,
+                type_document=rng.choice([DocumentMedical.TYPE_ANALYSE, DocumentMedical.TYPE_RADIO, DocumentMedical.TYPE_ECHO]),
+                nom_fichier=f"examen_{counters['documents_medicaux'] + 1}.pdf",
+                file_data='A' * document_size,
+                file_type='application/pdf',
+                file_size=document_size * 3 // 4,
+                date_examen=date,
+                medecin_id=medecin_id,
+                _id=next_id('documents_medicaux')
+            )
+            document.created_at = document.updated_at = date
+            docs['documents_medicaux'].append(document.to_document())
+        
+        if user_id:
+            notification = Notification(
+                user_id=user_id,
+                type_notification=Notification.TYPE_DOSSIER_CREE,
+                titre="Compte rendu disponible",
+                message="Le compte rendu de votre consultation est disponible",
+                is_read=rng.random() < 0.6,
+                _id=next_id('notifications')
+            )
+            notification.created_at = notification.updated_at = date
+            docs['notifications'].append(notification.to_document())
+    
+    account = None
+    if user_id:
+        account = {'email': email, 'user_id': str(user_id), 'patient_id': str(patient._id)}
+    return docs, account
+
+def _insert(db, docs):
+    """
+    Insère les documents par collection (insert_many non ordonné)
+    
+    Returns:
+        Nombre de documents insérés par collection
+    """
+    counts = {}
+    for collection, documents in docs.items():
+        if documents:
+            db[collection].insert_many(documents, ordered=False)
+        counts[collection] = len(documents)
+    return counts
+
+def _generate_chunk(task):
+    """
+    Génère et insère un lot de patients (exécuté dans un processus du pool)
+    """
+    start, end, medecin_ids, password_hash, seed, epoch, reference, document_size, sample = task
+    from config.database import get_db
+    
+    docs = {kind: [] for kind in KINDS}
+    accounts = []
+    for index in range(start, end):
+        patient_docs, account = _patient_documents(
+            index, medecin_ids, password_hash, seed, epoch, reference, document_size
+        )
+        for kind, documents in patient_docs.items():
+            docs[kind].extend(documents)
+        if account and index < sample:
+            accounts.append(account)
+    
+    return _insert(get_db(), docs), accounts
+
+def generate(patients, seed=42, workers=1, batch=1000, reference=None, document_size=1024, sample=1000):
+    """
+    Génère une clinique complète et l'insère dans la base courante
+    
+    Args:
+        patients: Nombre de patients
+        seed: Graine aléatoire
+        workers: Nombre de processus d'insertion (1 = dans le processus courant)
+        batch: Nombre de patients par lot
+        reference: Date de référence (par défaut aujourd'hui à minuit, UTC)
+        document_size: Taille des fichiers base64 des documents médicaux
+        sample: Nombre maximal de comptes patients retournés
+    
+    Returns:
+        Dictionnaire des comptes (médecins, secrétaires, échantillon de patients)
+        et du nombre de documents par collection
+    """
+    from config.database import get_db
+    
+    reference = reference or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    epoch = calendar.timegm(reference.timetuple())
+    shape = dataset_shape(patients)
+    
+    password_hash = _password_hash(seed)
+    
+    staff_docs, dataset = _staff_documents(shape, password_hash, epoch, reference)
+    counts = _insert(get_db(), staff_docs)
+    medecin_ids = [ObjectId(m['user_id']) for m in dataset['medecins']]
+    
+    tasks = [
+        (start, min(start + batch, patients), medecin_ids, password_hash, seed, epoch, reference, document_size, sample)
+        for start in range(0, patients, batch)
+    ]
+    
+    dataset['patients'] = []
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_generate_chunk, tasks))
+    else:
+        results = [_generate_chunk(task) for task in tasks]
+    
+    for chunk_counts, accounts in results:
+        for collection, count in chunk_counts.items():
+            counts[collection] = counts.get(collection, 0) + count
+        dataset['patients'].extend(accounts)
+    
+    # Données dérivées des dossiers et des médecins (insérés sans passer par save)
+    from models.medecin_patient import MedecinPatient
+    from models.specialite import Specialite
+    counts['medecin_patients'] = MedecinPatient.rebuild(get_db())
+    counts['specialites'] = len(Specialite.recount(get_db()))
+    
+    dataset['counts'] = counts
+    return dataset
+
+def parse_args(argv=None):
+    """
+    Options de ligne de commande (valeurs numériques validées)
+    """
+    import argparse
+    
+    def count(value):
+        try:
+            return parse_count(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"nombre de patients invalide: {value}")
+    
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.generator',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--patients', type=count, default='10k', help="nombre de patients (ex: 10k, 100k, 1m)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="processus d'insertion")
+    parser.add_argument('--batch', type=int, default=1000, help="patients par lot")
+    parser.add_argument('--drop', action='store_true', help="vider la base de benchmark avant génération")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    patients = args.patients
+    seed = args.seed
+    workers = args.workers
+    batch = args.batch
+    
+    from config.database import get_client, get_db, MONGODB_DB_NAME
+    from config.migrations import migrate
+    
+    if args.drop:
+        # Garde-fou: ne jamais vider une base qui n'est pas dédiée au benchmark
+        if not MONGODB_DB_NAME.endswith('_bench'):
+            print(f"❌ La base {MONGODB_DB_NAME} n'est pas une base de benchmark (suffixe _bench requis)")
+            sys.exit(1)
+        get_client().drop_database(MONGODB_DB_NAME)
+    migrate(get_db())
+    
+    print(f"🚀 Génération de {patients} patients (graine {seed}, {workers} processus, lots de {batch})...")
+    start = time.perf_counter()
+    dataset = generate(patients, seed=seed, workers=workers, batch=batch)
+    elapsed = time.perf_counter() - start
+    
+    total = sum(dataset['counts'].values())
+    for collection, count in sorted(dataset['counts'].items()):
+        print(f"   {collection:<22} {count:>10}")
+    print(f"✅ {total} documents en {elapsed:.1f} s ({total / elapsed:.0f} documents/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""
+Outils de mesure pour les benchmarks de l'API
+Client instrumenté, compteur de requêtes MongoDB et statistiques de latence
+"""
+
+import contextvars
+import threading
+import time
+
+# Endpoint en cours d'exécution (attribution des requêtes Mongo, propagée
+# aux tâches lancées dans un pool avec contextvars.copy_context())
+_current = contextvars.ContextVar('bench_scope', default=None)
+
+def use_mongomock():
+    """
+    Remplace MongoClient par mongomock (base en mémoire, sans serveur)
+    
+    A appeler avant la création de l'application
+    """
+    import mongomock
+    import config.database as database
+    database.MongoClient = mongomock.MongoClient
+    database.close_client()
+    _instrument_mongomock()
+
+MONGOMOCK_OPERATIONS = [
+    'find', 'find_one', 'count_documents', 'aggregate', 'distinct',
+    'insert_one', 'insert_many', 'update_one', 'update_many',
+    'replace_one', 'delete_one', 'delete_many', 'find_one_and_update',
+    'bulk_write'
+]
+
+def _instrument_mongomock():
+    """
+    Compte les opérations mongomock (pas de CommandListener disponible)
+    """
+    from mongomock.collection import Collection
+    if getattr(Collection, '_bench_instrumented', False):
+        return
+    
+    def wrap(name, method):
+        def wrapper(self, *args, **kwargs):
+            record_query(self.name, name)
+            return method(self, *args, **kwargs)
+        return wrapper
+    
+    for name in MONGOMOCK_OPERATIONS:
+        if hasattr(Collection, name):
+            setattr(Collection, name, wrap(name, getattr(Collection, name)))
+    Collection._bench_instrumented = True
+
+def install_command_listener():
+    """
+    Enregistre un CommandListener pymongo (serveur mongod réel)
+    
+    A appeler avant la création du client MongoDB
+    """
+    from pymongo import monitoring
+    
+    class BenchCommandListener(monitoring.CommandListener):
+        def started(self, event):
+            collection = event.command.get(event.command_name)
+            record_query(collection if isinstance(collection, str) else None, event.command_name)
+        
+        def succeeded(self, event):
+            pass
+        
+        def failed(self, event):
+            pass
+    
+    monitoring.register(BenchCommandListener())
+
+def record_query(collection, operation):
+    """
+    Attribue une requête MongoDB à l'endpoint en cours
+    """
+    stats = _current.get()
+    if stats is not None:
+        stats.add()
+
+class EndpointStats:
+    """
+    Mesures accumulées pour un endpoint
+    """
+    
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.queries = 0
+        self._lock = threading.Lock()
+    
+    def add(self, latency, ok, queries):
+        with self._lock:
+            self.latencies.append(latency)
+            self.queries += queries
+            if not ok:
+                self.errors += 1
+    
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+    
+    def summary(self, duration):
+        count = len(self.latencies)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'p50_ms': round(self.percentile(50) * 1000, 2),
+            'p95_ms': round(self.percentile(95) * 1000, 2),
+            'p99_ms': round(self.percentile(99) * 1000, 2),
+            'throughput_rps': round(count / duration, 1) if duration else 0.0,
+            'queries_per_request': round(self.queries / count, 2) if count else 0.0
+        }
+
+class _QueryScope:
+    """
+    Compteur de requêtes pour une requête HTTP (thread courant)
+    """
+    
+    def __init__(self):
+        self.queries = 0
+        self._lock = threading.Lock()
+    
+    def add(self):
+        with self._lock:
+            self.queries += 1
+
+class BenchClient:
+    """
+    Client de test Flask qui mesure chaque appel et l'attribue à un endpoint
+    """
+    
+    def __init__(self, app, results):
+        self.client = app.test_client()
+        self.results = results
+    
+    def request(self, method, url, name, **kwargs):
+        """
+        Exécute une requête et enregistre sa latence
+        
+        Args:
+            method: Méthode HTTP
+            url: URL appelée
+            name: Nom de l'endpoint dans le rapport
+        """
+        scope = _QueryScope()
+        _current.set(scope)
+        start = time.perf_counter()
+        try:
+            response = self.client.open(url, method=method, **kwargs)
+            # Corps lu dans la mesure: les réponses diffusées (stream_json)
+            # interrogent MongoDB pendant la lecture
+            response.get_data()
+        finally:
+            latency = time.perf_counter() - start
+            _current.set(None)
+        
+        self.results.record(name, latency, response.status_code < 400, scope.queries)
+        return response
+    
+    def get(self, url, name, **kwargs):
+        return self.request('GET', url, name, **kwargs)
+    
+    def post(self, url, name, **kwargs):
+        return self.request('POST', url, name, **kwargs)
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_loop():
+    """
+    Boucle d'événements partagée par les clients ASGI (thread dédié, comme un worker uvicorn)
+    """
+    global _loop
+    import asyncio
+    
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='bench-asgi', daemon=True).start()
+        return _loop
+
+class ASGIBenchClient(BenchClient):
+    """
+    Client qui passe par la passerelle ASGI (asgi.py) au lieu de l'interface WSGI
+    
+    Les requêtes des utilisateurs virtuels sont traitées par une seule boucle
+    d'événements et le pool de threads de la passerelle, comme dans un worker uvicorn
+    """
+    
+    def __init__(self, app, results):
+        from middleware.asgi_bridge import WSGIBridge
+        # Une passerelle (et un pool) par application, partagée par les clients
+        self.application = app.extensions.setdefault('bench_asgi', WSGIBridge(app))
+        self.results = results
+        self.cookies = {}
+        self.client = self
+    
+    def open(self, url, method='GET', **kwargs):
+        """
+        Exécute une requête ASGI (mêmes arguments que le client de test Flask)
+        """
+        import asyncio
+        from http.cookies import SimpleCookie
+        from werkzeug.test import EnvironBuilder
+        from werkzeug.wrappers import Response
+        
+        builder = EnvironBuilder(path=url, method=method, **kwargs)
+        environ = builder.get_environ()
+        body = environ['wsgi.input'].read()
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in builder.headers.items()]
+        if self.cookies:
+            cookie = '; '.join(f"{name}={value}" for name, value in self.cookies.items())
+            headers.append((b'cookie', cookie.encode('latin-1')))
+        
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': environ['PATH_INFO'],
+            'raw_path': environ['PATH_INFO'].encode('latin-1'),
+            'query_string': environ['QUERY_STRING'].encode('latin-1'),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 50000),
+            'server': ('localhost', 80)
+        }
+        
+        async def call():
+            messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+            response = {'body': []}
+            
+            async def receive():
+                if messages:
+                    return messages.pop()
+                return {'type': 'http.disconnect'}
+            
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    response['status'] = message['status']
+                    response['headers'] = [
+                        (name.decode('latin-1'), value.decode('latin-1'))
+                        for name, value in message['headers']
+                    ]
+                else:
+                    response['body'].append(message.get('body', b''))
+            
+            await self.application(scope, receive, send)
+            return response
+        
+        result = asyncio.run_coroutine_threadsafe(call(), _get_loop()).result()
+        
+        for name, value in result['headers']:
+            if name.lower() == 'set-cookie':
+                for morsel in SimpleCookie(value).values():
+                    if morsel['max-age'] == '0' or not morsel.value:
+                        self.cookies.pop(morsel.key, None)
+                    else:
+                        self.cookies[morsel.key] = morsel.value
+        
+        return Response(b''.join(result['body']), status=result['status'], headers=result['headers'])
+
+class BenchResults:
+    """
+    Résultats d'un scénario, regroupés par endpoint
+    """
+    
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished = None
+    
+    def record(self, name, latency, ok, queries):
+        stats = self.endpoints.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.endpoints.setdefault(name, EndpointStats(name))
+        stats.add(latency, ok, queries)
+    
+    def finish(self):
+        self.finished = time.perf_counter()
+    
+    def summary(self):
+        duration = (self.finished or time.perf_counter()) - self.started
+        return {name: stats.summary(duration) for name, stats in sorted(self.endpoints.items())}
@@ -0,0 +1,249 @@
+"""
+Benchmark de charge de l'API (latences p50/p95/p99, débit, requêtes MongoDB)
+
+Exécuter depuis la racine du backend:
+    python -m benchmarks.run [--mongomock] [--scenario rush_rendezvous,medecin]
+        [--users 10] [--iterations 20] [--patients 1000] [--workers 4]
+        [--save resultats.json] [--baseline resultats.json] [--tolerance 0.2]
+        [--mode wsgi|asgi|both]
+
+--mode asgi fait passer les requêtes par la passerelle ASGI (asgi.py):
+une boucle d'événements et le pool ASGI_THREADS, comme un worker uvicorn.
+--mode both exécute chaque scénario dans les deux modes (comparaison côte à côte)
+
+Sans --mongomock, utilise MONGODB_URI (mongod local) avec la base
+MONGODB_DB_NAME (par défaut clinique_bench), vidée avant chaque exécution
+"""
+
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+def prepare_database(use_mock):
+    """
+    Sélectionne le stockage MongoDB, vide la base de benchmark et applique les migrations
+    """
+    from benchmarks import harness
+    
+    if use_mock:
+        harness.use_mongomock()
+    else:
+        harness.install_command_listener()
+    
+    from config.database import get_client, get_db, MONGODB_DB_NAME
+    from config.migrations import migrate
+    
+    # Garde-fou: ne jamais vider une base qui n'est pas dédiée au benchmark
+    if not use_mock and not MONGODB_DB_NAME.endswith('_bench'):
+        print(f"❌ La base {MONGODB_DB_NAME} n'est pas une base de benchmark (suffixe _bench requis)")
+        sys.exit(1)
+    
+    get_client().drop_database(MONGODB_DB_NAME)
+    migrate(get_db())
+
+def login(app, results, email, mode='wsgi'):
+    """
+    Crée un utilisateur virtuel connecté
+    """
+    from benchmarks.harness import BenchClient, ASGIBenchClient
+    from benchmarks.generator import BENCH_PASSWORD
+    
+    client = (ASGIBenchClient if mode == 'asgi' else BenchClient)(app, results)
+    for _ in range(10):
+        response = client.post('/api/auth/login', 'POST /auth/login', json={
+            'email': email,
+            'password': BENCH_PASSWORD
+        })
+        # File bcrypt pleine (connexions simultanées): réessai après Retry-After
+        if response.status_code != 503:
+            break
+        time.sleep(float(response.headers.get('Retry-After', 1)))
+    if response.status_code != 200:
+        raise RuntimeError(f"Connexion impossible pour {email}: {response.status_code}")
+    return client
+
+def run_scenario(app, dataset, name, users, iterations, seed, mode='wsgi'):
+    """
+    Exécute un scénario avec `users` utilisateurs virtuels concurrents
+    (interface WSGI ou passerelle ASGI selon `mode`)
+    
+    Returns:
+        Résumé par endpoint
+    """
+    from benchmarks.harness import BenchResults
+    from benchmarks.scenarios import SCENARIOS
+    
+    role, scenario = SCENARIOS[name]
+    accounts = dataset[role]
+    results = BenchResults()
+    
+    def virtual_user(index):
+        rng = random.Random(seed + index)
+        client = login(app, results, accounts[index % len(accounts)]['email'], mode)
+        for _ in range(iterations):
+            scenario(client, dataset, rng)
+    
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        # list() propage les exceptions des utilisateurs virtuels
+        list(executor.map(virtual_user, range(users)))
+    
+    results.finish()
+    return results.summary()
+
+def compare(report, baseline, tolerance, min_delta_ms=2.0):
+    """
+    Compare un rapport à une référence
+    
+    Une régression est signalée si le p95 dépasse la référence de plus de
+    `tolerance` (et d'au moins min_delta_ms), ou si le nombre de requêtes
+    MongoDB par appel augmente
+    
+    Returns:
+        Liste des régressions (messages)
+    """
+    regressions = []
+    for scenario, endpoints in report['scenarios'].items():
+        for endpoint, current in endpoints.items():
+            reference = baseline.get('scenarios', {}).get(scenario, {}).get(endpoint)
+            if not reference:
+                continue
+            
+            limit = reference['p95_ms'] * (1 + tolerance)
+            if current['p95_ms'] > limit and current['p95_ms'] - reference['p95_ms'] >= min_delta_ms:
+                regressions.append(
+                    f"{scenario} {endpoint}: p95 {current['p95_ms']} ms > {reference['p95_ms']} ms (+{int(tolerance * 100)}%)"
+                )
+            if current['queries_per_request'] > reference['queries_per_request'] + 0.01:
+                regressions.append(
+                    f"{scenario} {endpoint}: {current['queries_per_request']} requêtes MongoDB/appel > {reference['queries_per_request']}"
+                )
+    return regressions
+
+def print_report(report):
+    for scenario, endpoints in report['scenarios'].items():
+        print(f"\n📊 {scenario}")
+        print(f"   {'endpoint':<42} {'req':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'mongo':>6}")
+        for endpoint, s in endpoints.items():
+            print(
+                f"   {endpoint:<42} {s['requests']:>6} {s['errors']:>4} "
+                f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} "
+                f"{s['throughput_rps']:>8.1f} {s['queries_per_request']:>6.1f}"
+            )
+
+def parse_args(argv=None):
+    """
+    Options de ligne de commande (valeurs numériques et modes validés)
+    """
+    import argparse
+    from benchmarks.generator import parse_count
+    from benchmarks.scenarios import SCENARIOS
+    
+    def scenarios(value):
+        names = list(SCENARIOS) if value == 'all' else value.split(',')
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise argparse.ArgumentTypeError(
+                f"scénario(s) inconnu(s): {', '.join(unknown)} (disponibles: {', '.join(SCENARIOS)})"
+            )
+        return names
+    
+    def count(value):
+        try:
+            return parse_count(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"nombre de patients invalide: {value}")
+    
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.run',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--mongomock', action='store_true', help="base en mémoire (sans serveur MongoDB)")
+    parser.add_argument('--scenario', type=scenarios, default='all', help="scénarios séparés par des virgules (défaut: all)")
+    parser.add_argument('--users', type=int, default=10, help="utilisateurs virtuels concurrents")
+    parser.add_argument('--iterations', type=int, default=20, help="itérations par utilisateur")
+    parser.add_argument('--patients', type=count, default=1000, help="taille de la clinique générée (ex: 10k, 1m)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="processus de génération")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mode', choices=['wsgi', 'asgi', 'both'], default='wsgi')
+    parser.add_argument('--save', help="fichier JSON du rapport")
+    parser.add_argument('--baseline', help="rapport de référence (contrôle de non-régression)")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="dépassement toléré du p95 (0.2 = +20%%)")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    use_mock = args.mongomock
+    users = args.users
+    iterations = args.iterations
+    tolerance = args.tolerance
+    seed = args.seed
+    mode = args.mode
+    modes = ['wsgi', 'asgi'] if mode == 'both' else [mode]
+    patients = args.patients
+    # mongomock est en mémoire: génération dans le processus courant
+    workers = 1 if use_mock else args.workers
+    names = args.scenario
+    
+    from benchmarks.generator import generate
+    
+    prepare_database(use_mock)
+    
+    print(f"🚀 Génération du jeu de données ({patients} patients)...")
+    dataset = generate(patients, seed=seed, workers=workers)
+    
+    from app import create_app
+    app = create_app()
+    
+    report = {
+        'date': datetime.utcnow().isoformat(),
+        'config': {
+            'mongo': 'mongomock' if use_mock else 'mongod',
+            'users': users,
+            'iterations': iterations,
+            'patients': patients,
+            'mode': mode
+        },
+        'scenarios': {}
+    }
+    for name in names:
+        for current in modes:
+            # Scénarios ASGI suffixés: comparables à une référence du même mode
+            key = name if current == 'wsgi' else f"{name} (asgi)"
+            print(f"➡️  Scénario {key} ({users} utilisateurs x {iterations} itérations)")
+            report['scenarios'][key] = run_scenario(app, dataset, name, users, iterations, seed, current)
+    
+    print_report(report)
+    
+    save_path = args.save
+    if save_path:
+        with open(save_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Résultats enregistrés dans {save_path}")
+    
+    # Contrôle de non-régression (code de sortie non nul pour bloquer la release)
+    baseline_path = args.baseline
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, tolerance)
+        if regressions:
+            print("\n❌ Régressions détectées:")
+            for message in regressions:
+                print(f"   {message}")
+            sys.exit(1)
+        print("\n✅ Aucune régression par rapport à la référence")
+
+if __name__ == '__main__':
+    main()
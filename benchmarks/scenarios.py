@@ -0,0 +1,73 @@
+"""
+Scénarios de charge réalistes pour l'API de la clinique
+
+Chaque scénario reçoit un client connecté (BenchClient), le jeu de données
+et un générateur aléatoire, et exécute une itération du parcours utilisateur
+"""
+
+from datetime import datetime, timedelta
+
+def _jour_ouvre(rng, days_ahead=14):
+    date = datetime.utcnow().date() + timedelta(days=rng.randint(1, days_ahead))
+    while date.weekday() >= 5:
+        date += timedelta(days=1)
+    return date.isoformat()
+
+def rush_rendezvous(client, dataset, rng):
+    """
+    Rush matinal: recherche d'un médecin, créneaux libres puis réservation
+    """
+    client.get('/api/public/medecins', 'GET /public/medecins')
+    medecin = rng.choice(dataset['medecins'])
+    date = _jour_ouvre(rng)
+    
+    response = client.get(
+        f"/api/public/medecins/{medecin['user_id']}/disponibilite?date={date}",
+        'GET /public/medecins/<id>/disponibilite'
+    )
+    creneaux = (response.get_json() or {}).get('creneaux_disponibles') or []
+    if not creneaux:
+        return
+    
+    client.post('/api/patient/rendezvous', 'POST /patient/rendezvous', json={
+        'medecin_id': medecin['user_id'],
+        'date_rdv': date,
+        'heure_rdv': rng.choice(creneaux),
+        'motif': 'Consultation'
+    })
+    client.get('/api/patient/rendezvous', 'GET /patient/rendezvous')
+
+def tableau_de_bord_medecin(client, dataset, rng):
+    """
+    Médecin: tableau de bord, agenda, liste des patients
+    """
+    client.get('/api/medecin/dashboard', 'GET /medecin/dashboard')
+    client.get('/api/medecin/rendezvous', 'GET /medecin/rendezvous')
+    client.get('/api/medecin/patients', 'GET /medecin/patients')
+
+def consultation_documents_patient(client, dataset, rng):
+    """
+    Patient: tableau de bord, dossiers, ordonnances, documents, notifications
+    """
+    client.get('/api/patient/dashboard', 'GET /patient/dashboard')
+    client.get('/api/patient/dossiers', 'GET /patient/dossiers')
+    client.get('/api/patient/ordonnances', 'GET /patient/ordonnances')
+    client.get('/api/patient/documents', 'GET /patient/documents')
+    client.get('/api/patient/notifications', 'GET /patient/notifications')
+
+def agenda_secretaire(client, dataset, rng):
+    """
+    Secrétaire: tableau de bord, agenda du jour, recherche de patients
+    """
+    today = datetime.utcnow().date().isoformat()
+    client.get('/api/secretaire/dashboard', 'GET /secretaire/dashboard')
+    client.get(f'/api/secretaire/rendezvous?date={today}', 'GET /secretaire/rendezvous')
+    client.get('/api/secretaire/patients', 'GET /secretaire/patients')
+
+# Nom du scénario -> (rôle des utilisateurs virtuels, fonction)
+SCENARIOS = {
+    'rush_rendezvous': ('patients', rush_rendezvous),
+    'medecin': ('medecins', tableau_de_bord_medecin),
+    'patient_documents': ('patients', consultation_documents_patient),
+    'secretaire': ('secretaires', agenda_secretaire)
+}
@@ -0,0 +1,36 @@
+"""
+Application servie par gunicorn pour la matrice de configurations
+(benchmarks/server_matrix.py)
+
+Avec BENCH_MONGOMOCK=True, la base mongomock est générée dans le processus
+maître (preload) et partagée par les workers forkés: tous les clients créés
+ensuite, dans le maître ou les workers, utilisent le même stockage en mémoire
+"""
+
+import functools
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+if os.getenv('BENCH_MONGOMOCK', 'False').lower() == 'true':
+    import mongomock
+    from mongomock.store import ServerStore
+    import config.database as database
+    from benchmarks.generator import generate
+    from config.migrations import migrate
+    
+    # Stockage commun: close_client() avant le fork ne perd pas les données
+    database.MongoClient = functools.partial(mongomock.MongoClient, _store=ServerStore())
+    database.close_client()
+    migrate(database.get_db())
+    generate(int(os.getenv('BENCH_PATIENTS', 200)))
+
+from app import create_app
+
+app = create_app()
@@ -0,0 +1,256 @@
+"""
+Matrice de configurations gunicorn: débit et latences par configuration
+
+Exécuter depuis la racine du backend:
+    python -m benchmarks.server_matrix [--mongomock] [--patients 200]
+        [--configs sync:3:1,gthread:2:4,gthread:1:16,gevent:2:1]
+        [--concurrency 32] [--duration 10] [--save matrice.json]
+
+Chaque configuration (classe:workers:threads) démarre un serveur gunicorn
+avec gunicorn.conf.py, puis `--concurrency` clients HTTP (connexions
+keep-alive) appellent les endpoints publics pendant `--duration` secondes.
+Sans --mongomock, le serveur utilise MONGODB_URI et la base clinique_bench,
+à générer au préalable (python -m benchmarks.generator --drop)
+"""
+
+import http.client
+import importlib.util
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks import configure_environment
+
+configure_environment()
+
+DEFAULT_CONFIGS = 'sync:3:1,gthread:2:4,gthread:1:16,gevent:2:1'
+HOST = '127.0.0.1'
+PORT = 8765
+# Démarrage du serveur (génération mongomock comprise)
+STARTUP_TIMEOUT = 120
+
+def parse_configs(value):
+    """
+    Configurations classe:workers:threads séparées par des virgules
+    """
+    configs = []
+    for item in value.split(','):
+        worker_class, workers, threads = item.split(':')
+        configs.append({'worker_class': worker_class, 'workers': int(workers), 'threads': int(threads)})
+    return configs
+
+def _get(connection, path):
+    connection.request('GET', path)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+def start_server(config, use_mock, patients):
+    """
+    Démarre gunicorn avec une configuration et attend qu'il réponde
+    
+    Returns:
+        Processus gunicorn
+    """
+    env = dict(os.environ)
+    env.update({
+        'GUNICORN_WORKER_CLASS': config['worker_class'],
+        'GUNICORN_WORKERS': str(config['workers']),
+        'GUNICORN_THREADS': str(config['threads']),
+        'GUNICORN_BIND': f"{HOST}:{PORT}",
+        'GUNICORN_LOG_LEVEL': 'warning',
+        'BENCH_MONGOMOCK': str(use_mock),
+        'BENCH_PATIENTS': str(patients),
+        'LOG_LEVEL': 'WARNING'
+    })
+    if use_mock:
+        # Base en mémoire générée dans le maître et héritée par les workers
+        env['GUNICORN_PRELOAD'] = 'True'
+    env.pop('METRICS_MULTIPROC_DIR', None)
+    
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'benchmarks.server_app:app'],
+        cwd=BACKEND_DIR, env=env
+    )
+    
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn arrêté au démarrage (code {process.returncode})")
+        try:
+            connection = http.client.HTTPConnection(HOST, PORT, timeout=5)
+            status, _ = _get(connection, '/health/live')
+            connection.close()
+            if status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.5)
+    
+    stop_server(process)
+    raise RuntimeError("gunicorn ne répond pas")
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def endpoints():
+    """
+    Endpoints appelés à tour de rôle (catalogues en cache et lecture en base)
+    """
+    connection = http.client.HTTPConnection(HOST, PORT, timeout=30)
+    status, body = _get(connection, '/api/public/medecins')
+    connection.close()
+    
+    paths = ['/api/public/medecins', '/api/public/specialites', '/api/public/info', '/health/ready']
+    medecins = json.loads(body).get('medecins', []) if status == 200 else []
+    if medecins:
+        paths.append(f"/api/public/medecins/{medecins[0]['user_id']}/disponibilite?date={date.today().isoformat()}")
+    return paths
+
+def run_load(paths, concurrency, duration):
+    """
+    Charge HTTP: `concurrency` clients en boucle pendant `duration` secondes
+    
+    Returns:
+        Résumé (requêtes, erreurs, débit, latences)
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    
+    def client(index):
+        connection = http.client.HTTPConnection(HOST, PORT, timeout=30)
+        local = []
+        local_errors = 0
+        i = index
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                status, _ = _get(connection, path)
+                if status >= 400:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(HOST, PORT, timeout=30)
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    ordered = sorted(latencies)
+    
+    def percentile(p):
+        if not ordered:
+            return 0.0
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000, 2)
+    
+    return {
+        'requests': len(ordered),
+        'errors': errors[0],
+        'throughput_rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99)
+    }
+
+def parse_args(argv=None):
+    """
+    Options de ligne de commande (configurations et valeurs numériques validées)
+    """
+    import argparse
+    
+    def configs(value):
+        try:
+            return parse_configs(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"configuration invalide: {value} (classe:workers:threads)")
+    
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.server_matrix',
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--mongomock', action='store_true', help="base en mémoire générée par le serveur")
+    parser.add_argument('--patients', type=int, default=200, help="patients générés (--mongomock)")
+    parser.add_argument('--configs', type=configs, default=DEFAULT_CONFIGS, help="classe:workers:threads séparés par des virgules")
+    parser.add_argument('--concurrency', type=int, default=32, help="clients HTTP simultanés")
+    parser.add_argument('--duration', type=float, default=10, help="durée de mesure par configuration (secondes)")
+    parser.add_argument('--save', help="fichier JSON du rapport")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    use_mock = args.mongomock
+    patients = args.patients
+    concurrency = args.concurrency
+    duration = args.duration
+    configs = args.configs
+    
+    report = {
+        'date': datetime.utcnow().isoformat(),
+        'config': {
+            'mongo': 'mongomock' if use_mock else 'mongod',
+            'cpu_count': os.cpu_count(),
+            'concurrency': concurrency,
+            'duration': duration
+        },
+        'results': {}
+    }
+    
+    for config in configs:
+        name = f"{config['worker_class']} {config['workers']}x{config['threads']}"
+        if config['worker_class'] == 'gevent' and importlib.util.find_spec('gevent') is None:
+            print(f"⏭️  {name}: gevent non installé (pip install gevent)")
+            continue
+        
+        print(f"➡️  {name} ({concurrency} clients, {duration:g} s)")
+        process = start_server(config, use_mock, patients)
+        try:
+            paths = endpoints()
+            # Échauffement: caches des catalogues et connexions de chaque worker
+            run_load(paths, concurrency, 1)
+            report['results'][name] = run_load(paths, concurrency, duration)
+        finally:
+            stop_server(process)
+    
+    print(f"\n📊 Matrice gunicorn ({os.cpu_count()} CPU, {concurrency} clients)")
+    print(f"   {'configuration':<20} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, s in report['results'].items():
+        print(
+            f"   {name:<20} {s['requests']:>7} {s['errors']:>5} {s['throughput_rps']:>8.1f} "
+            f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}"
+        )
+    
+    save_path = args.save
+    if save_path:
+        with open(save_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Résultats enregistrés dans {save_path}")
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,10 @@
 # Module de configuration
 
+from dotenv import load_dotenv
+
+# Chargement unique des variables d'environnement (.env) pour toute l'application
+load_dotenv()
+
+# Journalisation structurée (JSON), configurée une seule fois
+from config.logger import init_logging
+init_logging()
@@ -2,102 +2,382 @@
 Configuration et connexion à la base de données MongoDB
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ReadPreference
 from pymongo.errors import ConnectionFailure
+from pymongo import monitoring
+from bson import encode
+import contextvars
 import os
-from dotenv import load_dotenv
+import threading
 
-load_dotenv()
+from config.logger import get_logger
+
+logger = get_logger(__name__)
 
 # Variables de connexion
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
 MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'clinique_db')
 
-# Client MongoDB global
+# Configuration du pool de connexions
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 20000))
+# Compresseurs réseau par ordre de préférence (zstd, snappy, zlib)
+MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', 'zstd,snappy,zlib')
+MONGO_READ_PREFERENCE = os.getenv('MONGO_READ_PREFERENCE', 'primary')
+# Préférence de lecture pour les endpoints analytiques (statistiques)
+MONGO_ANALYTICS_READ_PREFERENCE = os.getenv('MONGO_ANALYTICS_READ_PREFERENCE', 'secondaryPreferred')
+
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST
+}
+
+# Client MongoDB global (un par processus, créé après le fork)
 client = None
 db = None
+_client_pid = None
+_client_lock = threading.Lock()
+_db_variants = {}
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Compteurs d'utilisation du pool de connexions (par processus)
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+        self.pools_cleared = 0
+    
+    def _incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        self._incr('pools_cleared')
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        self._incr('created')
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        self._incr('closed')
+    
+    def connection_check_out_started(self, event):
+        pass
+    
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failed')
+    
+    def connection_checked_out(self, event):
+        self._incr('checked_out')
+    
+    def connection_checked_in(self, event):
+        self._incr('checked_in')
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                'connections_open': self.created - self.closed,
+                'connections_in_use': self.checked_out - self.checked_in,
+                'connections_created': self.created,
+                'connections_closed': self.closed,
+                'checkouts': self.checked_out,
+                'checkout_failures': self.checkout_failed,
+                'pools_cleared': self.pools_cleared
+            }
+
+pool_stats = PoolStatsListener()
+
+# Commandes dont le filtre est analysé (clé du filtre dans la commande)
+FILTER_KEYS = {
+    'find': 'filter',
+    'count': 'query',
+    'distinct': 'query',
+    'findAndModify': 'query'
+}
+
+def filter_shape(value):
+    """
+    Forme d'un filtre: structure et opérateurs conservés, valeurs remplacées par leur type
+    """
+    if isinstance(value, dict):
+        return '{' + ', '.join(f"{key}: {filter_shape(value[key])}" for key in sorted(value)) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(sorted({filter_shape(item) for item in value})) + ']'
+    return type(value).__name__
+
+def command_filter(command_name, command):
+    """
+    Filtre d'une commande MongoDB (find, count, aggregate, update, delete...)
+    """
+    if command_name in FILTER_KEYS:
+        return command.get(FILTER_KEYS[command_name])
+    if command_name == 'aggregate':
+        pipeline = command.get('pipeline') or [{}]
+        return pipeline[0].get('$match')
+    if command_name == 'update':
+        return (command.get('updates') or [{}])[0].get('q')
+    if command_name == 'delete':
+        return (command.get('deletes') or [{}])[0].get('q')
+    return None
+
+class QueryCollector:
+    """
+    Mesures des commandes MongoDB d'une unité de travail (une requête HTTP)
+    
+    Args:
+        slow_threshold: Durée (secondes) au-delà de laquelle une commande est
+            conservée dans `slow` pour analyse (None: aucune)
+        count_bytes: Taille des réponses comptée dans `bytes` (réencodage BSON
+            de chaque réponse: réservé au diagnostic, `bytes` vaut None sinon)
+    """
+    
+    def __init__(self, slow_threshold=None, count_bytes=False):
+        self.slow_threshold = slow_threshold
+        self.slow = []
+        self.commands = 0
+        self.duration = 0.0
+        self.bytes = 0 if count_bytes else None
+        self.shapes = {}
+        # Durée de chaque commande: liste de (collection, commande, secondes)
+        self.timings = []
+        self._pending = {}
+        # Commandes concurrentes d'une même requête (tâches d'un pool de threads)
+        self._lock = threading.Lock()
+    
+    def started(self, request_id, collection, command_name, command):
+        shape = (collection, command_name, filter_shape(command_filter(command_name, command)))
+        with self._lock:
+            self.commands += 1
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+            self._pending[request_id] = (collection, command_name, command)
+    
+    def finished(self, request_id, duration_micros, reply=None):
+        seconds = duration_micros / 1e6
+        with self._lock:
+            self.duration += seconds
+            collection, command_name, command = self._pending.pop(request_id, (None, None, None))
+            self.timings.append((collection, command_name, seconds))
+            if self.slow_threshold is not None and seconds >= self.slow_threshold and command is not None:
+                self.slow.append((collection, command_name, seconds, command))
+        if reply is not None and self.bytes is not None:
+            try:
+                size = len(encode(reply))
+            except Exception:
+                return
+            with self._lock:
+                self.bytes += size
+    
+    def repeated(self, threshold):
+        """
+        Formes de requêtes répétées plus de `threshold` fois (motif N+1)
+        """
+        return [(shape, count) for shape, count in self.shapes.items() if count > threshold]
+
+class QueryStatsListener(monitoring.CommandListener):
+    """
+    Attribue les commandes MongoDB au collecteur actif du contexte courant
+    
+    Les événements des opérations synchrones sont émis dans le thread
+    appelant: le collecteur est donc celui de la requête en cours. Le
+    collecteur est une variable de contexte: une tâche lancée dans un pool
+    avec contextvars.copy_context() reste attribuée à la requête
+    """
+    
+    def __init__(self):
+        self._collector = contextvars.ContextVar('query_collector', default=None)
+    
+    def begin(self, slow_threshold=None, count_bytes=False):
+        collector = QueryCollector(slow_threshold, count_bytes)
+        self._collector.set(collector)
+        return collector
+    
+    def end(self):
+        collector = self._collector.get()
+        self._collector.set(None)
+        return collector
+    
+    def started(self, event):
+        collector = self._collector.get()
+        if collector is not None:
+            collection = event.command.get(event.command_name)
+            collector.started(
+                event.request_id,
+                collection if isinstance(collection, str) else None,
+                event.command_name,
+                event.command
+            )
+    
+    def succeeded(self, event):
+        collector = self._collector.get()
+        if collector is not None:
+            collector.finished(event.request_id, event.duration_micros, event.reply)
+    
+    def failed(self, event):
+        collector = self._collector.get()
+        if collector is not None:
+            collector.finished(event.request_id, event.duration_micros)
+
+query_stats = QueryStatsListener()
+
+def _available_compressors():
+    """
+    Filtre les compresseurs dont la dépendance Python est installée
+    """
+    available = []
+    for name in [c.strip() for c in MONGO_COMPRESSORS.split(',') if c.strip()]:
+        try:
+            if name == 'zstd':
+                import zstandard  # noqa: F401
+            elif name == 'snappy':
+                import snappy  # noqa: F401
+            available.append(name)
+        except ImportError:
+            continue
+    return available
+
+# Déterminés une fois par processus: un import manquant n'est pas retenté à chaque appel
+AVAILABLE_COMPRESSORS = _available_compressors()
+
+def client_options():
+    """
+    Options passées à MongoClient, construites depuis l'environnement
+    """
+    options = {
+        'maxPoolSize': MONGO_MAX_POOL_SIZE,
+        'minPoolSize': MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': MONGO_MAX_IDLE_TIME_MS,
+        'waitQueueTimeoutMS': MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        'connectTimeoutMS': MONGO_CONNECT_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'socketTimeoutMS': MONGO_SOCKET_TIMEOUT_MS,
+        'readPreference': MONGO_READ_PREFERENCE,
+        'event_listeners': [pool_stats, query_stats]
+    }
+    compressors = AVAILABLE_COMPRESSORS
+    if compressors:
+        options['compressors'] = ','.join(compressors)
+    return options
+
+def get_client():
+    """
+    Retourne le client MongoDB du processus courant
+    
+    Le client est créé paresseusement et recréé après un fork (gunicorn),
+    car un MongoClient ne doit pas être partagé entre processus
+    """
+    global client, db, _client_pid
+    pid = os.getpid()
+    if client is not None and _client_pid == pid:
+        return client
+    
+    with _client_lock:
+        if client is None or _client_pid != pid:
+            # Client hérité du processus parent: abandonné sans le fermer
+            # (ses sockets appartiennent au parent)
+            pool_stats.reset()
+            _db_variants.clear()
+            client = MongoClient(MONGODB_URI, **client_options())
+            db = client[MONGODB_DB_NAME]
+            _client_pid = pid
+    return client
+
+def close_client():
+    """
+    Ferme le client du processus courant (ex: avant le fork des workers)
+    """
+    global client, db, _client_pid
+    with _client_lock:
+        if client is not None and _client_pid == os.getpid():
+            client.close()
+        client = None
+        db = None
+        _client_pid = None
+        _db_variants.clear()
 
 def init_db():
     """
-    Initialise la connexion à MongoDB et crée les index nécessaires
+    Initialise la connexion à MongoDB et vérifie la version du schéma
+    
+    Les index sont gérés par les migrations (python migrate.py), une fois
+    par déploiement, et non plus à chaque démarrage
     """
-    global client, db
+    from config.migrations import check_schema_version
     
     try:
         # Connexion à MongoDB
-        client = MongoClient(MONGODB_URI)
+        get_client()
         
         # Test de connexion
         client.admin.command('ping')
-        print("✅ Connexion à MongoDB réussie")
+        logger.info("Connexion à MongoDB réussie")
         
-        # Sélection de la base de données
-        db = client[MONGODB_DB_NAME]
-        
-        # Création des index pour optimiser les requêtes
-        create_indexes()
+        # Vérification de la version du schéma (lecture seule)
+        check_schema_version(db)
         
         return db
-        
-    except ConnectionFailure as e:
-        print(f"❌ Erreur de connexion à MongoDB: {e}")
+    
+    except ConnectionFailure:
+        logger.exception("Erreur de connexion à MongoDB")
         raise
 
-def get_db():
+def get_db(read_preference=None):
     """
     Retourne l'instance de la base de données
-    """
-    global db
-    if db is None:
-        init_db()
-    return db
-
-def create_indexes():
-    """
-    Crée les index nécessaires pour optimiser les performances
-    """
-    global db
-    if db is None:
-        db = get_db()
     
-    # Index pour la collection users
-    db.users.create_index("email", unique=True)
-    db.users.create_index("role")
-    db.users.create_index("is_active")
-    
-    # Index pour la collection patients
-    db.patients.create_index("email", unique=True)
-    db.patients.create_index("telephone")
-    db.patients.create_index("created_at")
-    
-    # Index pour la collection rendezvous
-    db.rendezvous.create_index("medecin_id")
-    db.rendezvous.create_index("patient_id")
-    db.rendezvous.create_index("date_rdv")
-    db.rendezvous.create_index([("medecin_id", 1), ("date_rdv", 1)])
-    
-    # Index pour la collection dossiers_medicaux
-    db.dossiers_medicaux.create_index("patient_id")
-    db.dossiers_medicaux.create_index("medecin_id")
-    db.dossiers_medicaux.create_index("date_consultation")
-    
-    # Index pour la collection ordonnances
-    db.ordonnances.create_index("patient_id")
-    db.ordonnances.create_index("medecin_id")
-    db.ordonnances.create_index("date_ordonnance")
-    
-    # Index pour la collection documents_medicaux
-    db.documents_medicaux.create_index("patient_id")
-    db.documents_medicaux.create_index("dossier_id")
-    
-    # Index pour la collection notifications
-    db.notifications.create_index("user_id")
-    db.notifications.create_index("is_read")
-    db.notifications.create_index("created_at")
+    Args:
+        read_preference: Préférence de lecture (ex: 'secondaryPreferred')
+            pour router les lectures lourdes vers les secondaires
+    """
+    if db is None or _client_pid != os.getpid():
+        get_client()
     
-    # Index pour la collection clinique_config (si elle existe)
-    if 'clinique_config' in db.list_collection_names():
-        db.clinique_config.create_index("updated_at")
+    if not read_preference or read_preference == MONGO_READ_PREFERENCE:
+        return db
     
-    print("✅ Index MongoDB créés avec succès")
+    variant = _db_variants.get(read_preference)
+    if variant is None:
+        variant = db.with_options(read_preference=READ_PREFERENCES[read_preference])
+        _db_variants[read_preference] = variant
+    return variant
 
+def get_pool_stats():
+    """
+    Retourne les statistiques du pool de connexions du processus courant
+    """
+    stats = pool_stats.snapshot()
+    stats.update({
+        'pid': os.getpid(),
+        'max_pool_size': MONGO_MAX_POOL_SIZE,
+        'min_pool_size': MONGO_MIN_POOL_SIZE,
+        'compressors': list(AVAILABLE_COMPRESSORS),
+        'read_preference': MONGO_READ_PREFERENCE
+    })
+    return stats
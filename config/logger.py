@@ -0,0 +1,111 @@
+"""
+Journalisation structurée (une ligne JSON par événement)
+
+Utilisation:
+    from config.logger import get_logger
+    logger = get_logger(__name__)
+    logger.exception("Erreur lors de la connexion")
+    logger.info("Email envoyé", extra={'fields': {'destinataire': email}})
+
+Dans une requête HTTP, l'endpoint, la méthode, le chemin et le rôle de
+l'utilisateur sont ajoutés automatiquement à chaque événement
+"""
+
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+# Format des journaux: json (production) ou text (lecture en développement)
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+ROOT_LOGGER = 'clinique'
+
+def _request_context():
+    """
+    Contexte de la requête HTTP en cours (vide hors requête)
+    """
+    try:
+        from flask import has_request_context, request, session
+    except ImportError:
+        return {}
+    if not has_request_context():
+        return {}
+    
+    context = {
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.path
+    }
+    try:
+        role = session.get('user_role')
+        if role:
+            context['role'] = role
+    except Exception:
+        pass
+    return context
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formate chaque événement en un objet JSON sur une ligne
+    """
+    
+    def format(self, record):
+        event = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process
+        }
+        event.update(_request_context())
+        event.update(getattr(record, 'fields', None) or {})
+        
+        if record.exc_info:
+            event['error'] = str(record.exc_info[1])
+            event['error_type'] = record.exc_info[0].__name__
+            event['traceback'] = self.formatException(record.exc_info)
+        
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """
+    Format lisible pour le développement (champs en fin de ligne)
+    """
+    
+    def format(self, record):
+        line = f"{record.levelname:<7} {record.name}: {record.getMessage()}"
+        fields = dict(_request_context(), **(getattr(record, 'fields', None) or {}))
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+def init_logging():
+    """
+    Configure le journal de l'application (idempotent)
+    """
+    logger = logging.getLogger(ROOT_LOGGER)
+    if getattr(logger, '_configured', False):
+        return logger
+    
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(TextFormatter() if LOG_FORMAT == 'text' else JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    # Pas de double affichage via le logger racine (gunicorn, flask)
+    logger.propagate = False
+    logger._configured = True
+    return logger
+
+def get_logger(name):
+    """
+    Logger d'un module, rattaché au journal de l'application
+    
+    Args:
+        name: Nom du module (__name__)
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
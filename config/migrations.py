@@ -0,0 +1,386 @@
+"""
+Migrations versionnées du schéma MongoDB (index, transformations de données)
+Exécutées une fois par déploiement via: python migrate.py
+"""
+
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Collection et document stockant la version appliquée
+SCHEMA_COLLECTION = 'schema_migrations'
+SCHEMA_DOC_ID = 'schema'
+
+MIGRATIONS = []
+
+def migration(version, description):
+    """
+    Décorateur d'enregistrement d'une migration
+    
+    Args:
+        version: Numéro de version (entier croissant)
+        description: Description courte de la migration
+    """
+    def decorator(f):
+        MIGRATIONS.append((version, description, f))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return f
+    return decorator
+
+def _drop_index(collection, name):
+    """
+    Supprime un index s'il existe
+    """
+    if name in collection.index_information():
+        collection.drop_index(name)
+
+@migration(1, "Index initiaux")
+def _initial_indexes(db):
+    # Index pour la collection users
+    db.users.create_index("email", unique=True)
+    db.users.create_index("role")
+    db.users.create_index("is_active")
+    
+    # Index pour la collection patients
+    db.patients.create_index("email", unique=True)
+    db.patients.create_index("telephone")
+    db.patients.create_index("created_at")
+    
+    # Index pour la collection rendezvous
+    db.rendezvous.create_index("medecin_id")
+    db.rendezvous.create_index("patient_id")
+    db.rendezvous.create_index("date_rdv")
+    db.rendezvous.create_index([("medecin_id", 1), ("date_rdv", 1)])
+    
+    # Index pour la collection dossiers_medicaux
+    db.dossiers_medicaux.create_index("patient_id")
+    db.dossiers_medicaux.create_index("medecin_id")
+    db.dossiers_medicaux.create_index("date_consultation")
+    
+    # Index pour la collection ordonnances
+    db.ordonnances.create_index("patient_id")
+    db.ordonnances.create_index("medecin_id")
+    db.ordonnances.create_index("date_ordonnance")
+    
+    # Index pour la collection documents_medicaux
+    db.documents_medicaux.create_index("patient_id")
+    db.documents_medicaux.create_index("dossier_id")
+    
+    # Index pour la collection notifications
+    db.notifications.create_index("user_id")
+    db.notifications.create_index("is_read")
+    db.notifications.create_index("created_at")
+    
+    # Index TTL pour la collection sessions (suppression automatique à expiration)
+    db.sessions.create_index("expires_at", expireAfterSeconds=0)
+    
+    # Index pour la collection clinique_config
+    db.clinique_config.create_index("updated_at")
+
+@migration(2, "Index composés alignés sur les requêtes et index partiels")
+def _compound_indexes(db):
+    # users: filtre rôle + actif (statistiques, liste des médecins)
+    _drop_index(db.users, "is_active_1")
+    db.users.create_index([("role", ASCENDING), ("is_active", ASCENDING)])
+    
+    # patients: l'email est optionnel, l'unicité ne porte que sur les emails renseignés
+    _drop_index(db.patients, "email_1")
+    db.patients.create_index(
+        "email",
+        unique=True,
+        partialFilterExpression={'email': {'$type': 'string'}}
+    )
+    db.patients.create_index("user_id", partialFilterExpression={'user_id': {'$type': 'objectId'}})
+    
+    # rendezvous: medecin_id seul est couvert par (medecin_id, date_rdv)
+    _drop_index(db.rendezvous, "medecin_id_1")
+    _drop_index(db.rendezvous, "patient_id_1")
+    db.rendezvous.create_index([("patient_id", ASCENDING), ("date_rdv", DESCENDING)])
+    db.rendezvous.create_index([("statut", ASCENDING), ("date_rdv", ASCENDING)])
+    
+    # dossiers_medicaux: recherche par patient/médecin triée par date
+    _drop_index(db.dossiers_medicaux, "patient_id_1")
+    _drop_index(db.dossiers_medicaux, "medecin_id_1")
+    db.dossiers_medicaux.create_index([("patient_id", ASCENDING), ("date_consultation", DESCENDING)])
+    db.dossiers_medicaux.create_index([("medecin_id", ASCENDING), ("date_consultation", DESCENDING)])
+    
+    # ordonnances: même schéma d'accès
+    _drop_index(db.ordonnances, "patient_id_1")
+    _drop_index(db.ordonnances, "medecin_id_1")
+    db.ordonnances.create_index([("patient_id", ASCENDING), ("date_ordonnance", DESCENDING)])
+    db.ordonnances.create_index([("medecin_id", ASCENDING), ("date_ordonnance", DESCENDING)])
+    
+    # documents_medicaux
+    _drop_index(db.documents_medicaux, "patient_id_1")
+    db.documents_medicaux.create_index([("patient_id", ASCENDING), ("date_examen", DESCENDING)])
+    
+    # notifications: liste triée par date et compteur des non lues (index partiel)
+    _drop_index(db.notifications, "user_id_1")
+    _drop_index(db.notifications, "is_read_1")
+    db.notifications.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+    db.notifications.create_index(
+        "user_id",
+        name="user_id_unread",
+        partialFilterExpression={'is_read': False}
+    )
+
+def _rebuild_medecin_patients(db):
+    """
+    Relations médecin-patient et compteurs reconstruits à partir des
+    rendez-vous, dossiers médicaux et ordonnances
+    
+    Copie figée de MedecinPatient.rebuild au moment de la migration 4: une
+    évolution du modèle ne modifie pas le résultat des migrations passées
+    """
+    now = datetime.utcnow()
+    activities = {}
+    for source in ('rendezvous', 'dossiers_medicaux', 'ordonnances'):
+        pairs = db[source].aggregate([
+            {'$group': {
+                '_id': {'medecin_id': '$medecin_id', 'patient_id': '$patient_id'},
+                'derniere_activite': {'$max': '$created_at'}
+            }}
+        ], allowDiskUse=True)
+        for pair in pairs:
+            key = (pair['_id'].get('medecin_id'), pair['_id'].get('patient_id'))
+            if None in key:
+                continue
+            activity = pair.get('derniere_activite') or now
+            if isinstance(activity, str):
+                activity = datetime.fromisoformat(activity)
+            activities[key] = max(activities.get(key, activity), activity)
+    
+    counts = {}
+    operations = []
+    for (medecin_id, patient_id), activity in activities.items():
+        counts[medecin_id] = counts.get(medecin_id, 0) + 1
+        operations.append(UpdateOne(
+            {'medecin_id': medecin_id, 'patient_id': patient_id},
+            {'$setOnInsert': {'created_at': now}, '$max': {'derniere_activite': activity}},
+            upsert=True
+        ))
+        if len(operations) >= MIGRATION_BATCH_SIZE:
+            db.medecin_patients.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        db.medecin_patients.bulk_write(operations, ordered=False)
+    
+    db.medecin_stats.delete_many({})
+    if counts:
+        db.medecin_stats.insert_many([
+            {'_id': medecin_id, 'nb_patients': count, 'updated_at': now}
+            for medecin_id, count in counts.items()
+        ])
+
+@migration(3, "Patients par médecin et compteur du dashboard médecin")
+def _medecin_patients(db):
+    # Relations reconstruites une seule fois, par la migration 4
+    db.medecin_patients.create_index(
+        [("medecin_id", ASCENDING), ("patient_id", ASCENDING)],
+        unique=True
+    )
+
+@migration(4, "Relations médecin-patient issues des rendez-vous et ordonnances")
+def _medecin_patients_activity(db):
+    # "Mes patients": liste paginée du plus récemment suivi au plus ancien
+    # (patient_id départage les égalités: pagination stable, tri couvert par l'index)
+    db.medecin_patients.create_index([
+        ("medecin_id", ASCENDING),
+        ("derniere_activite", DESCENDING),
+        ("patient_id", ASCENDING)
+    ])
+    _rebuild_medecin_patients(db)
+
+# Champs stockés en dates BSON et en ObjectId, par collection
+TYPED_FIELDS = {
+    'users': (('created_at', 'updated_at'), ()),
+    'patients': (('created_at', 'updated_at'), ('user_id',)),
+    'medecins': (('created_at', 'updated_at'), ('user_id',)),
+    'rendezvous': (('date_rdv', 'created_at', 'updated_at'), ('patient_id', 'medecin_id')),
+    'dossiers_medicaux': (('date_consultation', 'created_at', 'updated_at'), ('patient_id', 'medecin_id')),
+    'ordonnances': (('date_ordonnance', 'created_at', 'updated_at'), ('patient_id', 'medecin_id')),
+    'documents_medicaux': (('date_examen', 'created_at', 'updated_at'), ('patient_id', 'dossier_id', 'medecin_id')),
+    'notifications': (('created_at', 'updated_at'), ('user_id',))
+}
+# Documents réécrits par lot (une commande bulk_write par lot)
+MIGRATION_BATCH_SIZE = 1000
+
+def _normalize_types(collection, date_fields, id_fields):
+    """
+    Réécrit les dates ISO en dates BSON et les identifiants texte en ObjectId
+    
+    Parcours par _id croissant et par lots: la migration peut être
+    interrompue et relancée sans reprendre depuis le début
+    
+    Returns:
+        Nombre de documents modifiés
+    """
+    from models.fields import to_datetime, to_object_id
+    
+    fields = date_fields + id_fields
+    query = {'$or': [{field: {'$type': 'string'}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    
+    modified = 0
+    last_id = None
+    while True:
+        batch_query = query if last_id is None else {'$and': [query, {'_id': {'$gt': last_id}}]}
+        documents = list(collection.find(batch_query, projection).sort('_id', ASCENDING).limit(MIGRATION_BATCH_SIZE))
+        if not documents:
+            return modified
+        
+        operations = []
+        for document in documents:
+            changes = {}
+            for field in date_fields:
+                value = document.get(field)
+                if isinstance(value, str) and to_datetime(value) is not value:
+                    changes[field] = to_datetime(value)
+            for field in id_fields:
+                value = document.get(field)
+                if isinstance(value, str) and to_object_id(value) is not value:
+                    changes[field] = to_object_id(value)
+            if changes:
+                operations.append(UpdateOne({'_id': document['_id']}, {'$set': changes}))
+        
+        if operations:
+            modified += collection.bulk_write(operations, ordered=False).modified_count
+        last_id = documents[-1]['_id']
+
+@migration(5, "Dates BSON et ObjectId à la place des chaînes ISO et identifiants texte")
+def _native_types(db):
+    for name, (date_fields, id_fields) in TYPED_FIELDS.items():
+        modified = _normalize_types(db[name], date_fields, id_fields)
+        logger.info(
+            "Types natifs: documents convertis",
+            extra={'fields': {'collection': name, 'documents': modified}}
+        )
+
+# Catalogue initial de la migration 6 (figé: indépendant de models/specialite.py)
+SPECIALITES_V6 = [
+    'Médecine générale', 'Cardiologie', 'Dermatologie', 'Endocrinologie',
+    'Gastro-entérologie', 'Gynécologie', 'Neurologie', 'Ophtalmologie',
+    'Orthopédie', 'Pédiatrie', 'Pneumologie', 'Psychiatrie', 'Radiologie',
+    'Rhumatologie', 'Urologie'
+]
+
+@migration(6, "Catalogue des spécialités et nombre de médecins actifs")
+def _specialites(db):
+    now = datetime.utcnow()
+    db.specialites.create_index("nom", unique=True)
+    db.specialites.bulk_write([
+        UpdateOne(
+            {'nom': nom},
+            {'$setOnInsert': {'nb_medecins': 0, 'created_at': now, 'updated_at': now}},
+            upsert=True
+        )
+        for nom in SPECIALITES_V6
+    ], ordered=False)
+    
+    # Médecins actifs par spécialité (spécialités des médecins absentes du catalogue ajoutées)
+    counts = {}
+    for group in db.medecins.aggregate([
+        {'$lookup': {'from': 'users', 'localField': 'user_id', 'foreignField': '_id', 'as': 'user'}},
+        {'$unwind': '$user'},
+        {'$group': {
+            '_id': '$specialite',
+            'nb_medecins': {'$sum': {'$cond': [{'$eq': ['$user.is_active', False]}, 0, 1]}}
+        }}
+    ]):
+        if group['_id']:
+            counts[group['_id']] = group['nb_medecins']
+    if counts:
+        db.specialites.bulk_write([
+            UpdateOne(
+                {'nom': nom},
+                {'$set': {'nb_medecins': count, 'updated_at': now}, '$setOnInsert': {'created_at': now}},
+                upsert=True
+            )
+            for nom, count in counts.items()
+        ], ordered=False)
+
+@migration(7, "Compteurs de tentatives de connexion (expiration TTL)")
+def _rate_limits(db):
+    # Documents supprimés à la fin de la fenêtre suivant leur fenêtre de comptage
+    db.rate_limits.create_index("expires_at", expireAfterSeconds=0)
+
+@migration(8, "Index des médecins par spécialité et par compte")
+def _medecins_indexes(db):
+    # Liste publique filtrée (find_by_specialite), recomptage et recherche par compte
+    db.medecins.create_index("specialite")
+    db.medecins.create_index("user_id")
+
+def latest_version():
+    """
+    Version de schéma attendue par le code
+    """
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def get_schema_version(db):
+    """
+    Version de schéma appliquée à la base
+    """
+    doc = db[SCHEMA_COLLECTION].find_one({'_id': SCHEMA_DOC_ID})
+    return doc.get('version', 0) if doc else 0
+
+def check_schema_version(db):
+    """
+    Vérifie (sans rien modifier) que le schéma de la base est à jour
+    
+    Returns:
+        True si la base est à jour
+    """
+    current = get_schema_version(db)
+    expected = latest_version()
+    if current < expected:
+        logger.warning(
+            "Schéma MongoDB non à jour: exécuter python migrate.py",
+            extra={'fields': {'version': current, 'version_attendue': expected}}
+        )
+        return False
+    return True
+
+def migrate(db, target=None):
+    """
+    Applique les migrations en attente jusqu'à la version cible
+    
+    Args:
+        db: Base de données MongoDB
+        target: Version cible (par défaut la dernière)
+    
+    Returns:
+        Liste des versions appliquées
+    """
+    target = latest_version() if target is None else target
+    current = get_schema_version(db)
+    applied = []
+    
+    for version, description, func in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        
+        func(db)
+        
+        # Version enregistrée après chaque étape: une reprise repart du bon point
+        db[SCHEMA_COLLECTION].update_one(
+            {'_id': SCHEMA_DOC_ID},
+            {
+                '$set': {'version': version, 'updated_at': datetime.utcnow()},
+                '$push': {'history': {
+                    'version': version,
+                    'description': description,
+                    'applied_at': datetime.utcnow()
+                }}
+            },
+            upsert=True
+        )
+        logger.info(
+            "Migration appliquée: %s", description,
+            extra={'fields': {'version': version}}
+        )
+        applied.append(version)
+    
+    return applied
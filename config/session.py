@@ -0,0 +1,245 @@
+"""
+Stockage des sessions côté serveur (MongoDB ou Redis)
+Permet de partager les sessions entre plusieurs workers et instances
+"""
+
+import os
+import secrets
+from datetime import datetime, timedelta
+
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
+from werkzeug.datastructures import CallbackDict
+from itsdangerous import Signer, BadSignature, want_bytes
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Backend de session: mongodb (défaut), redis ou filesystem (mode historique)
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'mongodb').lower()
+SESSION_COLLECTION = os.getenv('SESSION_COLLECTION', 'sessions')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_KEY_PREFIX = os.getenv('SESSION_REDIS_PREFIX', 'session:')
+
+class ServerSession(CallbackDict, SessionMixin):
+    """
+    Session stockée côté serveur, identifiée par un sid signé dans le cookie
+    """
+    
+    def __init__(self, initial=None, sid=None, expires_at=None, new=False):
+        def on_update(self):
+            self.modified = True
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = new
+        self.modified = False
+
+class MongoSessionStore:
+    """
+    Stockage des sessions dans une collection MongoDB avec index TTL sur expires_at
+    """
+    
+    def __init__(self, collection_name=SESSION_COLLECTION):
+        self.collection_name = collection_name
+    
+    def _collection(self):
+        from config.database import get_db
+        return get_db()[self.collection_name]
+    
+    def load(self, sid):
+        """
+        Retourne (données sérialisées, date d'expiration) ou (None, None)
+        """
+        document = self._collection().find_one({'_id': sid})
+        if not document:
+            return None, None
+        # Le moniteur TTL ne passe que toutes les 60 secondes
+        if document['expires_at'] <= datetime.utcnow():
+            return None, None
+        return document['data'], document['expires_at']
+    
+    def save(self, sid, data, expires_at):
+        self._collection().replace_one(
+            {'_id': sid},
+            {'_id': sid, 'data': data, 'expires_at': expires_at},
+            upsert=True
+        )
+    
+    def delete(self, sid):
+        self._collection().delete_one({'_id': sid})
+
+class RedisSessionStore:
+    """
+    Stockage des sessions dans Redis (clé avec expiration native)
+    
+    Le client peut être injecté (ex: fakeredis pour les tests locaux)
+    """
+    
+    def __init__(self, client=None, key_prefix=REDIS_KEY_PREFIX):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(REDIS_URL)
+        self.client = client
+        self.key_prefix = key_prefix
+    
+    def load(self, sid):
+        # GET + PTTL en un seul aller-retour
+        pipe = self.client.pipeline()
+        pipe.get(self.key_prefix + sid)
+        pipe.pttl(self.key_prefix + sid)
+        data, pttl = pipe.execute()
+        if data is None or pttl is None or pttl <= 0:
+            return None, None
+        expires_at = datetime.utcnow() + timedelta(milliseconds=pttl)
+        return data.decode('utf-8') if isinstance(data, bytes) else data, expires_at
+    
+    def save(self, sid, data, expires_at):
+        ttl = max(int((expires_at - datetime.utcnow()).total_seconds()), 1)
+        self.client.setex(self.key_prefix + sid, ttl, data)
+    
+    def delete(self, sid):
+        self.client.delete(self.key_prefix + sid)
+
+class ServerSessionInterface(SessionInterface):
+    """
+    Interface de session Flask s'appuyant sur un stockage partagé
+    
+    - Sérialisation JSON compacte (TaggedJSONSerializer de Flask)
+    - Écriture uniquement si la session a changé, ou si plus de la moitié
+      de sa durée de vie est écoulée (prolongation glissante)
+    """
+    
+    serializer = TaggedJSONSerializer()
+    session_class = ServerSession
+    
+    def __init__(self, store):
+        self.store = store
+    
+    def _get_signer(self, app):
+        return Signer(app.secret_key, salt='clinique-session', key_derivation='hmac')
+    
+    def _lifetime(self, app):
+        return app.permanent_session_lifetime
+    
+    def _new_session(self):
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+    
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return self._new_session()
+        
+        try:
+            sid = self._get_signer(app).unsign(cookie).decode('utf-8')
+        except BadSignature:
+            return self._new_session()
+        
+        try:
+            data, expires_at = self.store.load(sid)
+        except Exception:
+            logger.exception("Erreur lors du chargement de la session")
+            return self._new_session()
+        
+        if data is None:
+            return self._new_session()
+        
+        try:
+            return self.session_class(self.serializer.loads(data), sid=sid, expires_at=expires_at)
+        except Exception:
+            return self._new_session()
+    
+    def _needs_refresh(self, app, session):
+        if not session.permanent or session.expires_at is None:
+            return False
+        remaining = session.expires_at - datetime.utcnow()
+        return remaining < self._lifetime(app) / 2
+    
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        
+        # Session vidée (déconnexion): suppression côté serveur et cookie
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        
+        if not (session.modified or session.new or self._needs_refresh(app, session)):
+            return
+        
+        expires_at = datetime.utcnow() + self._lifetime(app)
+        self.store.save(session.sid, self.serializer.dumps(dict(session)), expires_at)
+        
+        response.set_cookie(
+            name,
+            self._get_signer(app).sign(want_bytes(session.sid)).decode('utf-8'),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+class TokenSession(ServerSession):
+    """
+    Session reconstruite à partir d'un jeton signé: jamais persistée
+    """
+    
+    stateless = True
+
+class TokenSessionInterface(SessionInterface):
+    """
+    Accepte les jetons Bearer signés et délègue les autres requêtes
+    au stockage de session classique
+    
+    Une requête authentifiée par jeton ne lit ni n'écrit aucune session
+    """
+    
+    def __init__(self, inner):
+        self.inner = inner
+    
+    def open_session(self, app, request):
+        from services.token_service import TokenService
+        claims = TokenService.from_request(request)
+        if claims is None:
+            return self.inner.open_session(app, request)
+        
+        session = TokenSession({
+            'user_id': claims['sub'],
+            'user_role': claims['role'],
+            'user_email': claims.get('eml')
+        })
+        session.claims = claims
+        return session
+    
+    def save_session(self, app, session, response):
+        if getattr(session, 'stateless', False):
+            return
+        return self.inner.save_session(app, session, response)
+
+def init_session(app, redis_client=None):
+    """
+    Configure le stockage des sessions selon SESSION_BACKEND
+    
+    Args:
+        app: Application Flask
+        redis_client: Client Redis à utiliser (optionnel, pour les tests)
+    """
+    if SESSION_BACKEND == 'filesystem':
+        # Mode historique: un répertoire par instance, non partagé
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'filesystem'
+        Session(app)
+    elif SESSION_BACKEND == 'redis':
+        app.session_interface = ServerSessionInterface(RedisSessionStore(client=redis_client))
+    else:
+        app.session_interface = ServerSessionInterface(MongoSessionStore())
+    
+    # Mode sans état: les jetons Bearer court-circuitent le stockage de session
+    from services.token_service import AUTH_TOKENS_ENABLED
+    if AUTH_TOKENS_ENABLED:
+        app.session_interface = TokenSessionInterface(app.session_interface)
@@ -2,20 +2,27 @@
 Contrôleur Admin - Gestion complète du système
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, send_file
 from models.user import User
 from models.patient import Patient
 from models.rendezvous import RendezVous
 from models.medecin import Medecin
 from models.dossier_medical import DossierMedical
 from models.ordonnance import Ordonnance
+from models.specialite import Specialite
 from services.email_service import EmailService
+from services.password_service import PasswordServiceBusy
+from services.catalog_service import CatalogService, CLINIQUE, SPECIALITES
 import secrets
 import string
 from datetime import datetime
 from bson import ObjectId
+from config.logger import get_logger
+from middleware.json_response import stream_json, JSON_STREAM_BATCH_SIZE
+from itertools import islice
 
 bp = Blueprint('admin', __name__)
+logger = get_logger(__name__)
 
 def generate_temp_password(length=12):
     """Génère un mot de passe temporaire"""
@@ -35,14 +42,13 @@ def get_all_users():
         if is_active is not None:
             is_active_bool = is_active.lower() == 'true'
         
-        users = User.find_all(role=role, is_active=is_active_bool)
+        users = User.iter_all(role=role, is_active=is_active_bool)
         
-        users_list = [user.to_dict() for user in users]
+        # Liste diffusée au fil du curseur
+        return stream_json('users', (user.to_dict() for user in users)), 200
         
-        return jsonify({'users': users_list}), 200
-        
-    except Exception as e:
-        print(f"Erreur lors de la récupération des utilisateurs: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des utilisateurs")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/users', methods=['POST'])
@@ -107,8 +113,8 @@ def create_user():
         try:
             email_service = EmailService()
             email_service.send_account_credentials(email, nom or '', prenom or '', email, password)
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email: {e}")
+        except Exception:
+            logger.exception("Erreur lors de l'envoi de l'email")
             # Ne pas bloquer la création si l'email échoue
         
         return jsonify({
@@ -117,8 +123,11 @@ def create_user():
             'password': password  # Retourner le mot de passe pour l'affichage (optionnel)
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création de l'utilisateur: {e}")
+    except PasswordServiceBusy:
+        # Trop de calculs bcrypt en attente: le client réessaie plus tard
+        return jsonify({'error': 'Service momentanément surchargé, réessayez'}), 503, {'Retry-After': '1'}
+    except Exception:
+        logger.exception("Erreur lors de la création de l'utilisateur")
         return jsonify({'error': 'Erreur serveur lors de la création'}), 500
 
 @bp.route('/users/<user_id>', methods=['PUT'])
@@ -152,13 +161,17 @@ def update_user(user_id):
         
         user.update()
         
+        # Un compte désactivé ne doit plus pouvoir renouveler ses jetons
+        if data.get('is_active') is False:
+            user.revoke_tokens()
+        
         return jsonify({
             'message': 'Utilisateur mis à jour avec succès',
             'user': user.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la mise à jour de l'utilisateur: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la mise à jour de l'utilisateur")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/users/<user_id>', methods=['DELETE'])
@@ -173,11 +186,12 @@ def delete_user(user_id):
         
         user.is_active = False
         user.update()
+        user.revoke_tokens()
         
         return jsonify({'message': 'Utilisateur désactivé avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la désactivation de l'utilisateur: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la désactivation de l'utilisateur")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/users/<user_id>/reset-password', methods=['POST'])
@@ -203,16 +217,19 @@ def reset_user_password(user_id):
                 user.email,
                 new_password
             )
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email: {e}")
+        except Exception:
+            logger.exception("Erreur lors de l'envoi de l'email")
         
         return jsonify({
             'message': 'Mot de passe réinitialisé et envoyé par email',
             'password': new_password  # Retourner pour affichage si nécessaire
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la réinitialisation du mot de passe: {e}")
+    except PasswordServiceBusy:
+        # Trop de calculs bcrypt en attente: le client réessaie plus tard
+        return jsonify({'error': 'Service momentanément surchargé, réessayez'}), 503, {'Retry-After': '1'}
+    except Exception:
+        logger.exception("Erreur lors de la réinitialisation du mot de passe")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/statistiques', methods=['GET'])
@@ -221,8 +238,9 @@ def get_statistiques():
     Récupère les statistiques globales de la clinique
     """
     try:
-        from config.database import get_db
-        db = get_db()
+        from config.database import get_db, MONGO_ANALYTICS_READ_PREFERENCE
+        # Lectures lourdes: routées vers les secondaires si disponibles
+        db = get_db(read_preference=MONGO_ANALYTICS_READ_PREFERENCE)
         
         # Nombre total de patients
         total_patients = db.patients.count_documents({})
@@ -291,10 +309,50 @@ def get_statistiques():
         
         return jsonify(stats), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des statistiques: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des statistiques")
         return jsonify({'error': 'Erreur serveur'}), 500
 
+def _iter_rendezvous_details(rdvs_data):
+    """
+    Rendez-vous avec le nom du patient et du médecin, par lots de JSON_STREAM_BATCH_SIZE
+    
+    Args:
+        rdvs_data: Curseur MongoDB sur la collection rendezvous
+    
+    Returns:
+        Générateur de dictionnaires
+    """
+    rdvs_data = iter(rdvs_data)
+    while True:
+        batch = list(islice(rdvs_data, JSON_STREAM_BATCH_SIZE))
+        if not batch:
+            return
+        
+        patients = Patient.find_by_ids({rdv_data['patient_id'] for rdv_data in batch if rdv_data.get('patient_id')})
+        medecins = User.find_by_ids({rdv_data['medecin_id'] for rdv_data in batch if rdv_data.get('medecin_id')})
+        
+        for rdv_data in batch:
+            patient = patients.get(rdv_data.get('patient_id'))
+            medecin_user = medecins.get(rdv_data.get('medecin_id'))
+            
+            yield {
+                '_id': str(rdv_data['_id']),
+                'date_rdv': rdv_data['date_rdv'].isoformat() if isinstance(rdv_data['date_rdv'], datetime) else rdv_data['date_rdv'],
+                'heure_rdv': rdv_data['heure_rdv'],
+                'motif': rdv_data.get('motif'),
+                'statut': rdv_data.get('statut'),
+                'patient': {
+                    'nom': patient.nom,
+                    'prenom': patient.prenom,
+                    'email': patient.email
+                } if patient else None,
+                'medecin': {
+                    'nom': medecin_user.nom,
+                    'prenom': medecin_user.prenom
+                } if medecin_user else None
+            }
+
 @bp.route('/rendezvous', methods=['GET'])
 def get_all_rendezvous():
     """
@@ -322,87 +380,50 @@ def get_all_rendezvous():
         
         rdvs_data = db.rendezvous.find(query).sort('date_rdv', -1).limit(100)
         
-        rdvs = []
-        for rdv_data in rdvs_data:
-            # Récupérer les informations du patient et du médecin
-            patient = Patient.find_by_id(rdv_data['patient_id'])
-            medecin_user = User.find_by_id(rdv_data['medecin_id'])
-            
-            rdv_dict = {
-                '_id': str(rdv_data['_id']),
-                'date_rdv': rdv_data['date_rdv'].isoformat() if isinstance(rdv_data['date_rdv'], datetime) else rdv_data['date_rdv'],
-                'heure_rdv': rdv_data['heure_rdv'],
-                'motif': rdv_data.get('motif'),
-                'statut': rdv_data.get('statut'),
-                'patient': {
-                    'nom': patient.nom if patient else 'N/A',
-                    'prenom': patient.prenom if patient else 'N/A',
-                    'email': patient.email if patient else None
-                } if patient else None,
-                'medecin': {
-                    'nom': medecin_user.nom if medecin_user else 'N/A',
-                    'prenom': medecin_user.prenom if medecin_user else 'N/A'
-                } if medecin_user else None
-            }
-            rdvs.append(rdv_dict)
-        
-        return jsonify({'rendezvous': rdvs}), 200
+        # Liste diffusée: patients et médecins chargés en deux requêtes par lot
+        return stream_json('rendezvous', _iter_rendezvous_details(rdvs_data)), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/specialites', methods=['GET'])
 def get_specialites():
     """
-    Récupère la liste des spécialités
+    Récupère la liste des spécialités et le nombre de médecins actifs de chacune
     """
     try:
-        specialites = [
-            'Médecine générale',
-            'Cardiologie',
-            'Dermatologie',
-            'Endocrinologie',
-            'Gastro-entérologie',
-            'Gynécologie',
-            'Neurologie',
-            'Ophtalmologie',
-            'Orthopédie',
-            'Pédiatrie',
-            'Pneumologie',
-            'Psychiatrie',
-            'Radiologie',
-            'Rhumatologie',
-            'Urologie'
-        ]
-        
-        return jsonify({'specialites': specialites}), 200
-        
-    except Exception as e:
-        print(f"Erreur lors de la récupération des spécialités: {e}")
+        body, _ = CatalogService.get(SPECIALITES, False, CatalogService.specialites)
+        return Response(body, mimetype='application/json'), 200
+        
+    except Exception:
+        logger.exception("Erreur lors de la récupération des spécialités")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/specialites', methods=['POST'])
 def create_specialite():
     """
-    Ajoute une nouvelle spécialité (peut être étendu pour stocker en DB)
+    Ajoute une nouvelle spécialité au catalogue
     """
     try:
         data = request.get_json()
-        specialite = data.get('nom')
+        specialite = (data.get('nom') or '').strip()
         
         if not specialite:
             return jsonify({'error': 'Nom de spécialité requis'}), 400
         
-        # Pour l'instant, on retourne juste un message
-        # En production, on pourrait stocker dans une collection spécialités
+        if not Specialite.create(specialite):
+            return jsonify({'error': 'Spécialité déjà existante'}), 409
+        
+        CatalogService.invalidate(SPECIALITES)
+        
         return jsonify({
-            'message': 'Spécialité ajoutée (à implémenter en base de données)',
+            'message': 'Spécialité ajoutée',
             'specialite': specialite
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création de la spécialité: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la création de la spécialité")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/clinique', methods=['GET'])
@@ -450,8 +471,8 @@ def get_clinique_config():
         
         return jsonify({'config': config}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération de la configuration: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération de la configuration")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/clinique', methods=['PUT'])
@@ -504,8 +525,89 @@ def update_clinique_config():
             }
             db.clinique_config.insert_one(default_config)
         
+        # Informations publiques servies depuis le cache
+        CatalogService.invalidate(CLINIQUE)
+        
         return jsonify({'message': 'Configuration mise à jour avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la mise à jour de la configuration: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la mise à jour de la configuration")
+        return jsonify({'error': 'Erreur serveur'}), 500
+
+@bp.route('/profiling', methods=['GET'])
+def get_profiling_status():
+    """
+    Récupère la commande de profilage en cours et les fichiers disponibles
+    """
+    try:
+        from services.profiler_service import ProfilerService
+        return jsonify(ProfilerService.status()), 200
+        
+    except Exception:
+        logger.exception("Erreur lors de la récupération du profilage")
+        return jsonify({'error': 'Erreur serveur'}), 500
+
+@bp.route('/profiling', methods=['POST'])
+def start_profiling():
+    """
+    Déclenche un profilage sur tous les workers
+    
+    Body JSON:
+        mode: 'requests' (cProfile des N prochaines requêtes d'un endpoint)
+              ou 'duration' (échantillonnage des piles pendant T secondes)
+        endpoint: Endpoint ciblé en mode requests (ex: medecin.get_dashboard)
+        count: Nombre de requêtes par worker (mode requests)
+        seconds, interval_ms: Durée et intervalle (mode duration)
+    """
+    try:
+        from services.profiler_service import ProfilerService
+        
+        data = request.get_json() or {}
+        try:
+            command = ProfilerService.arm(
+                data.get('mode'),
+                endpoint=data.get('endpoint'),
+                count=data.get('count', 1),
+                seconds=data.get('seconds', 10),
+                interval_ms=data.get('interval_ms', 5)
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({'message': 'Profilage déclenché', 'commande': command}), 201
+        
+    except Exception:
+        logger.exception("Erreur lors du déclenchement du profilage")
+        return jsonify({'error': 'Erreur serveur'}), 500
+
+@bp.route('/profiling', methods=['DELETE'])
+def stop_profiling():
+    """
+    Arrête le profilage en cours sur tous les workers
+    """
+    try:
+        from services.profiler_service import ProfilerService, MODE_STOP
+        ProfilerService.arm(MODE_STOP)
+        return jsonify({'message': 'Profilage arrêté'}), 200
+        
+    except Exception:
+        logger.exception("Erreur lors de l'arrêt du profilage")
+        return jsonify({'error': 'Erreur serveur'}), 500
+
+@bp.route('/profiling/<nom_fichier>', methods=['GET'])
+def download_profile(nom_fichier):
+    """
+    Télécharge un fichier de profilage (.prof pstats ou .folded collapsed-stack)
+    """
+    try:
+        from services.profiler_service import ProfilerService
+        
+        path = ProfilerService.file_path(nom_fichier)
+        if not path:
+            return jsonify({'error': 'Fichier introuvable'}), 404
+        
+        return send_file(path, as_attachment=True, download_name=nom_fichier)
+        
+    except Exception:
+        logger.exception("Erreur lors du téléchargement du profil")
         return jsonify({'error': 'Erreur serveur'}), 500
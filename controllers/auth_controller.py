@@ -6,10 +6,15 @@ Gère la connexion, déconnexion, réinitialisation de mot de passe
 from flask import Blueprint, request, jsonify, session
 from models.user import User
 from services.email_service import EmailService
+from services.password_service import PasswordServiceBusy
+from services.rate_limit_service import RateLimitService, client_ip
+from services.token_service import TokenService, AUTH_TOKENS_ENABLED, TYPE_REFRESH
 import secrets
 import string
+from config.logger import get_logger
 
 bp = Blueprint('auth', __name__)
+logger = get_logger(__name__)
 
 def generate_temp_password(length=12):
     """
@@ -32,6 +37,7 @@ def login():
     Body JSON:
         email: Email de l'utilisateur
         password: Mot de passe
+        mode: 'token' pour obtenir des jetons signés au lieu d'une session (optionnel)
     """
     try:
         data = request.get_json()
@@ -41,6 +47,11 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Email et mot de passe requis'}), 400
         
+        # Limitation des tentatives, avant toute recherche ou calcul bcrypt
+        retry_after = RateLimitService.check_login(client_ip(request), email)
+        if retry_after:
+            return jsonify({'error': 'Trop de tentatives, réessayez plus tard'}), 429, {'Retry-After': str(retry_after)}
+        
         # Recherche de l'utilisateur
         user = User.find_by_email(email)
         
@@ -54,6 +65,24 @@ def login():
         if not user.verify_password(password):
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
         
+        RateLimitService.login_succeeded(email)
+        
+        user_info = {
+            '_id': str(user._id),
+            'email': user.email,
+            'role': user.role,
+            'nom': user.nom,
+            'prenom': user.prenom
+        }
+        
+        # Mode sans état: jetons signés, aucune session créée
+        if AUTH_TOKENS_ENABLED and data.get('mode') == 'token':
+            return jsonify(dict(
+                TokenService.issue_tokens(user),
+                message='Connexion réussie',
+                user=user_info
+            )), 200
+        
         # Création de la session
         session['user_id'] = str(user._id)
         session['user_role'] = user.role
@@ -62,17 +91,14 @@ def login():
         
         return jsonify({
             'message': 'Connexion réussie',
-            'user': {
-                '_id': str(user._id),
-                'email': user.email,
-                'role': user.role,
-                'nom': user.nom,
-                'prenom': user.prenom
-            }
+            'user': user_info
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la connexion: {e}")
+    except PasswordServiceBusy:
+        # Trop de calculs bcrypt en attente: le client réessaie plus tard
+        return jsonify({'error': 'Service momentanément surchargé, réessayez'}), 503, {'Retry-After': '1'}
+    except Exception:
+        logger.exception("Erreur lors de la connexion")
         return jsonify({'error': 'Erreur serveur lors de la connexion'}), 500
 
 @bp.route('/logout', methods=['POST'])
@@ -81,12 +107,46 @@ def logout():
     Endpoint de déconnexion
     """
     try:
+        # En mode jeton, la déconnexion révoque tous les jetons de l'utilisateur
+        if getattr(session, 'stateless', False):
+            user = User.find_by_id(session.get('user_id'))
+            if user:
+                user.revoke_tokens()
+        
         session.clear()
         return jsonify({'message': 'Déconnexion réussie'}), 200
-    except Exception as e:
-        print(f"Erreur lors de la déconnexion: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la déconnexion")
         return jsonify({'error': 'Erreur serveur lors de la déconnexion'}), 500
 
+@bp.route('/refresh', methods=['POST'])
+def refresh_token():
+    """
+    Endpoint de renouvellement des jetons (mode sans état)
+    
+    Body JSON:
+        refresh_token: Jeton de rafraîchissement
+    """
+    try:
+        if not AUTH_TOKENS_ENABLED:
+            return jsonify({'error': 'Mode jeton désactivé'}), 404
+        
+        data = request.get_json() or {}
+        claims = TokenService.decode(data.get('refresh_token'), TYPE_REFRESH)
+        if not claims:
+            return jsonify({'error': 'Jeton invalide ou expiré'}), 401
+        
+        # Seul point de contrôle en base: compte actif et version non révoquée
+        user = User.find_by_id(claims['sub'])
+        if not user or not user.is_active or user.auth_version != claims.get('ver'):
+            return jsonify({'error': 'Jeton révoqué'}), 401
+        
+        return jsonify(TokenService.issue_tokens(user)), 200
+        
+    except Exception:
+        logger.exception("Erreur lors du renouvellement du jeton")
+        return jsonify({'error': 'Erreur serveur'}), 500
+
 @bp.route('/me', methods=['GET'])
 def get_current_user_info():
     """
@@ -105,8 +165,8 @@ def get_current_user_info():
             'user': user.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération de l'utilisateur: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération de l'utilisateur")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/forgot-password', methods=['POST'])
@@ -124,6 +184,10 @@ def forgot_password():
         if not email:
             return jsonify({'error': 'Email requis'}), 400
         
+        retry_after = RateLimitService.check_password_reset(client_ip(request), email)
+        if retry_after:
+            return jsonify({'error': 'Trop de demandes, réessayez plus tard'}), 429, {'Retry-After': str(retry_after)}
+        
         user = User.find_by_email(email)
         if not user:
             # Pour des raisons de sécurité, on ne révèle pas si l'email existe
@@ -143,8 +207,11 @@ def forgot_password():
         
         return jsonify({'message': 'Si cet email existe, un lien de réinitialisation a été envoyé'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la demande de réinitialisation: {e}")
+    except PasswordServiceBusy:
+        # Trop de calculs bcrypt en attente: le client réessaie plus tard
+        return jsonify({'error': 'Service momentanément surchargé, réessayez'}), 503, {'Retry-After': '1'}
+    except Exception:
+        logger.exception("Erreur lors de la demande de réinitialisation")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/change-password', methods=['POST'])
@@ -184,7 +251,10 @@ def change_password():
         
         return jsonify({'message': 'Mot de passe modifié avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors du changement de mot de passe: {e}")
+    except PasswordServiceBusy:
+        # Trop de calculs bcrypt en attente: le client réessaie plus tard
+        return jsonify({'error': 'Service momentanément surchargé, réessayez'}), 503, {'Retry-After': '1'}
+    except Exception:
+        logger.exception("Erreur lors du changement de mot de passe")
         return jsonify({'error': 'Erreur serveur'}), 500
 
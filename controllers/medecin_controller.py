@@ -11,14 +11,18 @@ from models.ordonnance import Ordonnance
 from models.document_medical import DocumentMedical
 from models.medecin import Medecin
 from models.notification import Notification
-from services.pdf_service import PDFService
+from services.dashboard_service import DashboardService
+from middleware.json_response import stream_json, JSON_STREAM_BATCH_SIZE
 from datetime import datetime
 from bson import ObjectId
+from itertools import islice
 import os
 import uuid
 from werkzeug.utils import secure_filename
+from config.logger import get_logger
 
 bp = Blueprint('medecin', __name__)
+logger = get_logger(__name__)
 
 # Configuration pour l'upload de fichiers (stockage MongoDB)
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
@@ -38,34 +42,37 @@ def get_dashboard():
         if not user_id:
             return jsonify({'error': 'Authentification requise'}), 401
         
-        # Récupérer les rendez-vous du jour
-        today = datetime.utcnow().date()
-        rdvs_today = RendezVous.find_by_date(today, medecin_id=user_id)
+        # Une agrégation sur les rendez-vous et le compteur de patients
+        return jsonify(DashboardService.medecin_summary(user_id)), 200
         
-        # Récupérer les rendez-vous à venir
-        from datetime import timedelta
-        next_week = today + timedelta(days=7)
-        rdvs_upcoming = []
-        for i in range(7):
-            date = today + timedelta(days=i)
-            rdvs = RendezVous.find_by_date(date, medecin_id=user_id)
-            rdvs_upcoming.extend([rdv for rdv in rdvs if rdv.statut in ['confirme', 'demande']])
-        
-        # Récupérer le nombre de patients
-        dossiers = DossierMedical.find_by_medecin(user_id, limit=1000)
-        patient_ids = list(set([str(dossier.patient_id) for dossier in dossiers]))
-        
-        return jsonify({
-            'rdvs_aujourdhui': len([rdv for rdv in rdvs_today if rdv.statut in ['confirme', 'demande']]),
-            'rdvs_prochains': len(rdvs_upcoming),
-            'nb_patients': len(patient_ids),
-            'rdvs_today': [rdv.to_dict() for rdv in rdvs_today[:5]]
-        }), 200
-        
-    except Exception as e:
-        print(f"Erreur lors de la récupération du dashboard: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération du dashboard")
         return jsonify({'error': 'Erreur serveur'}), 500
 
+def _iter_rendezvous_with_patients(rdvs):
+    """
+    Rendez-vous avec le patient, patients chargés par lots de JSON_STREAM_BATCH_SIZE
+    
+    Args:
+        rdvs: Itérable d'instances RendezVous
+    
+    Returns:
+        Générateur de dictionnaires
+    """
+    rdvs = iter(rdvs)
+    while True:
+        batch = list(islice(rdvs, JSON_STREAM_BATCH_SIZE))
+        if not batch:
+            return
+        
+        patients = Patient.find_by_ids({rdv.patient_id for rdv in batch if rdv.patient_id})
+        for rdv in batch:
+            rdv_dict = rdv.to_dict()
+            patient = patients.get(rdv.patient_id)
+            if patient:
+                rdv_dict['patient'] = patient.to_dict()
+            yield rdv_dict
+
 @bp.route('/rendezvous', methods=['GET'])
 def get_my_rendezvous():
     """
@@ -79,48 +86,38 @@ def get_my_rendezvous():
         # Récupérer les rendez-vous du médecin
         rdvs = RendezVous.find_by_medecin(user_id)
         
-        rdvs_list = []
-        for rdv in rdvs:
-            rdv_dict = rdv.to_dict()
-            # Ajouter les informations du patient
-            if rdv.patient_id:
-                patient = Patient.find_by_id(rdv.patient_id)
-                if patient:
-                    rdv_dict['patient'] = patient.to_dict()
-            rdvs_list.append(rdv_dict)
-        
-        return jsonify({'rendezvous': rdvs_list}), 200
+        # Informations des patients: une requête par lot au lieu d'une par rendez-vous
+        return stream_json('rendezvous', _iter_rendezvous_with_patients(rdvs)), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients', methods=['GET'])
 def get_my_patients():
     """
-    Récupère les patients du médecin (ceux avec qui il a eu des consultations)
+    Récupère les patients du médecin (rendez-vous, consultations ou ordonnances), paginés
     """
     try:
         user_id = session.get('user_id')
         if not user_id:
             return jsonify({'error': 'Authentification requise'}), 401
         
-        # Récupérer les dossiers médicaux du médecin pour obtenir les patients
-        dossiers = DossierMedical.find_by_medecin(user_id, limit=1000)
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
         
-        # Extraire les IDs de patients uniques
-        patient_ids = list(set([str(dossier.patient_id) for dossier in dossiers]))
+        # Jointure paginée depuis la collection medecin_patients
+        patients, total = Patient.find_by_medecin(user_id, limit=limit, skip=(page - 1) * limit)
         
-        patients_list = []
-        for patient_id in patient_ids:
-            patient = Patient.find_by_id(patient_id)
-            if patient:
-                patients_list.append(patient.to_dict())
-        
-        return jsonify({'patients': patients_list}), 200
+        return jsonify({
+            'patients': [patient.to_dict() for patient in patients],
+            'page': page,
+            'limit': limit,
+            'total': total
+        }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des patients: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des patients")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients/<patient_id>', methods=['GET'])
@@ -135,8 +132,8 @@ def get_patient_details(patient_id):
         
         return jsonify({'patient': patient.to_dict()}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération du patient: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération du patient")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients/<patient_id>/dossiers', methods=['GET'])
@@ -169,8 +166,8 @@ def get_patient_dossiers(patient_id):
         
         return jsonify({'dossiers': dossiers_list}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des dossiers: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des dossiers")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/dossiers', methods=['POST'])
@@ -259,10 +256,8 @@ def create_dossier():
             'dossier': dossier.to_dict()
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création du dossier: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors de la création du dossier")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/dossiers/<dossier_id>', methods=['PUT'])
@@ -307,8 +302,8 @@ def update_dossier(dossier_id):
             'dossier': dossier.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la mise à jour du dossier: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la mise à jour du dossier")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/ordonnances', methods=['POST'])
@@ -362,8 +357,8 @@ def create_ordonnance():
             'ordonnance': ordonnance.to_dict()
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création de l'ordonnance: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la création de l'ordonnance")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/ordonnances', methods=['GET'])
@@ -390,8 +385,8 @@ def get_all_ordonnances():
         
         return jsonify({'ordonnances': ordonnances_list}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des ordonnances: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des ordonnances")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/ordonnances/<ordonnance_id>/pdf', methods=['GET'])
@@ -450,10 +445,8 @@ def generate_ordonnance_pdf(ordonnance_id):
         
         return response
         
-    except Exception as e:
-        print(f"Erreur lors de la génération du PDF: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors de la génération du PDF")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/documents', methods=['POST'])
@@ -544,10 +537,8 @@ def upload_document():
             'document': document.to_dict()  # Sans les données du fichier
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de l'upload du document: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors de l'upload du document")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/documents/<document_id>', methods=['GET'])
@@ -584,10 +575,8 @@ def download_document(document_id):
         
         return response
         
-    except Exception as e:
-        print(f"Erreur lors du téléchargement du document: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors du téléchargement du document")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/documents/<document_id>', methods=['DELETE'])
@@ -613,10 +602,8 @@ def delete_document(document_id):
         
         return jsonify({'message': 'Document supprimé avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la suppression du document: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors de la suppression du document")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous/<rdv_id>/accepter', methods=['POST'])
@@ -657,10 +644,8 @@ def accepter_rendezvous(rdv_id):
             'rendezvous': rdv.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de l'acceptation du rendez-vous: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors de l'acceptation du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous/<rdv_id>/refuser', methods=['POST'])
@@ -704,10 +689,8 @@ def refuser_rendezvous(rdv_id):
             'rendezvous': rdv.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors du refus du rendez-vous: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors du refus du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/signature', methods=['POST'])
@@ -760,10 +743,8 @@ def upload_signature():
             'has_signature': True
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de l'upload de la signature: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors de l'upload de la signature")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/signature', methods=['GET'])
@@ -786,8 +767,8 @@ def get_signature():
             'has_signature': has_signature
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération de la signature: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération de la signature")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients/search', methods=['GET'])
@@ -804,18 +785,19 @@ def search_patients():
         if not query:
             return jsonify({'patients': []}), 200
         
-        patients = Patient.search(query)
-        
-        # Filtrer pour ne garder que les patients du médecin
-        dossiers = DossierMedical.find_by_medecin(user_id, limit=1000)
-        patient_ids_medecin = set([str(dossier.patient_id) for dossier in dossiers])
-        
-        patients_filtered = [p for p in patients if str(p._id) in patient_ids_medecin]
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
         
-        patients_list = [patient.to_dict() for patient in patients_filtered]
+        # Recherche limitée aux patients du médecin (jointure paginée)
+        patients, total = Patient.find_by_medecin(user_id, query_text=query, limit=limit, skip=(page - 1) * limit)
         
-        return jsonify({'patients': patients_list}), 200
+        return jsonify({
+            'patients': [patient.to_dict() for patient in patients],
+            'page': page,
+            'limit': limit,
+            'total': total
+        }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la recherche de patients: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la recherche de patients")
         return jsonify({'error': 'Erreur serveur'}), 500
@@ -11,10 +11,14 @@ from models.dossier_medical import DossierMedical
 from models.ordonnance import Ordonnance
 from models.document_medical import DocumentMedical
 from models.notification import Notification
+from services.dashboard_service import DashboardService
+from services.password_service import PasswordServiceBusy
 from datetime import datetime
 import os
+from config.logger import get_logger
 
 bp = Blueprint('patient', __name__)
+logger = get_logger(__name__)
 
 @bp.route('/inscription', methods=['POST'])
 def register():
@@ -73,8 +77,11 @@ def register():
             'user': user.to_dict()
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de l'inscription: {e}")
+    except PasswordServiceBusy:
+        # Trop de calculs bcrypt en attente: le client réessaie plus tard
+        return jsonify({'error': 'Service momentanément surchargé, réessayez'}), 503, {'Retry-After': '1'}
+    except Exception:
+        logger.exception("Erreur lors de l'inscription")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/dashboard', methods=['GET'])
@@ -87,46 +94,15 @@ def get_dashboard():
         if not user_id:
             return jsonify({'error': 'Authentification requise'}), 401
         
-        patient = Patient.find_by_user_id(user_id)
-        if not patient:
+        # Requêtes indépendantes exécutées en parallèle, totaux par comptage
+        dashboard = DashboardService.patient_summary(user_id)
+        if dashboard is None:
             return jsonify({'error': 'Patient introuvable'}), 404
         
-        # Prochains rendez-vous
-        rdvs = RendezVous.find_by_patient(str(patient._id), statut=RendezVous.STATUT_CONFIRME)
-        prochains_rdv = [rdv.to_dict() for rdv in rdvs[:5]]  # 5 prochains
-        
-        # Dernières ordonnances
-        ordonnances = Ordonnance.find_by_patient(str(patient._id), limit=5)
-        dernieres_ordonnances = [ord.to_dict() for ord in ordonnances]
-        
-        # Derniers documents
-        documents = DocumentMedical.find_by_patient(str(patient._id), limit=5)
-        derniers_documents = [doc.to_dict() for doc in documents]
-        
-        # Notifications non lues
-        notifications_count = Notification.count_unread(user_id)
-        
-        # Compter les dossiers
-        dossiers = DossierMedical.find_by_patient(str(patient._id))
-        
-        dashboard = {
-            'patient': patient.to_dict(),
-            'prochains_rendezvous': prochains_rdv,
-            'dernieres_ordonnances': dernieres_ordonnances,
-            'derniers_documents': derniers_documents,
-            'notifications_non_lues': notifications_count,
-            'dossiers': {
-                'total': len(dossiers)
-            },
-            'ordonnances': {
-                'total': len(ordonnances)
-            }
-        }
-        
         return jsonify(dashboard), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération du dashboard: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération du dashboard")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous', methods=['GET'])
@@ -165,8 +141,8 @@ def get_my_rendezvous():
         
         return jsonify({'rendezvous': rdvs_list}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous', methods=['POST'])
@@ -212,8 +188,8 @@ def create_rendezvous():
             'rendezvous': rdv.to_dict()
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création du rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la création du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous/<rdv_id>', methods=['DELETE'])
@@ -242,8 +218,8 @@ def cancel_rendezvous(rdv_id):
         
         return jsonify({'message': 'Rendez-vous annulé avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de l'annulation du rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de l'annulation du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/dossiers', methods=['GET'])
@@ -285,8 +261,8 @@ def get_my_dossiers():
         
         return jsonify({'dossiers': dossiers_list}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des dossiers: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des dossiers")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/ordonnances', methods=['GET'])
@@ -318,8 +294,8 @@ def get_my_ordonnances():
         
         return jsonify({'ordonnances': ordonnances_list}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des ordonnances: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des ordonnances")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/documents', methods=['GET'])
@@ -342,8 +318,8 @@ def get_my_documents():
         
         return jsonify({'documents': documents_list}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des documents: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des documents")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/ordonnances/<ordonnance_id>/pdf', methods=['GET'])
@@ -404,10 +380,8 @@ def download_ordonnance_pdf(ordonnance_id):
         
         return response
         
-    except Exception as e:
-        print(f"Erreur lors de la génération du PDF: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors de la génération du PDF")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/documents/<document_id>/download', methods=['GET'])
@@ -448,10 +422,8 @@ def download_document(document_id):
         
         return response
         
-    except Exception as e:
-        print(f"Erreur lors du téléchargement du document: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Erreur lors du téléchargement du document")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/notifications', methods=['GET'])
@@ -475,8 +447,8 @@ def get_notifications():
         
         return jsonify({'notifications': notifications_list}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des notifications: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des notifications")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/notifications/<notif_id>/read', methods=['POST'])
@@ -503,8 +475,8 @@ def mark_notification_read(notif_id):
         
         return jsonify({'message': 'Notification marquée comme lue'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la mise à jour de la notification: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la mise à jour de la notification")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/profil', methods=['GET'])
@@ -523,8 +495,8 @@ def get_profil():
         
         return jsonify({'patient': patient.to_dict()}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération du profil: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération du profil")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/profil', methods=['PUT'])
@@ -559,6 +531,6 @@ def update_profil():
             'patient': patient.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la mise à jour du profil: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la mise à jour du profil")
         return jsonify({'error': 'Erreur serveur'}), 500
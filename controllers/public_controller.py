@@ -2,13 +2,36 @@
 Contrôleur public - Informations accessibles sans authentification
 """
 
-from flask import Blueprint, jsonify, request
-from models.medecin import Medecin
-from models.user import User
+from flask import Blueprint, Response, jsonify, request
 from models.rendezvous import RendezVous
+from services.catalog_service import CatalogService, CLINIQUE, MEDECINS, SPECIALITES
 from datetime import datetime, timedelta
+from config.logger import get_logger
+import os
 
 bp = Blueprint('public', __name__)
+logger = get_logger(__name__)
+
+# Durée de réutilisation des catalogues publics par les navigateurs et CDN (secondes)
+PUBLIC_CACHE_MAX_AGE = int(os.getenv('PUBLIC_CACHE_MAX_AGE', 60))
+
+def _catalog_response(catalog, variant, loader):
+    """
+    Réponse d'un catalogue public depuis le cache, avec ETag et Cache-Control
+    
+    Les navigateurs et CDN réutilisent la réponse pendant PUBLIC_CACHE_MAX_AGE
+    secondes, puis la revalident (304 sans corps si l'ETag n'a pas changé)
+    """
+    body, etag = CatalogService.get(catalog, variant, loader)
+    
+    # Comparaison faible: la compression rend l'ETag envoyé faible (W/)
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={PUBLIC_CACHE_MAX_AGE}'
+    return response
 
 @bp.route('/info', methods=['GET'])
 def get_clinic_info():
@@ -16,53 +39,10 @@ def get_clinic_info():
     Endpoint pour récupérer les informations publiques de la clinique
     """
     try:
-        from config.database import get_db
-        db = get_db()
-        
-        # Récupérer la configuration depuis la base de données
-        config = db.clinique_config.find_one({})
-        
-        if not config:
-            # Configuration par défaut si aucune config n'existe
-            clinic_info = {
-                'nom': 'Clinique Médicale',
-                'description': 'Votre santé est notre priorité. Nous offrons des soins médicaux de qualité avec une équipe de professionnels expérimentés.',
-                'adresse': '123 Rue de la Santé, 75000 Paris',
-                'telephone': '+33 1 23 45 67 89',
-                'email': 'contact@clinique-medicale.fr',
-                'horaires': {
-                    'lundi': '08:00 - 18:00',
-                    'mardi': '08:00 - 18:00',
-                    'mercredi': '08:00 - 18:00',
-                    'jeudi': '08:00 - 18:00',
-                    'vendredi': '08:00 - 18:00',
-                    'samedi': '09:00 - 13:00',
-                    'dimanche': 'Fermé'
-                },
-                'services': [
-                    'Consultation générale',
-                    'Médecine spécialisée',
-                    'Examens médicaux',
-                    'Suivi médical',
-                    'Urgences'
-                ]
-            }
-        else:
-            # Utiliser la configuration de la base de données
-            clinic_info = {
-                'nom': config.get('nom', 'Clinique Médicale'),
-                'description': config.get('description', ''),
-                'adresse': config.get('adresse', ''),
-                'telephone': config.get('telephone', ''),
-                'email': config.get('email', ''),
-                'horaires': config.get('horaires', {}),
-                'services': config.get('services', [])
-            }
-        
-        return jsonify(clinic_info), 200
-        
-    except Exception as e:
-        print(f"Erreur lors de la récupération des informations: {e}")
+        return _catalog_response(CLINIQUE, None, CatalogService.clinique_info)
+    
+    except Exception:
+        logger.exception("Erreur lors de la récupération des informations")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/medecins', methods=['GET'])
@@ -71,30 +51,12 @@ def get_medecins():
     Endpoint pour récupérer la liste des médecins disponibles
     """
     try:
-        specialite = request.args.get('specialite')
-        
-        if specialite:
-            medecins = Medecin.find_by_specialite(specialite)
-        else:
-            medecins = Medecin.find_all()
-        
-        medecins_list = []
-        for medecin in medecins:
-            user = User.find_by_id(medecin.user_id)
-            if user and user.is_active:
-                medecins_list.append({
-                    '_id': str(medecin._id),
-                    'user_id': str(medecin.user_id),
-                    'nom': user.nom,
-                    'prenom': user.prenom,
-                    'specialite': medecin.specialite,
-                    'numero_ordre': medecin.numero_ordre
-                })
+        specialite = request.args.get('specialite') or None
         
-        return jsonify({'medecins': medecins_list}), 200
-        
-    except Exception as e:
-        print(f"Erreur lors de la récupération des médecins: {e}")
+        return _catalog_response(MEDECINS, specialite, lambda: CatalogService.medecins(specialite))
+    
+    except Exception:
+        logger.exception("Erreur lors de la récupération des médecins")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/medecins/<medecin_id>/disponibilite', methods=['GET'])
@@ -133,38 +95,24 @@ def get_medecin_disponibilite(medecin_id):
             'medecin_id': medecin_id,
             'creneaux_disponibles': creneaux_disponibles
         }), 200
-        
-    except Exception as e:
-        print(f"Erreur lors de la récupération de la disponibilité: {e}")
+    
+    except Exception:
+        logger.exception("Erreur lors de la récupération de la disponibilité")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/specialites', methods=['GET'])
 def get_specialites():
     """
-    Endpoint pour récupérer la liste des spécialités disponibles
+    Endpoint pour récupérer la liste des spécialités
+    
+    Query params:
+        disponibles: true pour les seules spécialités ayant un médecin actif
     """
     try:
-        # Liste des spécialités (peut être stockée en base de données)
-        specialites = [
-            'Médecine générale',
-            'Cardiologie',
-            'Dermatologie',
-            'Endocrinologie',
-            'Gastro-entérologie',
-            'Gynécologie',
-            'Neurologie',
-            'Ophtalmologie',
-            'Orthopédie',
-            'Pédiatrie',
-            'Pneumologie',
-            'Psychiatrie',
-            'Radiologie',
-            'Rhumatologie',
-            'Urologie'
-        ]
-        
-        return jsonify({'specialites': specialites}), 200
+        disponibles = request.args.get('disponibles', 'false').lower() == 'true'
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des spécialités: {e}")
+        return _catalog_response(SPECIALITES, disponibles, lambda: CatalogService.specialites(disponibles))
+    
+    except Exception:
+        logger.exception("Erreur lors de la récupération des spécialités")
         return jsonify({'error': 'Erreur serveur'}), 500
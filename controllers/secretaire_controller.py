@@ -8,12 +8,16 @@ from models.patient import Patient
 from models.rendezvous import RendezVous
 from models.notification import Notification
 from services.email_service import EmailService
+from services.password_service import PasswordServiceBusy
 from datetime import datetime
 from bson import ObjectId
 import secrets
 import string
+from config.logger import get_logger
+from middleware.json_response import stream_json
 
 bp = Blueprint('secretaire', __name__)
+logger = get_logger(__name__)
 
 def generate_temp_password(length=12):
     """Génère un mot de passe temporaire"""
@@ -52,8 +56,8 @@ def get_dashboard():
         
         return jsonify(dashboard), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération du dashboard: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération du dashboard")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients', methods=['GET'])
@@ -62,17 +66,23 @@ def get_all_patients():
     Récupère tous les patients avec pagination
     """
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = max(request.args.get('limit', 20, type=int), 0)
         search = request.args.get('search', '')
         
         skip = (page - 1) * limit
         
-        if search:
-            patients = Patient.search(search)
-        else:
-            patients = Patient.find_all(limit=limit, skip=skip)
-        
+        if not search:
+            # Liste diffusée au fil du curseur (exports volumineux)
+            patients = Patient.iter_all(limit=limit, skip=skip)
+            return stream_json(
+                'patients',
+                (patient.to_dict() for patient in patients),
+                meta={'page': page, 'limit': limit},
+                count_key='total'
+            ), 200
+        
+        patients = Patient.search(search)
         patients_list = [patient.to_dict() for patient in patients]
         
         return jsonify({
@@ -82,8 +92,8 @@ def get_all_patients():
             'total': len(patients_list)
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des patients: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des patients")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients/<patient_id>', methods=['GET'])
@@ -98,8 +108,8 @@ def get_patient(patient_id):
         
         return jsonify({'patient': patient.to_dict()}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération du patient: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération du patient")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients', methods=['POST'])
@@ -139,8 +149,8 @@ def create_patient():
             'patient': patient.to_dict()
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création du patient: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la création du patient")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients/<patient_id>', methods=['PUT'])
@@ -181,8 +191,8 @@ def update_patient(patient_id):
             'patient': patient.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la mise à jour du patient: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la mise à jour du patient")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients/<patient_id>/compte', methods=['POST'])
@@ -237,8 +247,8 @@ def create_patient_account(patient_id):
                 patient.email,
                 temp_password
             )
-        except Exception as e:
-            print(f"Erreur lors de l'envoi de l'email: {e}")
+        except Exception:
+            logger.exception("Erreur lors de l'envoi de l'email")
             # Ne pas bloquer si l'email échoue
         
         # Créer une notification
@@ -256,8 +266,11 @@ def create_patient_account(patient_id):
             'password': temp_password  # Retourner pour affichage si nécessaire
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création du compte patient: {e}")
+    except PasswordServiceBusy:
+        # Trop de calculs bcrypt en attente: le client réessaie plus tard
+        return jsonify({'error': 'Service momentanément surchargé, réessayez'}), 503, {'Retry-After': '1'}
+    except Exception:
+        logger.exception("Erreur lors de la création du compte patient")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/patients/<patient_id>/compte', methods=['DELETE'])
@@ -277,11 +290,12 @@ def deactivate_patient_account(patient_id):
         if user:
             user.is_active = False
             user.update()
+            user.revoke_tokens()
         
         return jsonify({'message': 'Compte patient désactivé avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la désactivation du compte: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la désactivation du compte")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous', methods=['GET'])
@@ -309,12 +323,16 @@ def get_all_rendezvous():
         if statut:
             query['statut'] = statut
         
-        rdvs_data = db.rendezvous.find(query).sort('date_rdv', 1).limit(100)
+        rdvs_data = list(db.rendezvous.find(query).sort('date_rdv', 1).limit(100))
+        
+        # Patients et médecins chargés en deux requêtes pour les 100 rendez-vous
+        patients = Patient.find_by_ids({rdv_data['patient_id'] for rdv_data in rdvs_data if rdv_data.get('patient_id')})
+        medecins = User.find_by_ids({rdv_data['medecin_id'] for rdv_data in rdvs_data if rdv_data.get('medecin_id')})
         
         rdvs = []
         for rdv_data in rdvs_data:
-            patient = Patient.find_by_id(rdv_data['patient_id'])
-            medecin_user = User.find_by_id(rdv_data['medecin_id'])
+            patient = patients.get(rdv_data.get('patient_id'))
+            medecin_user = medecins.get(rdv_data.get('medecin_id'))
             
             rdv_dict = {
                 '_id': str(rdv_data['_id']),
@@ -332,8 +350,8 @@ def get_all_rendezvous():
         
         return jsonify({'rendezvous': rdvs}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la récupération des rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la récupération des rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous', methods=['POST'])
@@ -393,16 +411,16 @@ def create_rendezvous():
                         heure_rdv,
                         medecin_nom
                     )
-                except Exception as e:
-                    print(f"Erreur lors de l'envoi de l'email: {e}")
+                except Exception:
+                    logger.exception("Erreur lors de l'envoi de l'email")
         
         return jsonify({
             'message': 'Rendez-vous créé avec succès',
             'rendezvous': rdv.to_dict()
         }), 201
         
-    except Exception as e:
-        print(f"Erreur lors de la création du rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la création du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous/<rdv_id>', methods=['PUT'])
@@ -435,8 +453,8 @@ def update_rendezvous(rdv_id):
             'rendezvous': rdv.to_dict()
         }), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la mise à jour du rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la mise à jour du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous/<rdv_id>/confirmer', methods=['POST'])
@@ -478,13 +496,13 @@ def confirm_rendezvous(rdv_id):
                         rdv.heure_rdv,
                         medecin_nom
                     )
-                except Exception as e:
-                    print(f"Erreur lors de l'envoi de l'email: {e}")
+                except Exception:
+                    logger.exception("Erreur lors de l'envoi de l'email")
         
         return jsonify({'message': 'Rendez-vous confirmé avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de la confirmation du rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de la confirmation du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
 
 @bp.route('/rendezvous/<rdv_id>', methods=['DELETE'])
@@ -513,6 +531,6 @@ def cancel_rendezvous(rdv_id):
         
         return jsonify({'message': 'Rendez-vous annulé avec succès'}), 200
         
-    except Exception as e:
-        print(f"Erreur lors de l'annulation du rendez-vous: {e}")
+    except Exception:
+        logger.exception("Erreur lors de l'annulation du rendez-vous")
         return jsonify({'error': 'Erreur serveur'}), 500
@@ -0,0 +1,133 @@
+"""
+Configuration gunicorn de production (gunicorn -c gunicorn.conf.py wsgi:app)
+
+Workers et threads sont dimensionnés d'après le nombre de CPU, surchargeables
+par l'environnement. L'application est chargée une fois dans le processus
+maître (preload) puis partagée par fork: le client MongoDB du maître est
+fermé avant chaque fork et chaque worker ouvre le sien à sa première requête
+(config/database.py). Les métriques des workers sont écrites dans
+METRICS_MULTIPROC_DIR, vidé au démarrage du serveur
+
+gevent n'est pas pris en charge en production: la bibliothèque standard
+patchée transforme les pools de threads de l'application (bcrypt, envoi des
+emails, tableaux de bord) en greenlets, et un calcul bcrypt (~250 ms) bloque
+alors toutes les requêtes du worker. Utiliser gthread (défaut) ou sync
+"""
+
+import glob
+import os
+import sys
+
+CPU_COUNT = os.cpu_count() or 1
+
+# sync: un thread par worker; gthread: threads par worker (attentes MongoDB/SMTP
+# en parallèle); gevent: greenlets (pip install gevent, sans preload), non pris
+# en charge: bcrypt bloque la boucle du worker
+GUNICORN_WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+if GUNICORN_WORKER_CLASS == 'sync':
+    _default_workers, _default_threads = CPU_COUNT * 2 + 1, 1
+elif GUNICORN_WORKER_CLASS == 'gevent':
+    _default_workers, _default_threads = CPU_COUNT, 1
+else:
+    _default_workers, _default_threads = max(2, CPU_COUNT), 8
+
+# WEB_CONCURRENCY: variable standard des hébergeurs (Render, Heroku)
+GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', os.getenv('WEB_CONCURRENCY', _default_workers)))
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', _default_threads))
+# Connexions simultanées par worker gevent
+GUNICORN_WORKER_CONNECTIONS = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', 30))
+# Recyclage des workers (fuites mémoire), avec dispersion pour ne pas tous les redémarrer ensemble
+GUNICORN_MAX_REQUESTS = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+GUNICORN_MAX_REQUESTS_JITTER = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+# gevent doit patcher la bibliothèque standard avant l'import de pymongo: pas de preload
+GUNICORN_PRELOAD = (os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+                    and GUNICORN_WORKER_CLASS != 'gevent')
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+worker_class = GUNICORN_WORKER_CLASS
+workers = GUNICORN_WORKERS
+threads = GUNICORN_THREADS
+worker_connections = GUNICORN_WORKER_CONNECTIONS
+timeout = GUNICORN_TIMEOUT
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+max_requests = GUNICORN_MAX_REQUESTS
+max_requests_jitter = GUNICORN_MAX_REQUESTS_JITTER
+preload_app = GUNICORN_PRELOAD
+
+# Fichiers de contrôle des workers en mémoire (un disque lent bloque le heartbeat)
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+# Journal des requêtes écrit par l'application (middleware/request_log.py)
+accesslog = None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+def on_starting(server):
+    """
+    Démarrage du maître: fichiers des workers d'un déploiement précédent supprimés
+    """
+    metrics_dir = os.getenv('METRICS_MULTIPROC_DIR')
+    if metrics_dir and os.path.isdir(metrics_dir):
+        # Compteurs d'anciens processus: /metrics repart de zéro
+        for path in glob.glob(os.path.join(metrics_dir, 'metrics_*.json*')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    from services.profiler_service import PROFILE_DIR, CONTROL_FILE
+    # Commande de profilage d'avant le redémarrage (les profils déjà produits sont conservés)
+    try:
+        os.remove(os.path.join(PROFILE_DIR, CONTROL_FILE))
+    except OSError:
+        pass
+    
+    server.log.info(
+        "Configuration: %s workers %s, %s threads, preload=%s",
+        workers, worker_class, threads, preload_app
+    )
+    if worker_class == 'gevent':
+        server.log.warning(
+            "Workers gevent non pris en charge: les calculs bcrypt bloquent toutes les requêtes du worker"
+        )
+
+def pre_fork(server, worker):
+    """
+    Avant chaque fork: client MongoDB du maître fermé (connexions et threads
+    de surveillance ne doivent pas être hérités par le worker)
+    
+    Sans preload, le maître n'a jamais importé l'application: rien à fermer
+    """
+    database = sys.modules.get('config.database')
+    if database is not None:
+        database.close_client()
+
+def post_fork(server, worker):
+    """
+    Dans le worker: état du processus maître abandonné
+    
+    Le client MongoDB, les pools de threads et les métriques sont recréés
+    à la première utilisation (contrôle du pid)
+    """
+    server.log.info("Worker démarré (pid %s)", worker.pid)
+
+def worker_exit(server, worker):
+    """
+    Arrêt d'un worker: dernières valeurs des métriques écrites (les compteurs
+    des workers arrêtés restent dans les totaux de /metrics)
+    """
+    # Modules déjà chargés seulement (worker arrêté avant sa première requête)
+    metrics_service = sys.modules.get('services.metrics_service')
+    if metrics_service is not None:
+        try:
+            metrics_service.metrics.flush(force=True)
+        except OSError:
+            pass
+    
+    database = sys.modules.get('config.database')
+    if database is not None:
+        database.close_client()
@@ -0,0 +1,225 @@
+"""
+Passerelle ASGI vers l'application Flask (WSGI)
+
+Un serveur ASGI (uvicorn) accepte et lit les requêtes dans sa boucle
+d'événements; chaque requête est ensuite exécutée par l'application Flask
+dans un pool de ASGI_THREADS threads. Les attentes réseau (MongoDB, SMTP)
+libèrent le GIL: un worker traite autant de requêtes simultanées que de
+threads, et les connexions lentes (corps en cours d'envoi, keep-alive)
+n'occupent aucun thread. Les réponses diffusées (stream_json) sont
+envoyées fragment par fragment
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Threads exécutant les requêtes par worker
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 32))
+# Taille (octets) au-delà de laquelle le corps des requêtes est écrit sur disque
+ASGI_BODY_SPOOL_SIZE = int(os.getenv('ASGI_BODY_SPOOL_SIZE', 1024 * 1024))
+
+_END = object()
+
+def _next_chunk(iterator):
+    # next() sans StopIteration (ne peut pas traverser un Future asyncio)
+    return next(iterator, _END)
+
+class WSGIBridge:
+    """
+    Application ASGI exécutant une application WSGI dans un pool de threads
+    
+    Args:
+        wsgi_app: Application WSGI (Flask)
+        threads: Taille du pool (ASGI_THREADS par défaut)
+    """
+    
+    def __init__(self, wsgi_app, threads=None):
+        self.wsgi_app = wsgi_app
+        self.threads = threads or ASGI_THREADS
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+    
+    def _get_executor(self):
+        # Pool créé dans chaque worker (les threads ne survivent pas au fork)
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='asgi')
+                self._executor_pid = os.getpid()
+            return self._executor
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        else:
+            raise NotImplementedError(f"Type de connexion ASGI non supporté: {scope['type']}")
+    
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                from config.database import close_client
+                
+                def shutdown():
+                    # Attente des requêtes en cours hors de la boucle d'événements
+                    if self._executor is not None:
+                        self._executor.shutdown(wait=True)
+                    close_client()
+                
+                await asyncio.get_running_loop().run_in_executor(None, shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def _read_body(self, receive):
+        """
+        Corps complet de la requête (en mémoire, puis sur disque au-delà de ASGI_BODY_SPOOL_SIZE)
+        """
+        body = tempfile.SpooledTemporaryFile(max_size=ASGI_BODY_SPOOL_SIZE)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                body.seek(0)
+                return body
+    
+    def _environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            # Corps complet et borné: lisible sans Content-Length (envoi chunked)
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False
+        }
+        
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1')
+            value = value.decode('latin-1')
+            if name == 'content-type':
+                key = 'CONTENT_TYPE'
+            elif name == 'content-length':
+                key = 'CONTENT_LENGTH'
+            else:
+                key = 'HTTP_' + name.upper().replace('-', '_')
+            # En-têtes répétés: valeurs jointes (RFC 9110)
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+    
+    async def _http(self, scope, receive, send):
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        # Contexte de l'appelant propagé aux threads du pool (comme asyncio.to_thread),
+        # partagé par les étapes successives de la requête
+        context = contextvars.copy_context()
+        # Dernière étape soumise au pool (poursuivie par son thread si la requête est annulée)
+        pending = None
+        
+        def in_pool(function, *args):
+            nonlocal pending
+            pending = executor.submit(context.run, function, *args)
+            return asyncio.wrap_future(pending, loop=loop)
+        
+        started = {}
+        written = []
+        
+        def start_response(status, headers, exc_info=None):
+            if exc_info and started.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+            return written.append
+        
+        def run():
+            result = self.wsgi_app(self._environ(scope, body), start_response)
+            # Longueur connue (cas courant): corps complet envoyé sans autre aller-retour avec le pool
+            if any(name == b'content-length' for name, _ in started.get('headers', ())):
+                try:
+                    return list(result), None
+                finally:
+                    close = getattr(result, 'close', None)
+                    if close is not None:
+                        close()
+            # Réponse diffusée: premier fragment produit avant l'envoi des en-têtes
+            iterator = iter(result)
+            first = _next_chunk(iterator)
+            return ([] if first is _END else [first]), (result, iterator)
+        
+        streamed = None
+        try:
+            try:
+                chunks, streamed = await in_pool(run)
+            except Exception:
+                logger.exception("Erreur de l'application WSGI")
+                await send({
+                    'type': 'http.response.start',
+                    'status': 500,
+                    'headers': [(b'content-type', b'text/plain; charset=utf-8')]
+                })
+                await send({'type': 'http.response.body', 'body': b'Internal Server Error'})
+                return
+            
+            started['sent'] = True
+            await send({'type': 'http.response.start', 'status': started['status'], 'headers': started['headers']})
+            for chunk in written + chunks:
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            
+            if streamed is not None:
+                while True:
+                    chunk = await in_pool(_next_chunk, streamed[1])
+                    if chunk is _END:
+                        break
+                    if chunk:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            if pending is not None and not pending.done():
+                # Requête annulée (client déconnecté) pendant une étape du pool: son thread
+                # est encore dans le contexte et le générateur, attendus avant close()
+                await asyncio.wait([asyncio.wrap_future(pending, loop=loop)])
+            if streamed is None and pending is not None and not pending.cancelled() and pending.exception() is None:
+                # Annulation pendant run(): réponse diffusée produite mais jamais reçue
+                streamed = pending.result()[1]
+            if streamed is not None:
+                close = getattr(streamed[0], 'close', None)
+                if close is not None:
+                    # Fin du générateur (curseur MongoDB, contexte de requête) dans un thread du pool
+                    await in_pool(close)
+            body.close()
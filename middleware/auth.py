@@ -32,6 +32,12 @@ def role_required(*allowed_roles):
             if not user_id:
                 return jsonify({'error': 'Authentification requise'}), 401
             
+            # Mode jeton: le rôle signé suffit, aucune lecture en base
+            if getattr(session, 'stateless', False):
+                if session.get('user_role') not in allowed_roles:
+                    return jsonify({'error': 'Accès refusé. Permissions insuffisantes'}), 403
+                return f(*args, **kwargs)
+            
             user = User.find_by_id(user_id)
             if not user:
                 return jsonify({'error': 'Utilisateur introuvable'}), 404
@@ -0,0 +1,161 @@
+"""
+Compression des réponses HTTP (gzip, brotli si installé)
+
+L'encodage est négocié avec l'en-tête Accept-Encoding. Les réponses trop
+petites, déjà compressées (images, PDF, archives) ou servies depuis un
+fichier (send_file) sont envoyées telles quelles. Les listes diffusées
+(stream_json) sont compressées au fil de l'eau. Les variantes compressées
+des réponses publiques munies d'un ETag sont conservées en cache
+"""
+
+from collections import OrderedDict
+from flask import request
+import gzip
+import os
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Dépendance optionnelle: gzip seul
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+# Taille minimale (octets) en dessous de laquelle la compression ne paie pas
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+# Qualité brotli adaptée aux réponses dynamiques (11 = maximum, trop lent)
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+# Variantes compressées conservées (réponses publiques avec ETag)
+COMPRESS_CACHE_SIZE = int(os.getenv('COMPRESS_CACHE_SIZE', 256))
+
+# Types déjà compressés: une seconde compression coûte du CPU sans gain
+INCOMPRESSIBLE_TYPES = ('image/', 'video/', 'audio/', 'application/pdf', 'application/zip',
+                        'application/gzip', 'application/x-gzip', 'application/octet-stream')
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _accepted_encodings():
+    """
+    Encodages acceptés par le client (q > 0), d'après Accept-Encoding
+    """
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+def _choose_encoding(streamed):
+    accepted = _accepted_encodings()
+    # brotli: meilleur taux sur le JSON; gzip pour les réponses diffusées
+    if brotli is not None and not streamed and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+def _compress_stream(chunks, level):
+    """
+    Compression gzip d'une réponse diffusée, vidée à chaque fragment
+    (le client reçoit les données au même rythme que sans compression)
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: format gzip
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+def _cache_key(response, encoding):
+    """
+    Clé de cache des réponses publiques munies d'un ETag (None sinon)
+    """
+    etag, _ = response.get_etag()
+    if not etag or 'public' not in response.headers.get('Cache-Control', ''):
+        return None
+    return (request.path, etag, encoding)
+
+def _cached_compress(response, data, encoding):
+    key = _cache_key(response, encoding)
+    if key is None:
+        return _compress(data, encoding)
+    
+    with _cache_lock:
+        body = _cache.get(key)
+        if body is not None:
+            _cache.move_to_end(key)
+            return body
+    
+    body = _compress(data, encoding)
+    with _cache_lock:
+        _cache[key] = body
+        while len(_cache) > COMPRESS_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return body
+
+def _compress_response(response):
+    if (request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough or 'Content-Encoding' in response.headers):
+        return response
+    
+    mimetype = response.mimetype or ''
+    if mimetype.startswith(INCOMPRESSIBLE_TYPES):
+        return response
+    
+    # La réponse varie selon l'encodage accepté (caches intermédiaires)
+    response.vary.add('Accept-Encoding')
+    
+    encoding = _choose_encoding(response.is_streamed)
+    if encoding is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, COMPRESS_GZIP_LEVEL)
+        response.headers.pop('Content-Length', None)
+        response.headers['Content-Encoding'] = encoding
+        return response
+    
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(_cached_compress(response, data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # ETag faible: le corps compressé diffère octet par octet du corps d'origine
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_compression(app):
+    """
+    Compresse les réponses de l'application
+    
+    À enregistrer avant les autres hooks after_request (exécutés en ordre
+    inverse): la compression s'applique au corps et aux en-têtes finaux
+    """
+    if not COMPRESSION_ENABLED:
+        return
+    
+    app.after_request(_compress_response)
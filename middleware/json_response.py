@@ -0,0 +1,123 @@
+"""
+Encodage JSON des réponses de l'API
+
+orjson (si installé) remplace l'encodeur standard de jsonify; ObjectId et
+dates sont encodés nativement (identifiants en texte, dates ISO). Les
+grandes listes peuvent être diffusées élément par élément depuis un curseur
+MongoDB (stream_json) au lieu d'être construites en mémoire
+"""
+
+from datetime import date, datetime
+from flask import Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from bson import ObjectId
+from itertools import islice
+import json
+import os
+
+from config.logger import get_logger
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle: encodeur standard
+    orjson = None
+
+logger = get_logger(__name__)
+
+# Éléments encodés par fragment de la réponse diffusée
+JSON_STREAM_BATCH_SIZE = int(os.getenv('JSON_STREAM_BATCH_SIZE', 100))
+
+def _default(value):
+    """
+    Types non natifs du JSON (ObjectId, dates)
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+if orjson is not None:
+    def dumps(obj):
+        """
+        Encode obj en JSON (bytes UTF-8)
+        """
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        """
+        Encode obj en JSON (bytes UTF-8)
+        """
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    loads = json.loads
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Fournisseur JSON de Flask (jsonify, request.get_json) basé sur dumps/loads
+    """
+    
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Corps en bytes: pas de passage par une chaîne intermédiaire
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+def stream_json(key, items, meta=None, count_key=None):
+    """
+    Réponse {key: [...], **meta} diffusée au fil de l'itération de items
+    
+    Les éléments sont encodés par lots de JSON_STREAM_BATCH_SIZE: la mémoire
+    reste bornée quel que soit le nombre d'éléments et le premier octet part
+    dès le premier lot. Le premier lot est lu avant de rendre la réponse:
+    une erreur MongoDB à l'ouverture du curseur remonte au contrôleur (500)
+    et la requête principale figure dans Server-Timing et le journal des
+    requêtes lentes. Les lots suivants (getMore) ne sont plus mesurés
+    
+    Args:
+        key: Clé de la liste dans l'objet JSON
+        items: Itérable de dictionnaires (ex: générateur sur un curseur)
+        meta: Autres clés de l'objet, écrites après la liste
+        count_key: Clé de meta recevant le nombre d'éléments diffusés
+    
+    Returns:
+        Response Flask diffusée
+    """
+    meta = dict(meta or {})
+    iterator = iter(items)
+    first = list(islice(iterator, JSON_STREAM_BATCH_SIZE))
+    
+    def generate():
+        yield b'{' + dumps(key) + b':['
+        count = 0
+        batch = first
+        try:
+            while batch:
+                yield (b',' if count else b'') + dumps(batch)[1:-1]
+                count += len(batch)
+                batch = list(islice(iterator, JSON_STREAM_BATCH_SIZE))
+        except Exception:
+            # En-têtes déjà envoyés: l'exception interrompt la connexion (réponse
+            # chunked incomplète) au lieu d'un tableau tronqué pris pour complet
+            logger.exception("Erreur pendant la diffusion de la réponse JSON")
+            raise
+        
+        if count_key:
+            meta[count_key] = count
+        tail = dumps(meta)
+        yield b']' + (b',' + tail[1:] if meta else b'}')
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def init_json_response(app):
+    """
+    Remplace l'encodeur JSON de l'application (jsonify, get_json)
+    """
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,57 @@
+"""
+Collecte des métriques HTTP et MongoDB pour l'endpoint /metrics
+"""
+
+from flask import g, request
+import time
+
+from config.database import get_pool_stats
+from services.metrics_service import (
+    metrics, HTTP_REQUEST_DURATION, HTTP_REQUESTS_TOTAL, MONGO_COMMAND_DURATION,
+    MONGO_POOL_CONNECTIONS, MONGO_POOL_CHECKOUT_FAILURES
+)
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+def _record(response):
+    start = g.get('metrics_start')
+    if start is None:
+        return response
+    
+    # Endpoint (et non le chemin) comme étiquette: cardinalité bornée
+    endpoint = request.endpoint or 'inconnu'
+    metrics.observe(HTTP_REQUEST_DURATION, time.perf_counter() - start, {
+        'blueprint': request.blueprint or 'app',
+        'endpoint': endpoint,
+        'method': request.method
+    })
+    metrics.inc(HTTP_REQUESTS_TOTAL, {
+        'endpoint': endpoint,
+        'method': request.method,
+        'status': str(response.status_code)
+    })
+    
+    # Durée des commandes MongoDB de la requête (instrumentation par requête)
+    collector = g.get('query_stats')
+    if collector is not None:
+        for collection, command_name, duration in collector.timings:
+            metrics.observe(MONGO_COMMAND_DURATION, duration, {
+                'collection': collection or 'admin',
+                'command': command_name or 'inconnu'
+            })
+    
+    pool = get_pool_stats()
+    metrics.set(MONGO_POOL_CONNECTIONS, pool['connections_open'], {'state': 'open'})
+    metrics.set(MONGO_POOL_CONNECTIONS, pool['connections_in_use'], {'state': 'in_use'})
+    metrics.set(MONGO_POOL_CHECKOUT_FAILURES, pool['checkout_failures'])
+    
+    metrics.flush()
+    return response
+
+def init_metrics(app):
+    """
+    Enregistre la collecte des métriques sur toutes les requêtes
+    """
+    app.before_request(_start_timer)
+    app.after_request(_record)
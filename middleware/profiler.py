@@ -0,0 +1,25 @@
+"""
+Profilage à la demande des requêtes (déclenché depuis l'API admin)
+"""
+
+from flask import g, request
+
+from services.profiler_service import ProfilerService
+
+def _start_profile():
+    ProfilerService.poll()
+    if ProfilerService.endpoint is None:
+        return
+    g.profile = ProfilerService.start_request(request.endpoint)
+
+def _stop_profile(exception=None):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        ProfilerService.stop_request(profile, request.endpoint)
+
+def init_profiler(app):
+    """
+    Enregistre les hooks de profilage (coût au repos: une comparaison d'horloge)
+    """
+    app.before_request(_start_profile)
+    app.teardown_request(_stop_profile)
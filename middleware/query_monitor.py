@@ -0,0 +1,80 @@
+"""
+Instrumentation des requêtes MongoDB par requête HTTP
+Nombre de commandes, temps passé en base et octets reçus (QUERY_MONITOR_BYTES),
+exposés dans l'en-tête Server-Timing, avec détection des motifs N+1 en mode debug
+"""
+
+from flask import current_app, g, request
+import os
+import time
+
+from config.database import query_stats
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUERY_MONITOR_ENABLED = os.getenv('QUERY_MONITOR_ENABLED', 'True').lower() == 'true'
+# Nombre de répétitions d'une même forme de requête au-delà duquel on signale un N+1
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', 5))
+# Détection N+1 hors mode debug (ex: environnement de recette)
+QUERY_N_PLUS_ONE_DETECTION = os.getenv('QUERY_N_PLUS_ONE_DETECTION', 'False').lower() == 'true'
+# Octets reçus de MongoDB (chaque réponse réencodée en BSON: diagnostic, toujours actif en mode debug)
+QUERY_MONITOR_BYTES = os.getenv('QUERY_MONITOR_BYTES', 'False').lower() == 'true'
+# Commandes conservées pour le journal des requêtes lentes (plan d'exécution)
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+
+def _controller_name():
+    """
+    Nom qualifié de la fonction de vue de la requête courante
+    """
+    view = current_app.view_functions.get(request.endpoint)
+    if view is None:
+        return request.endpoint or request.path
+    return f"{view.__module__}.{view.__name__}"
+
+def _start_monitoring():
+    g.request_start = time.perf_counter()
+    g.query_stats = query_stats.begin(
+        slow_threshold=SLOW_QUERY_MS / 1000,
+        count_bytes=QUERY_MONITOR_BYTES or current_app.debug
+    )
+
+def _report(response):
+    collector = g.get('query_stats')
+    if collector is None:
+        return response
+    
+    total = (time.perf_counter() - g.request_start) * 1000
+    timing = f'db;dur={collector.duration * 1000:.2f};desc="{collector.commands} commandes", '
+    if collector.bytes is not None:
+        timing += f'db-bytes;desc="{collector.bytes}", '
+    response.headers.add('Server-Timing', timing + f'app;dur={total:.2f}')
+    
+    if current_app.debug or QUERY_N_PLUS_ONE_DETECTION:
+        for (collection, command_name, shape), count in collector.repeated(QUERY_REPEAT_THRESHOLD):
+            logger.warning("N+1 probable", extra={'fields': {
+                'controller': _controller_name(),
+                'command': command_name,
+                'collection': collection,
+                'repetitions': count,
+                'filter_shape': shape
+            }})
+    
+    return response
+
+def _stop_monitoring(exception=None):
+    query_stats.end()
+
+def init_query_monitor(app):
+    """
+    Active l'instrumentation MongoDB sur toutes les requêtes de l'application
+    
+    Les lectures/écritures de session (avant et après la vue) ne sont pas
+    comptées: l'en-tête reflète le travail du contrôleur
+    """
+    if not QUERY_MONITOR_ENABLED:
+        return
+    
+    app.before_request(_start_monitoring)
+    app.after_request(_report)
+    app.teardown_request(_stop_monitoring)
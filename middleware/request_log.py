@@ -0,0 +1,158 @@
+"""
+Journal des requêtes lentes
+
+Une requête dépassant SLOW_REQUEST_MS est journalisée avec son endpoint, le
+rôle de l'utilisateur, la répartition du temps MongoDB par collection et le
+plan d'exécution (explain) des commandes lentes. Le journal est échantillonné
+(taux et intervalle minimal par endpoint) pour ne pas saturer les logs
+"""
+
+from flask import g, request, session
+import os
+import random
+import threading
+import time
+
+from config.database import filter_shape, command_filter, get_db
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 500))
+# Fraction des requêtes lentes journalisées (1.0 = toutes)
+SLOW_LOG_SAMPLE_RATE = float(os.getenv('SLOW_LOG_SAMPLE_RATE', 1.0))
+# Intervalle minimal entre deux journaux pour un même endpoint (secondes)
+SLOW_LOG_INTERVAL = float(os.getenv('SLOW_LOG_INTERVAL', 60))
+# Plan d'exécution des commandes lentes (une commande explain par requête lente)
+SLOW_LOG_EXPLAIN = os.getenv('SLOW_LOG_EXPLAIN', 'True').lower() == 'true'
+
+EXPLAINABLE = {'find', 'aggregate', 'count', 'distinct', 'update', 'delete', 'findAndModify'}
+# Champs de session/transport retirés avant explain
+COMMAND_INTERNAL_FIELDS = {'lsid', 'txnNumber', 'autocommit', 'startTransaction'}
+
+_last_logged = {}
+_suppressed = {}
+_lock = threading.Lock()
+
+def _should_log(endpoint):
+    """
+    Échantillonnage: taux aléatoire puis au plus un journal par intervalle et par endpoint
+    
+    Returns:
+        Nombre de requêtes lentes non journalisées depuis le dernier journal, ou None
+    """
+    now = time.monotonic()
+    with _lock:
+        sampled = random.random() < SLOW_LOG_SAMPLE_RATE
+        if not sampled or now - _last_logged.get(endpoint, float('-inf')) < SLOW_LOG_INTERVAL:
+            _suppressed[endpoint] = _suppressed.get(endpoint, 0) + 1
+            return None
+        _last_logged[endpoint] = now
+        return _suppressed.pop(endpoint, 0)
+
+def _plan_summary(plan):
+    """
+    Résumé d'un plan d'exécution: étapes de la racine vers les feuilles
+    
+    Exemple: FETCH > IXSCAN(patient_id_1_date_rdv_-1)
+    """
+    stages = []
+    while plan:
+        plan = plan.get('queryPlan', plan)
+        stage = plan.get('stage', '?')
+        if plan.get('indexName'):
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get('inputStage') or (plan.get('inputStages') or [None])[0]
+    return ' > '.join(stages)
+
+def _explain(command_name, command):
+    """
+    Plan d'exécution d'une commande (explain queryPlanner, sans exécution)
+    """
+    if command_name not in EXPLAINABLE:
+        return None
+    cleaned = {
+        key: value for key, value in command.items()
+        if not key.startswith('$') and key not in COMMAND_INTERNAL_FIELDS
+    }
+    try:
+        result = get_db().command({'explain': cleaned, 'verbosity': 'queryPlanner'})
+    except Exception as e:
+        return f"explain impossible: {e}"
+    
+    planner = result.get('queryPlanner')
+    if planner is None and result.get('stages'):
+        planner = result['stages'][0].get('$cursor', {}).get('queryPlanner')
+    if not planner:
+        return None
+    return _plan_summary(planner.get('winningPlan'))
+
+def _start_timer():
+    g.request_log_start = time.perf_counter()
+
+def _log_slow_request(response):
+    start = g.get('request_log_start')
+    if start is None:
+        return response
+    duration = (time.perf_counter() - start) * 1000
+    if duration < SLOW_REQUEST_MS:
+        return response
+    
+    endpoint = request.endpoint or request.path
+    suppressed = _should_log(endpoint)
+    if suppressed is None:
+        return response
+    
+    fields = {
+        'endpoint': endpoint,
+        'method': request.method,
+        'path': request.path,
+        'role': session.get('user_role'),
+        'status': response.status_code,
+        'duration_ms': round(duration, 1),
+        'suppressed': suppressed
+    }
+    
+    collector = g.get('query_stats')
+    slow = []
+    if collector is not None:
+        breakdown = {}
+        for collection, command_name, seconds in collector.timings:
+            entry = breakdown.setdefault(collection or 'admin', {'commands': 0, 'ms': 0.0})
+            entry['commands'] += 1
+            entry['ms'] = round(entry['ms'] + seconds * 1000, 2)
+        fields.update({
+            'db_commands': collector.commands,
+            'db_ms': round(collector.duration * 1000, 1),
+            'db_breakdown': breakdown
+        })
+        if collector.bytes is not None:
+            fields['db_bytes'] = collector.bytes
+        slow = list(collector.slow)
+    
+    # Explain exécuté après l'envoi de la réponse: sans impact sur sa latence
+    def emit():
+        if slow:
+            fields['slow_queries'] = [
+                {
+                    'collection': collection,
+                    'command': command_name,
+                    'ms': round(seconds * 1000, 1),
+                    # Forme du filtre uniquement: aucune donnée patient dans les logs
+                    'filter_shape': filter_shape(command_filter(command_name, command)),
+                    'plan': _explain(command_name, command) if SLOW_LOG_EXPLAIN else None
+                }
+                for collection, command_name, seconds, command in slow
+            ]
+        logger.warning("Requête lente", extra={'fields': fields})
+    
+    response.call_on_close(emit)
+    return response
+
+def init_request_log(app):
+    """
+    Active le journal des requêtes lentes
+    """
+    app.before_request(_start_timer)
+    app.after_request(_log_slow_request)
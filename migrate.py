@@ -0,0 +1,44 @@
+"""
+Script d'application des migrations du schéma MongoDB
+Exécuter une fois par déploiement: python migrate.py
+Afficher la version: python migrate.py --status
+"""
+
+import sys
+import os
+
+# Ajouter le répertoire backend au path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.database import get_client, get_db
+from config.migrations import migrate, get_schema_version, latest_version
+
+def main():
+    """
+    Applique les migrations en attente ou affiche l'état du schéma
+    """
+    try:
+        get_client().admin.command('ping')
+    except Exception as e:
+        print(f"❌ Erreur de connexion à MongoDB: {e}")
+        sys.exit(1)
+    
+    db = get_db()
+    current = get_schema_version(db)
+    
+    if '--status' in sys.argv:
+        print(f"Version du schéma: {current} (attendue: {latest_version()})")
+        return
+    
+    target = None
+    if '--target' in sys.argv:
+        target = int(sys.argv[sys.argv.index('--target') + 1])
+    
+    applied = migrate(db, target=target)
+    if applied:
+        print(f"✅ Migrations appliquées: {', '.join(str(v) for v in applied)}")
+    else:
+        print(f"✅ Schéma déjà à jour (version {current})")
+
+if __name__ == '__main__':
+    main()
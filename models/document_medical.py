@@ -5,12 +5,36 @@ Modèle DocumentMedical - Gestion des documents médicaux (radiographies, analys
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, REF, DATE
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('DocumentMedical', [
+    Field('_id', ID),
+    Field('patient_id', REF),
+    Field('dossier_id', REF),
+    Field('type_document'),
+    Field('nom_fichier'),
+    # Contenu base64: absent de la vue JSON, sauf téléchargement
+    Field('file_data', public=False, omit_none=True),
+    Field('file_type'),
+    Field('file_size'),
+    Field('description'),
+    Field('date_examen', DATE),
+    Field('medecin_id', REF),
+    Field('created_at', DATE),
+    Field('updated_at', DATE)
+])
+
+@SCHEMA.bind
 class DocumentMedical:
     """
     Classe représentant un document médical
     """
     
+    __slots__ = SCHEMA.slots
+    
     TYPE_RADIO = 'radiographie'
     TYPE_ANALYSE = 'analyse'
     TYPE_ECHO = 'echographie'
@@ -61,20 +85,7 @@ class DocumentMedical:
         Returns:
             Dictionnaire représentant le document
         """
-        data = {
-            '_id': str(self._id),
-            'patient_id': str(self.patient_id),
-            'dossier_id': str(self.dossier_id) if self.dossier_id else None,
-            'type_document': self.type_document,
-            'nom_fichier': self.nom_fichier,
-            'file_type': self.file_type,
-            'file_size': self.file_size,
-            'description': self.description,
-            'date_examen': self.date_examen.isoformat() if isinstance(self.date_examen, datetime) else self.date_examen,
-            'medecin_id': str(self.medecin_id) if self.medecin_id else None,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
+        data = SCHEMA.to_json(self)
         
         # Inclure les données du fichier seulement si demandé (pour le téléchargement)
         if include_file_data:
@@ -82,6 +93,15 @@ class DocumentMedical:
         
         return data
     
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        return SCHEMA.to_document(self)
+    
     def save(self):
         """
         Sauvegarde le document médical dans la base de données
@@ -92,14 +112,7 @@ class DocumentMedical:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        doc_dict = self.to_dict(include_file_data=True)  # Inclure les données du fichier
-        doc_dict['_id'] = self._id
-        doc_dict['patient_id'] = self.patient_id
-        if self.dossier_id:
-            doc_dict['dossier_id'] = self.dossier_id
-        if self.medecin_id:
-            doc_dict['medecin_id'] = self.medecin_id
-        
+        doc_dict = self.to_document()
         result = db.documents_medicaux.insert_one(doc_dict)
         return str(result.inserted_id)
     
@@ -113,13 +126,10 @@ class DocumentMedical:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        doc_dict = self.to_dict()
+        doc_dict = self.to_document()
         doc_dict.pop('_id', None)
-        doc_dict['patient_id'] = self.patient_id
-        if doc_dict.get('dossier_id'):
-            doc_dict['dossier_id'] = ObjectId(doc_dict['dossier_id'])
-        if doc_dict.get('medecin_id'):
-            doc_dict['medecin_id'] = ObjectId(doc_dict['medecin_id'])
+        # Le fichier n'est jamais réécrit par une mise à jour
+        doc_dict.pop('file_data', None)
         
         result = db.documents_medicaux.update_one(
             {'_id': self._id},
@@ -145,7 +155,7 @@ class DocumentMedical:
         
         Args:
             doc_id: ID du document (string ou ObjectId)
-            
+        
         Returns:
             Instance DocumentMedical ou None
         """
@@ -156,12 +166,12 @@ class DocumentMedical:
             
             if doc_data:
                 return DocumentMedical._from_dict(doc_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche du document médical: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche du document médical")
         return None
     
     @staticmethod
-    def find_by_patient(patient_id, type_document=None, limit=50):
+    def find_by_patient(patient_id, type_document=None, limit=50, include_file_data=True):
         """
         Trouve tous les documents médicaux d'un patient
         
@@ -169,7 +179,8 @@ class DocumentMedical:
             patient_id: ID du patient
             type_document: Filtrer par type de document (optionnel)
             limit: Nombre maximum de résultats
-            
+            include_file_data: Si False, le fichier (base64) n'est pas lu depuis la base
+        
         Returns:
             Liste d'instances DocumentMedical
         """
@@ -181,15 +192,16 @@ class DocumentMedical:
             if type_document:
                 query['type_document'] = type_document
             
-            docs_data = db.documents_medicaux.find(query).sort('date_examen', -1).limit(limit)
+            projection = None if include_file_data else {'file_data': 0}
+            docs_data = db.documents_medicaux.find(query, projection).sort('date_examen', -1).limit(limit)
             
             docs = []
             for doc_data in docs_data:
                 docs.append(DocumentMedical._from_dict(doc_data))
             
             return docs
-        except Exception as e:
-            print(f"Erreur lors de la recherche des documents médicaux: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des documents médicaux")
             return []
     
     @staticmethod
@@ -200,7 +212,7 @@ class DocumentMedical:
         Args:
             dossier_id: ID du dossier médical
             limit: Nombre maximum de résultats
-            
+        
         Returns:
             Liste d'instances DocumentMedical
         """
@@ -214,8 +226,8 @@ class DocumentMedical:
                 docs.append(DocumentMedical._from_dict(doc_data))
             
             return docs
-        except Exception as e:
-            print(f"Erreur lors de la recherche des documents médicaux: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des documents médicaux")
             return []
     
     @staticmethod
@@ -225,24 +237,9 @@ class DocumentMedical:
         
         Args:
             doc_data: Dictionnaire contenant les données du document
-            
+        
         Returns:
             Instance DocumentMedical
         """
-        doc = DocumentMedical(
-            patient_id=doc_data['patient_id'],
-            dossier_id=doc_data.get('dossier_id'),
-            type_document=doc_data['type_document'],
-            nom_fichier=doc_data['nom_fichier'],
-            file_data=doc_data.get('file_data'),
-            file_type=doc_data.get('file_type'),
-            file_size=doc_data.get('file_size'),
-            description=doc_data.get('description'),
-            date_examen=doc_data.get('date_examen'),
-            medecin_id=doc_data.get('medecin_id'),
-            _id=doc_data['_id']
-        )
-        doc.created_at = doc_data.get('created_at')
-        doc.updated_at = doc_data.get('updated_at')
-        return doc
+        return SCHEMA.decode(doc_data)
 
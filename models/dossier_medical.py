@@ -5,12 +5,36 @@ Modèle DossierMedical - Gestion des dossiers médicaux des patients
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, REF, DATE
+from models.medecin_patient import MedecinPatient
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('DossierMedical', [
+    Field('_id', ID),
+    Field('patient_id', REF),
+    Field('medecin_id', REF),
+    Field('date_consultation', DATE),
+    Field('observations'),
+    Field('diagnostic'),
+    Field('examen_clinique'),
+    Field('poids'),
+    Field('taille'),
+    Field('tension_arterielle'),
+    Field('temperature'),
+    Field('created_at', DATE),
+    Field('updated_at', DATE)
+])
+
+@SCHEMA.bind
 class DossierMedical:
     """
     Classe représentant un dossier médical
     """
     
+    __slots__ = SCHEMA.slots
+    
     def __init__(self, patient_id, medecin_id, date_consultation, 
                  observations=None, diagnostic=None, examen_clinique=None,
                  poids=None, taille=None, tension_arterielle=None, 
@@ -52,22 +76,16 @@ class DossierMedical:
         Returns:
             Dictionnaire représentant le dossier médical
         """
-        data = {
-            '_id': str(self._id),
-            'patient_id': str(self.patient_id),
-            'medecin_id': str(self.medecin_id),
-            'date_consultation': self.date_consultation.isoformat() if isinstance(self.date_consultation, datetime) else self.date_consultation,
-            'observations': self.observations,
-            'diagnostic': self.diagnostic,
-            'examen_clinique': self.examen_clinique,
-            'poids': self.poids,
-            'taille': self.taille,
-            'tension_arterielle': self.tension_arterielle,
-            'temperature': self.temperature,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
-        return data
+        return SCHEMA.to_json(self)
+    
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        return SCHEMA.to_document(self)
     
     def save(self):
         """
@@ -79,12 +97,11 @@ class DossierMedical:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        dossier_dict = self.to_dict()
-        dossier_dict['_id'] = self._id
-        dossier_dict['patient_id'] = self.patient_id
-        dossier_dict['medecin_id'] = self.medecin_id
-        
+        dossier_dict = self.to_document()
         result = db.dossiers_medicaux.insert_one(dossier_dict)
+        
+        # Patients du médecin et compteur du dashboard
+        MedecinPatient.link(self.medecin_id, self.patient_id)
         return str(result.inserted_id)
     
     def update(self):
@@ -97,10 +114,8 @@ class DossierMedical:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        dossier_dict = self.to_dict()
+        dossier_dict = self.to_document()
         dossier_dict.pop('_id', None)
-        dossier_dict['patient_id'] = self.patient_id
-        dossier_dict['medecin_id'] = self.medecin_id
         
         result = db.dossiers_medicaux.update_one(
             {'_id': self._id},
@@ -115,7 +130,7 @@ class DossierMedical:
         
         Args:
             dossier_id: ID du dossier (string ou ObjectId)
-            
+        
         Returns:
             Instance DossierMedical ou None
         """
@@ -126,8 +141,8 @@ class DossierMedical:
             
             if dossier_data:
                 return DossierMedical._from_dict(dossier_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche du dossier médical: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche du dossier médical")
         return None
     
     @staticmethod
@@ -138,7 +153,7 @@ class DossierMedical:
         Args:
             patient_id: ID du patient
             limit: Nombre maximum de résultats
-            
+        
         Returns:
             Liste d'instances DossierMedical
         """
@@ -152,10 +167,29 @@ class DossierMedical:
                 dossiers.append(DossierMedical._from_dict(dossier_data))
             
             return dossiers
-        except Exception as e:
-            print(f"Erreur lors de la recherche des dossiers médicaux: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des dossiers médicaux")
             return []
     
+    @staticmethod
+    def count_by_patient(patient_id):
+        """
+        Compte les dossiers médicaux d'un patient
+        
+        Args:
+            patient_id: ID du patient
+        
+        Returns:
+            Nombre de dossiers
+        """
+        db = get_db()
+        try:
+            _id = ObjectId(patient_id) if isinstance(patient_id, str) else patient_id
+            return db.dossiers_medicaux.count_documents({'patient_id': _id})
+        except Exception:
+            logger.exception("Erreur lors du comptage des dossiers médicaux")
+            return 0
+    
     @staticmethod
     def find_by_medecin(medecin_id, limit=50):
         """
@@ -164,7 +198,7 @@ class DossierMedical:
         Args:
             medecin_id: ID du médecin
             limit: Nombre maximum de résultats
-            
+        
         Returns:
             Liste d'instances DossierMedical
         """
@@ -178,8 +212,8 @@ class DossierMedical:
                 dossiers.append(DossierMedical._from_dict(dossier_data))
             
             return dossiers
-        except Exception as e:
-            print(f"Erreur lors de la recherche des dossiers médicaux: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des dossiers médicaux")
             return []
     
     @staticmethod
@@ -189,24 +223,9 @@ class DossierMedical:
         
         Args:
             dossier_data: Dictionnaire contenant les données du dossier
-            
+        
         Returns:
             Instance DossierMedical
         """
-        dossier = DossierMedical(
-            patient_id=dossier_data['patient_id'],
-            medecin_id=dossier_data['medecin_id'],
-            date_consultation=dossier_data['date_consultation'],
-            observations=dossier_data.get('observations'),
-            diagnostic=dossier_data.get('diagnostic'),
-            examen_clinique=dossier_data.get('examen_clinique'),
-            poids=dossier_data.get('poids'),
-            taille=dossier_data.get('taille'),
-            tension_arterielle=dossier_data.get('tension_arterielle'),
-            temperature=dossier_data.get('temperature'),
-            _id=dossier_data['_id']
-        )
-        dossier.created_at = dossier_data.get('created_at')
-        dossier.updated_at = dossier_data.get('updated_at')
-        return dossier
+        return SCHEMA.decode(dossier_data)
 
@@ -0,0 +1,39 @@
+"""
+Conversion des valeurs vers leur type BSON natif (documents MongoDB)
+
+Les dictionnaires to_dict() sont la vue JSON (dates ISO, identifiants en
+texte); to_document() stocke des dates BSON et des ObjectId, seuls types
+comparables par les requêtes par intervalle et utilisables par les index
+"""
+
+from datetime import date, datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+
+def to_datetime(value):
+    """
+    Date BSON à partir d'une date, d'un datetime ou d'une chaîne ISO
+    
+    Les valeurs non convertibles sont renvoyées telles quelles
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+def to_object_id(value):
+    """
+    ObjectId à partir de sa forme texte (None et valeurs invalides inchangés)
+    """
+    if isinstance(value, str):
+        try:
+            return ObjectId(value)
+        except InvalidId:
+            return value
+    return value
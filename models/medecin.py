@@ -4,13 +4,36 @@ Modèle Medecin - Informations spécifiques aux médecins
 
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from config.database import get_db
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, REF, DATE
+from models.specialite import Specialite
+from services.catalog_service import CatalogService, MEDECINS, SPECIALITES
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('Medecin', [
+    Field('_id', ID),
+    Field('user_id', REF),
+    Field('specialite'),
+    Field('numero_ordre'),
+    Field('horaires_travail', default_factory=dict),
+    # Signature stockée seulement si présente (non exposée dans la vue JSON)
+    Field('signature_data', public=False, omit_none=True),
+    Field('signature_type', public=False, omit_none=True),
+    Field('created_at', DATE),
+    Field('updated_at', DATE)
+])
+
+@SCHEMA.bind
 class Medecin:
     """
     Classe représentant un médecin avec ses informations professionnelles
     """
     
+    __slots__ = SCHEMA.slots
+    
     def __init__(self, user_id, specialite, numero_ordre=None, 
                  horaires_travail=None, signature_data=None, signature_type=None, _id=None):
         """
@@ -42,18 +65,19 @@ class Medecin:
         Returns:
             Dictionnaire représentant le médecin
         """
-        data = {
-            '_id': str(self._id),
-            'user_id': str(self.user_id),
-            'specialite': self.specialite,
-            'numero_ordre': self.numero_ordre,
-            'horaires_travail': self.horaires_travail,
-            'has_signature': self.signature_data is not None,  # Indique si une signature existe
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
+        data = SCHEMA.to_json(self)
+        data['has_signature'] = self.signature_data is not None  # Indique si une signature existe
         return data
     
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        return SCHEMA.to_document(self)
+    
     def save(self):
         """
         Sauvegarde le médecin dans la base de données
@@ -64,11 +88,12 @@ class Medecin:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        medecin_dict = self.to_dict()
-        medecin_dict['_id'] = self._id
-        medecin_dict['user_id'] = self.user_id
-        
+        medecin_dict = self.to_document()
         result = db.medecins.insert_one(medecin_dict)
+        
+        # Liste publique des médecins et nombre de médecins par spécialité
+        Specialite.recount()
+        CatalogService.invalidate(MEDECINS, SPECIALITES)
         return str(result.inserted_id)
     
     def update(self):
@@ -81,20 +106,26 @@ class Medecin:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        medecin_dict = self.to_dict()
+        # Signature incluse seulement si présente (omit_none)
+        medecin_dict = self.to_document()
         medecin_dict.pop('_id', None)
-        medecin_dict['user_id'] = self.user_id
-        
-        # Inclure explicitement signature_data et signature_type si présents
-        if self.signature_data:
-            medecin_dict['signature_data'] = self.signature_data
-            medecin_dict['signature_type'] = self.signature_type
         
-        result = db.medecins.update_one(
+        # État précédent: une signature modifiée ne touche pas aux catalogues publics
+        previous = db.medecins.find_one_and_update(
             {'_id': self._id},
-            {'$set': medecin_dict}
+            {'$set': medecin_dict},
+            projection={'specialite': 1, 'numero_ordre': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        
+        if previous is not None:
+            if previous.get('specialite') != self.specialite:
+                # Nombre de médecins par spécialité
+                Specialite.recount()
+                CatalogService.invalidate(MEDECINS, SPECIALITES)
+            elif previous.get('numero_ordre') != self.numero_ordre:
+                CatalogService.invalidate(MEDECINS)
+        return previous is not None
     
     @staticmethod
     def find_by_user_id(user_id):
@@ -103,7 +134,7 @@ class Medecin:
         
         Args:
             user_id: ID du compte utilisateur
-            
+        
         Returns:
             Instance Medecin ou None
         """
@@ -114,23 +145,25 @@ class Medecin:
             
             if medecin_data:
                 return Medecin._from_dict(medecin_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche du médecin: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche du médecin")
         return None
     
     @staticmethod
-    def find_by_specialite(specialite):
+    def find_by_specialite(specialite, include_signature=True):
         """
         Trouve tous les médecins d'une spécialité
         
         Args:
             specialite: Spécialité médicale
-            
+            include_signature: Si False, la signature (base64) n'est pas lue depuis la base
+        
         Returns:
             Liste d'instances Medecin
         """
         db = get_db()
-        medecins_data = db.medecins.find({'specialite': specialite})
+        projection = None if include_signature else {'signature_data': 0}
+        medecins_data = db.medecins.find({'specialite': specialite}, projection)
         
         medecins = []
         for medecin_data in medecins_data:
@@ -139,15 +172,19 @@ class Medecin:
         return medecins
     
     @staticmethod
-    def find_all():
+    def find_all(include_signature=True):
         """
         Trouve tous les médecins
         
+        Args:
+            include_signature: Si False, la signature (base64) n'est pas lue depuis la base
+        
         Returns:
             Liste d'instances Medecin
         """
         db = get_db()
-        medecins_data = db.medecins.find()
+        projection = None if include_signature else {'signature_data': 0}
+        medecins_data = db.medecins.find({}, projection)
         
         medecins = []
         for medecin_data in medecins_data:
@@ -162,20 +199,9 @@ class Medecin:
         
         Args:
             medecin_data: Dictionnaire contenant les données du médecin
-            
+        
         Returns:
             Instance Medecin
         """
-        medecin = Medecin(
-            user_id=medecin_data['user_id'],
-            specialite=medecin_data['specialite'],
-            numero_ordre=medecin_data.get('numero_ordre'),
-            horaires_travail=medecin_data.get('horaires_travail', {}),
-            signature_data=medecin_data.get('signature_data'),
-            signature_type=medecin_data.get('signature_type'),
-            _id=medecin_data['_id']
-        )
-        medecin.created_at = medecin_data.get('created_at')
-        medecin.updated_at = medecin_data.get('updated_at')
-        return medecin
+        return SCHEMA.decode(medecin_data)
 
@@ -0,0 +1,142 @@
+"""
+Modèle MedecinPatient - Patients suivis par chaque médecin
+
+Relation (médecin, patient) matérialisée dans la collection medecin_patients,
+tenue à jour à l'écriture des rendez-vous, dossiers médicaux et ordonnances,
+avec un compteur de patients distincts par médecin (collection medecin_stats).
+"Mes patients" et la recherche du médecin partent de cette collection
+(index medecin_id, derniere_activite) au lieu de dédupliquer les dossiers
+"""
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from config.database import get_db
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+COLLECTION = 'medecin_patients'
+STATS_COLLECTION = 'medecin_stats'
+
+# Collections dont les documents relient un médecin à un patient
+SOURCE_COLLECTIONS = ('rendezvous', 'dossiers_medicaux', 'ordonnances')
+
+class MedecinPatient:
+    """
+    Relation entre un médecin et un patient (rendez-vous, consultation ou ordonnance)
+    """
+    
+    @staticmethod
+    def link(medecin_id, patient_id):
+        """
+        Enregistre le patient pour le médecin (date de dernière activité mise
+        à jour) et incrémente le compteur si la relation est nouvelle
+        
+        Args:
+            medecin_id: ID du médecin
+            patient_id: ID du patient
+        
+        Returns:
+            True si la relation a été créée
+        """
+        db = get_db()
+        medecin_id = ObjectId(medecin_id) if isinstance(medecin_id, str) else medecin_id
+        patient_id = ObjectId(patient_id) if isinstance(patient_id, str) else patient_id
+        now = datetime.utcnow()
+        
+        try:
+            # Index unique (medecin_id, patient_id): un seul upsert crée la relation
+            result = db[COLLECTION].update_one(
+                {'medecin_id': medecin_id, 'patient_id': patient_id},
+                {'$setOnInsert': {'created_at': now}, '$max': {'derniere_activite': now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Upsert concurrent: la relation existe déjà
+            return False
+        
+        if result.upserted_id is None:
+            return False
+        
+        db[STATS_COLLECTION].update_one(
+            {'_id': medecin_id},
+            {'$inc': {'nb_patients': 1}, '$set': {'updated_at': now}},
+            upsert=True
+        )
+        return True
+    
+    @staticmethod
+    def count_by_medecin(medecin_id):
+        """
+        Nombre de patients distincts du médecin (lecture du compteur)
+        
+        Args:
+            medecin_id: ID du médecin
+        
+        Returns:
+            Nombre de patients
+        """
+        db = get_db()
+        try:
+            _id = ObjectId(medecin_id) if isinstance(medecin_id, str) else medecin_id
+            stats = db[STATS_COLLECTION].find_one({'_id': _id}, {'nb_patients': 1})
+            return stats.get('nb_patients', 0) if stats else 0
+        except Exception:
+            logger.exception("Erreur lors du comptage des patients du médecin")
+            return 0
+    
+    @staticmethod
+    def rebuild(db):
+        """
+        Reconstruit les relations et les compteurs à partir des rendez-vous,
+        dossiers médicaux et ordonnances (migration, import de données en masse)
+        
+        Args:
+            db: Base de données MongoDB
+        
+        Returns:
+            Nombre de relations
+        """
+        now = datetime.utcnow()
+        activities = {}
+        for source in SOURCE_COLLECTIONS:
+            pairs = db[source].aggregate([
+                {'$group': {
+                    '_id': {'medecin_id': '$medecin_id', 'patient_id': '$patient_id'},
+                    'derniere_activite': {'$max': '$created_at'}
+                }}
+            ], allowDiskUse=True)
+            for pair in pairs:
+                key = (pair['_id']['medecin_id'], pair['_id']['patient_id'])
+                if None in key:
+                    continue
+                activity = pair.get('derniere_activite') or now
+                if isinstance(activity, str):
+                    activity = datetime.fromisoformat(activity)
+                activities[key] = max(activities.get(key, activity), activity)
+        
+        counts = {}
+        operations = []
+        for (medecin_id, patient_id), activity in activities.items():
+            counts[medecin_id] = counts.get(medecin_id, 0) + 1
+            operations.append(UpdateOne(
+                {'medecin_id': medecin_id, 'patient_id': patient_id},
+                {'$setOnInsert': {'created_at': now}, '$max': {'derniere_activite': activity}},
+                upsert=True
+            ))
+            if len(operations) >= 1000:
+                db[COLLECTION].bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            db[COLLECTION].bulk_write(operations, ordered=False)
+        
+        # Compteurs recalculés en entier (les relations ne sont jamais supprimées)
+        db[STATS_COLLECTION].delete_many({})
+        if counts:
+            db[STATS_COLLECTION].insert_many([
+                {'_id': medecin_id, 'nb_patients': count, 'updated_at': now}
+                for medecin_id, count in counts.items()
+            ])
+        return len(activities)
@@ -5,12 +5,31 @@ Modèle Notification - Gestion des notifications utilisateurs
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, REF, DATE
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('Notification', [
+    Field('_id', ID),
+    Field('user_id', REF),
+    Field('type_notification'),
+    Field('titre'),
+    Field('message'),
+    Field('is_read', default=False),
+    Field('lien'),
+    Field('created_at', DATE),
+    Field('updated_at', DATE)
+])
+
+@SCHEMA.bind
 class Notification:
     """
     Classe représentant une notification
     """
     
+    __slots__ = SCHEMA.slots
+    
     TYPE_RDV_CONFIRME = 'rdv_confirme'
     TYPE_RDV_ANNULE = 'rdv_annule'
     TYPE_RDV_RAPPEL = 'rdv_rappel'
@@ -52,18 +71,16 @@ class Notification:
         Returns:
             Dictionnaire représentant la notification
         """
-        data = {
-            '_id': str(self._id),
-            'user_id': str(self.user_id),
-            'type_notification': self.type_notification,
-            'titre': self.titre,
-            'message': self.message,
-            'is_read': self.is_read,
-            'lien': self.lien,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
-        return data
+        return SCHEMA.to_json(self)
+    
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        return SCHEMA.to_document(self)
     
     def save(self):
         """
@@ -75,10 +92,7 @@ class Notification:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        notif_dict = self.to_dict()
-        notif_dict['_id'] = self._id
-        notif_dict['user_id'] = self.user_id
-        
+        notif_dict = self.to_document()
         result = db.notifications.insert_one(notif_dict)
         return str(result.inserted_id)
     
@@ -106,7 +120,7 @@ class Notification:
         
         Args:
             notif_id: ID de la notification (string ou ObjectId)
-            
+        
         Returns:
             Instance Notification ou None
         """
@@ -117,8 +131,8 @@ class Notification:
             
             if notif_data:
                 return Notification._from_dict(notif_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche de la notification: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche de la notification")
         return None
     
     @staticmethod
@@ -130,7 +144,7 @@ class Notification:
             user_id: ID de l'utilisateur
             is_read: Filtrer par statut de lecture (optionnel)
             limit: Nombre maximum de résultats
-            
+        
         Returns:
             Liste d'instances Notification
         """
@@ -149,8 +163,8 @@ class Notification:
                 notifs.append(Notification._from_dict(notif_data))
             
             return notifs
-        except Exception as e:
-            print(f"Erreur lors de la recherche des notifications: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des notifications")
             return []
     
     @staticmethod
@@ -160,7 +174,7 @@ class Notification:
         
         Args:
             user_id: ID de l'utilisateur
-            
+        
         Returns:
             Nombre de notifications non lues
         """
@@ -169,8 +183,8 @@ class Notification:
             _id = ObjectId(user_id) if isinstance(user_id, str) else user_id
             count = db.notifications.count_documents({'user_id': _id, 'is_read': False})
             return count
-        except Exception as e:
-            print(f"Erreur lors du comptage des notifications: {e}")
+        except Exception:
+            logger.exception("Erreur lors du comptage des notifications")
             return 0
     
     @staticmethod
@@ -180,19 +194,8 @@ class Notification:
         
         Args:
             notif_data: Dictionnaire contenant les données de la notification
-            
+        
         Returns:
             Instance Notification
         """
-        notif = Notification(
-            user_id=notif_data['user_id'],
-            type_notification=notif_data['type_notification'],
-            titre=notif_data['titre'],
-            message=notif_data['message'],
-            is_read=notif_data.get('is_read', False),
-            lien=notif_data.get('lien'),
-            _id=notif_data['_id']
-        )
-        notif.created_at = notif_data.get('created_at')
-        notif.updated_at = notif_data.get('updated_at')
-        return notif
+        return SCHEMA.decode(notif_data)
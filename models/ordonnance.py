@@ -5,12 +5,34 @@ Modèle Ordonnance - Gestion des ordonnances médicales
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, REF, DATE
+from models.medecin_patient import MedecinPatient
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('Ordonnance', [
+    Field('_id', ID),
+    Field('patient_id', REF),
+    Field('medecin_id', REF),
+    Field('date_ordonnance', DATE),
+    Field('traitements', default_factory=list),  # Liste de dictionnaires {medicament, posologie, duree}
+    Field('instructions'),
+    # PDF base64 stocké seulement s'il est chargé: une mise à jour ne l'efface pas
+    Field('pdf_data', public=False, omit_none=True),
+    Field('has_pdf', default=False),
+    Field('created_at', DATE),
+    Field('updated_at', DATE)
+])
+
+@SCHEMA.bind
 class Ordonnance:
     """
     Classe représentant une ordonnance médicale
     """
     
+    __slots__ = SCHEMA.slots
+    
     def __init__(self, patient_id, medecin_id, date_ordonnance, 
                  traitements=None, instructions=None, pdf_data=None, _id=None):
         """
@@ -32,6 +54,7 @@ class Ordonnance:
         self.traitements = traitements or []  # Liste de dictionnaires {medicament, posologie, duree}
         self.instructions = instructions
         self.pdf_data = pdf_data  # PDF en base64 (optionnel, généré à la demande)
+        self.has_pdf = pdf_data is not None  # Conservé si le PDF n'est pas chargé (projection)
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
     
@@ -45,17 +68,8 @@ class Ordonnance:
         Returns:
             Dictionnaire représentant l'ordonnance
         """
-        data = {
-            '_id': str(self._id),
-            'patient_id': str(self.patient_id),
-            'medecin_id': str(self.medecin_id),
-            'date_ordonnance': self.date_ordonnance.isoformat() if isinstance(self.date_ordonnance, datetime) else self.date_ordonnance,
-            'traitements': self.traitements,
-            'instructions': self.instructions,
-            'has_pdf': self.pdf_data is not None,  # Indique si un PDF est disponible
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
+        data = SCHEMA.to_json(self)
+        data['has_pdf'] = self.has_pdf or self.pdf_data is not None  # Indique si un PDF est disponible
         
         # Inclure le PDF seulement si demandé
         if include_pdf and self.pdf_data:
@@ -63,6 +77,17 @@ class Ordonnance:
         
         return data
     
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        ordonnance_dict = SCHEMA.to_document(self)
+        ordonnance_dict['has_pdf'] = self.has_pdf or self.pdf_data is not None
+        return ordonnance_dict
+    
     def save(self):
         """
         Sauvegarde l'ordonnance dans la base de données
@@ -73,12 +98,11 @@ class Ordonnance:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        ordonnance_dict = self.to_dict(include_pdf=True)  # Inclure le PDF
-        ordonnance_dict['_id'] = self._id
-        ordonnance_dict['patient_id'] = self.patient_id
-        ordonnance_dict['medecin_id'] = self.medecin_id
-        
+        ordonnance_dict = self.to_document()
         result = db.ordonnances.insert_one(ordonnance_dict)
+        
+        # Patients du médecin et compteur du dashboard
+        MedecinPatient.link(self.medecin_id, self.patient_id)
         return str(result.inserted_id)
     
     def update(self):
@@ -91,14 +115,8 @@ class Ordonnance:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        ordonnance_dict = self.to_dict(include_pdf=True)  # Inclure le PDF lors de la mise à jour
+        ordonnance_dict = self.to_document()  # Inclut le PDF s'il est chargé
         ordonnance_dict.pop('_id', None)
-        ordonnance_dict['patient_id'] = self.patient_id
-        ordonnance_dict['medecin_id'] = self.medecin_id
-        
-        # Inclure explicitement pdf_data si présent
-        if self.pdf_data:
-            ordonnance_dict['pdf_data'] = self.pdf_data
         
         result = db.ordonnances.update_one(
             {'_id': self._id},
@@ -113,7 +131,7 @@ class Ordonnance:
         
         Args:
             ordonnance_id: ID de l'ordonnance (string ou ObjectId)
-            
+        
         Returns:
             Instance Ordonnance ou None
         """
@@ -124,34 +142,36 @@ class Ordonnance:
             
             if ordonnance_data:
                 return Ordonnance._from_dict(ordonnance_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche de l'ordonnance: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche de l'ordonnance")
         return None
     
     @staticmethod
-    def find_by_patient(patient_id, limit=50):
+    def find_by_patient(patient_id, limit=50, include_pdf=True):
         """
         Trouve toutes les ordonnances d'un patient
         
         Args:
             patient_id: ID du patient
             limit: Nombre maximum de résultats
-            
+            include_pdf: Si False, le PDF (base64) n'est pas lu depuis la base
+        
         Returns:
             Liste d'instances Ordonnance
         """
         db = get_db()
         try:
             _id = ObjectId(patient_id) if isinstance(patient_id, str) else patient_id
-            ordonnances_data = db.ordonnances.find({'patient_id': _id}).sort('date_ordonnance', -1).limit(limit)
+            projection = None if include_pdf else {'pdf_data': 0}
+            ordonnances_data = db.ordonnances.find({'patient_id': _id}, projection).sort('date_ordonnance', -1).limit(limit)
             
             ordonnances = []
             for ordonnance_data in ordonnances_data:
                 ordonnances.append(Ordonnance._from_dict(ordonnance_data))
             
             return ordonnances
-        except Exception as e:
-            print(f"Erreur lors de la recherche des ordonnances: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des ordonnances")
             return []
     
     @staticmethod
@@ -162,7 +182,7 @@ class Ordonnance:
         Args:
             medecin_id: ID du médecin
             limit: Nombre maximum de résultats
-            
+        
         Returns:
             Liste d'instances Ordonnance
         """
@@ -176,10 +196,29 @@ class Ordonnance:
                 ordonnances.append(Ordonnance._from_dict(ordonnance_data))
             
             return ordonnances
-        except Exception as e:
-            print(f"Erreur lors de la recherche des ordonnances: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des ordonnances")
             return []
     
+    @staticmethod
+    def count_by_patient(patient_id):
+        """
+        Compte les ordonnances d'un patient
+        
+        Args:
+            patient_id: ID du patient
+        
+        Returns:
+            Nombre d'ordonnances
+        """
+        db = get_db()
+        try:
+            _id = ObjectId(patient_id) if isinstance(patient_id, str) else patient_id
+            return db.ordonnances.count_documents({'patient_id': _id})
+        except Exception:
+            logger.exception("Erreur lors du comptage des ordonnances")
+            return 0
+    
     @staticmethod
     def _from_dict(ordonnance_data):
         """
@@ -187,20 +226,9 @@ class Ordonnance:
         
         Args:
             ordonnance_data: Dictionnaire contenant les données de l'ordonnance
-            
+        
         Returns:
             Instance Ordonnance
         """
-        ordonnance = Ordonnance(
-            patient_id=ordonnance_data['patient_id'],
-            medecin_id=ordonnance_data['medecin_id'],
-            date_ordonnance=ordonnance_data['date_ordonnance'],
-            traitements=ordonnance_data.get('traitements', []),
-            instructions=ordonnance_data.get('instructions'),
-            pdf_data=ordonnance_data.get('pdf_data'),
-            _id=ordonnance_data['_id']
-        )
-        ordonnance.created_at = ordonnance_data.get('created_at')
-        ordonnance.updated_at = ordonnance_data.get('updated_at')
-        return ordonnance
+        return SCHEMA.decode(ordonnance_data)
 
@@ -5,12 +5,36 @@ Modèle Patient - Gestion des patients de la clinique
 from datetime import datetime
 from bson import ObjectId
 from config.database import get_db
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, REF, DATE, ISO
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('Patient', [
+    Field('_id', ID),
+    Field('nom'),
+    Field('prenom'),
+    Field('email'),
+    Field('telephone'),
+    Field('date_naissance', ISO),
+    Field('adresse'),
+    Field('ville'),
+    Field('code_postal'),
+    Field('sexe'),
+    Field('numero_securite_sociale'),
+    Field('user_id', REF),
+    Field('created_at', DATE),
+    Field('updated_at', DATE)
+])
+
+@SCHEMA.bind
 class Patient:
     """
     Classe représentant un patient
     """
     
+    __slots__ = SCHEMA.slots
+    
     def __init__(self, nom, prenom, email=None, telephone=None, date_naissance=None, 
                  adresse=None, ville=None, code_postal=None, sexe=None, 
                  numero_securite_sociale=None, user_id=None, _id=None):
@@ -53,23 +77,16 @@ class Patient:
         Returns:
             Dictionnaire représentant le patient
         """
-        data = {
-            '_id': str(self._id),
-            'nom': self.nom,
-            'prenom': self.prenom,
-            'email': self.email,
-            'telephone': self.telephone,
-            'date_naissance': self.date_naissance.isoformat() if isinstance(self.date_naissance, datetime) else self.date_naissance,
-            'adresse': self.adresse,
-            'ville': self.ville,
-            'code_postal': self.code_postal,
-            'sexe': self.sexe,
-            'numero_securite_sociale': self.numero_securite_sociale,
-            'user_id': str(self.user_id) if self.user_id else None,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
-        return data
+        return SCHEMA.to_json(self)
+    
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        return SCHEMA.to_document(self)
     
     def save(self):
         """
@@ -81,11 +98,7 @@ class Patient:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        patient_dict = self.to_dict()
-        patient_dict['_id'] = self._id
-        if self.user_id:
-            patient_dict['user_id'] = self.user_id
-        
+        patient_dict = self.to_document()
         result = db.patients.insert_one(patient_dict)
         return str(result.inserted_id)
     
@@ -99,10 +112,8 @@ class Patient:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        patient_dict = self.to_dict()
+        patient_dict = self.to_document()
         patient_dict.pop('_id', None)
-        if patient_dict.get('user_id'):
-            patient_dict['user_id'] = ObjectId(patient_dict['user_id'])
         
         result = db.patients.update_one(
             {'_id': self._id},
@@ -117,7 +128,7 @@ class Patient:
         
         Args:
             patient_id: ID du patient (string ou ObjectId)
-            
+        
         Returns:
             Instance Patient ou None
         """
@@ -128,10 +139,31 @@ class Patient:
             
             if patient_data:
                 return Patient._from_dict(patient_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche du patient: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche du patient")
         return None
     
+    @staticmethod
+    def find_by_ids(patient_ids):
+        """
+        Trouve plusieurs patients en une requête
+        
+        Args:
+            patient_ids: IDs des patients (string ou ObjectId)
+            
+        Returns:
+            Dictionnaire ID (ObjectId) -> instance Patient
+        """
+        db = get_db()
+        ids = [ObjectId(patient_id) if isinstance(patient_id, str) else patient_id for patient_id in patient_ids]
+        if not ids:
+            return {}
+        
+        patients = {}
+        for patient_data in db.patients.find({'_id': {'$in': ids}}):
+            patients[patient_data['_id']] = Patient._from_dict(patient_data)
+        return patients
+    
     @staticmethod
     def find_by_email(email):
         """
@@ -139,7 +171,7 @@ class Patient:
         
         Args:
             email: Email du patient
-            
+        
         Returns:
             Instance Patient ou None
         """
@@ -157,7 +189,7 @@ class Patient:
         
         Args:
             user_id: ID du compte utilisateur
-            
+        
         Returns:
             Instance Patient ou None
         """
@@ -168,8 +200,8 @@ class Patient:
             
             if patient_data:
                 return Patient._from_dict(patient_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche du patient: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche du patient")
         return None
     
     @staticmethod
@@ -179,21 +211,12 @@ class Patient:
         
         Args:
             query_text: Texte de recherche
-            
+        
         Returns:
             Liste d'instances Patient
         """
         db = get_db()
-        regex_query = {'$regex': query_text, '$options': 'i'}
-        
-        patients_data = db.patients.find({
-            '$or': [
-                {'nom': regex_query},
-                {'prenom': regex_query},
-                {'email': regex_query},
-                {'telephone': regex_query}
-            ]
-        })
+        patients_data = db.patients.find(Patient._search_filter(query_text))
         
         patients = []
         for patient_data in patients_data:
@@ -201,6 +224,78 @@ class Patient:
         
         return patients
     
+    @staticmethod
+    def _search_filter(query_text, prefix=''):
+        """
+        Filtre de recherche par nom, prénom, email ou téléphone
+        
+        Args:
+            query_text: Texte de recherche
+            prefix: Préfixe des champs (document joint par $lookup)
+        """
+        regex_query = {'$regex': query_text, '$options': 'i'}
+        return {
+            '$or': [
+                {f'{prefix}{field}': regex_query}
+                for field in ('nom', 'prenom', 'email', 'telephone')
+            ]
+        }
+    
+    @staticmethod
+    def find_by_medecin(medecin_id, query_text=None, limit=20, skip=0):
+        """
+        Patients d'un médecin, du plus récemment suivi au plus ancien
+        
+        Jointure de la collection medecin_patients (index medecin_id,
+        derniere_activite, patient_id) vers patients (_id), paginée côté base
+        
+        Args:
+            medecin_id: ID du médecin
+            query_text: Texte de recherche (optionnel)
+            limit: Nombre maximum de résultats
+            skip: Nombre de résultats à ignorer
+        
+        Returns:
+            Tuple (liste d'instances Patient, nombre total de patients correspondants)
+        """
+        db = get_db()
+        try:
+            _id = ObjectId(medecin_id) if isinstance(medecin_id, str) else medecin_id
+            lookup = {'$lookup': {
+                'from': 'patients',
+                'localField': 'patient_id',
+                'foreignField': '_id',
+                'as': 'patient'
+            }}
+            pipeline = [
+                {'$match': {'medecin_id': _id}},
+                {'$sort': {'derniere_activite': -1, 'patient_id': 1}}
+            ]
+            
+            if query_text:
+                # La recherche porte sur le patient joint: jointure avant pagination
+                pipeline += [lookup, {'$match': Patient._search_filter(query_text, prefix='patient.')}]
+                page = [{'$skip': skip}, {'$limit': limit}]
+            else:
+                # Sans recherche, seule la page courante est jointe
+                page = [{'$skip': skip}, {'$limit': limit}, lookup]
+            
+            pipeline.append({'$facet': {
+                'patients': page + [{'$unwind': '$patient'}, {'$replaceRoot': {'newRoot': '$patient'}}],
+                'total': [{'$count': 'total'}]
+            }})
+            
+            result = next(db.medecin_patients.aggregate(pipeline), None)
+            if result is None:
+                return [], 0
+            
+            patients = [Patient._from_dict(patient_data) for patient_data in result['patients']]
+            total = result['total'][0]['total'] if result['total'] else 0
+            return patients, total
+        except Exception:
+            logger.exception("Erreur lors de la recherche des patients du médecin")
+            return [], 0
+    
     @staticmethod
     def find_all(limit=100, skip=0):
         """
@@ -209,18 +304,29 @@ class Patient:
         Args:
             limit: Nombre maximum de résultats
             skip: Nombre de résultats à ignorer
-            
+        
         Returns:
             Liste d'instances Patient
         """
+        return list(Patient.iter_all(limit=limit, skip=skip))
+    
+    @staticmethod
+    def iter_all(limit=100, skip=0):
+        """
+        Parcourt les patients au fil du curseur (réponses diffusées)
+        
+        Args:
+            limit: Nombre maximum de résultats
+            skip: Nombre de résultats à ignorer
+        
+        Returns:
+            Générateur d'instances Patient
+        """
         db = get_db()
         patients_data = db.patients.find().skip(skip).limit(limit).sort('created_at', -1)
         
-        patients = []
         for patient_data in patients_data:
-            patients.append(Patient._from_dict(patient_data))
-        
-        return patients
+            yield Patient._from_dict(patient_data)
     
     @staticmethod
     def _from_dict(patient_data):
@@ -229,25 +335,9 @@ class Patient:
         
         Args:
             patient_data: Dictionnaire contenant les données du patient
-            
+        
         Returns:
             Instance Patient
         """
-        patient = Patient(
-            nom=patient_data['nom'],
-            prenom=patient_data['prenom'],
-            email=patient_data.get('email'),
-            telephone=patient_data.get('telephone'),
-            date_naissance=patient_data.get('date_naissance'),
-            adresse=patient_data.get('adresse'),
-            ville=patient_data.get('ville'),
-            code_postal=patient_data.get('code_postal'),
-            sexe=patient_data.get('sexe'),
-            numero_securite_sociale=patient_data.get('numero_securite_sociale'),
-            user_id=patient_data.get('user_id'),
-            _id=patient_data['_id']
-        )
-        patient.created_at = patient_data.get('created_at')
-        patient.updated_at = patient_data.get('updated_at')
-        return patient
+        return SCHEMA.decode(patient_data)
 
@@ -2,15 +2,36 @@
 Modèle RendezVous - Gestion des rendez-vous médicaux
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from bson import ObjectId
 from config.database import get_db
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, REF, DATE
+from models.medecin_patient import MedecinPatient
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('RendezVous', [
+    Field('_id', ID),
+    Field('patient_id', REF),
+    Field('medecin_id', REF),
+    Field('date_rdv', DATE),
+    Field('heure_rdv'),
+    Field('motif'),
+    Field('statut', default='demande'),
+    Field('notes'),
+    Field('created_at', DATE),
+    Field('updated_at', DATE)
+])
+
+@SCHEMA.bind
 class RendezVous:
     """
     Classe représentant un rendez-vous médical
     """
     
+    __slots__ = SCHEMA.slots
+    
     STATUT_DEMANDE = 'demande'
     STATUT_CONFIRME = 'confirme'
     STATUT_ANNULE = 'annule'
@@ -49,19 +70,16 @@ class RendezVous:
         Returns:
             Dictionnaire représentant le rendez-vous
         """
-        data = {
-            '_id': str(self._id),
-            'patient_id': str(self.patient_id),
-            'medecin_id': str(self.medecin_id),
-            'date_rdv': self.date_rdv.isoformat() if isinstance(self.date_rdv, datetime) else self.date_rdv,
-            'heure_rdv': self.heure_rdv,
-            'motif': self.motif,
-            'statut': self.statut,
-            'notes': self.notes,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
-        return data
+        return SCHEMA.to_json(self)
+    
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        return SCHEMA.to_document(self)
     
     def save(self):
         """
@@ -73,12 +91,11 @@ class RendezVous:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        rdv_dict = self.to_dict()
-        rdv_dict['_id'] = self._id
-        rdv_dict['patient_id'] = self.patient_id
-        rdv_dict['medecin_id'] = self.medecin_id
-        
+        rdv_dict = self.to_document()
         result = db.rendezvous.insert_one(rdv_dict)
+        
+        # Patients du médecin et compteur du dashboard
+        MedecinPatient.link(self.medecin_id, self.patient_id)
         return str(result.inserted_id)
     
     def update(self):
@@ -91,10 +108,8 @@ class RendezVous:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        rdv_dict = self.to_dict()
+        rdv_dict = self.to_document()
         rdv_dict.pop('_id', None)
-        rdv_dict['patient_id'] = self.patient_id
-        rdv_dict['medecin_id'] = self.medecin_id
         
         result = db.rendezvous.update_one(
             {'_id': self._id},
@@ -120,7 +135,7 @@ class RendezVous:
         
         Args:
             rdv_id: ID du rendez-vous (string ou ObjectId)
-            
+        
         Returns:
             Instance RendezVous ou None
         """
@@ -131,19 +146,20 @@ class RendezVous:
             
             if rdv_data:
                 return RendezVous._from_dict(rdv_data)
-        except Exception as e:
-            print(f"Erreur lors de la recherche du rendez-vous: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche du rendez-vous")
         return None
     
     @staticmethod
-    def find_by_patient(patient_id, statut=None):
+    def find_by_patient(patient_id, statut=None, limit=None):
         """
         Trouve tous les rendez-vous d'un patient
         
         Args:
             patient_id: ID du patient
             statut: Filtrer par statut (optionnel)
-            
+            limit: Nombre maximum de résultats (optionnel)
+        
         Returns:
             Liste d'instances RendezVous
         """
@@ -155,14 +171,16 @@ class RendezVous:
                 query['statut'] = statut
             
             rdvs_data = db.rendezvous.find(query).sort('date_rdv', -1)
+            if limit:
+                rdvs_data = rdvs_data.limit(limit)
             
             rdvs = []
             for rdv_data in rdvs_data:
                 rdvs.append(RendezVous._from_dict(rdv_data))
             
             return rdvs
-        except Exception as e:
-            print(f"Erreur lors de la recherche des rendez-vous: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des rendez-vous")
             return []
     
     @staticmethod
@@ -175,7 +193,7 @@ class RendezVous:
             date_debut: Date de début (optionnel)
             date_fin: Date de fin (optionnel)
             statut: Filtrer par statut (optionnel)
-            
+        
         Returns:
             Liste d'instances RendezVous
         """
@@ -206,8 +224,8 @@ class RendezVous:
                 rdvs.append(RendezVous._from_dict(rdv_data))
             
             return rdvs
-        except Exception as e:
-            print(f"Erreur lors de la recherche des rendez-vous: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des rendez-vous")
             return []
     
     @staticmethod
@@ -218,7 +236,7 @@ class RendezVous:
         Args:
             date_rdv: Date du rendez-vous
             medecin_id: ID du médecin (optionnel)
-            
+        
         Returns:
             Liste d'instances RendezVous
         """
@@ -251,10 +269,63 @@ class RendezVous:
                 rdvs.append(RendezVous._from_dict(rdv_data))
             
             return rdvs
-        except Exception as e:
-            print(f"Erreur lors de la recherche des rendez-vous: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la recherche des rendez-vous")
             return []
     
+    @staticmethod
+    def summary_by_medecin(medecin_id, date_debut, date_fin, limit_first_day=5):
+        """
+        Synthèse des rendez-vous d'un médecin sur une période, en une seule
+        agrégation sur l'index (medecin_id, date_rdv)
+        
+        Args:
+            medecin_id: ID du médecin
+            date_debut: Début de la période (inclus, minuit)
+            date_fin: Fin de la période (exclue)
+            limit_first_day: Nombre de rendez-vous du premier jour renvoyés en détail
+        
+        Returns:
+            Tuple (nombre de rendez-vous par jour puis par statut,
+            liste d'instances RendezVous du premier jour triées par heure)
+        """
+        db = get_db()
+        try:
+            _id = ObjectId(medecin_id) if isinstance(medecin_id, str) else medecin_id
+            fin_premier_jour = datetime.combine(date_debut.date(), datetime.min.time()) + timedelta(days=1)
+            
+            result = next(db.rendezvous.aggregate([
+                {'$match': {'medecin_id': _id, 'date_rdv': {'$gte': date_debut, '$lt': date_fin}}},
+                {'$facet': {
+                    'par_jour': [
+                        {'$group': {
+                            '_id': {
+                                'jour': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$date_rdv'}},
+                                'statut': '$statut'
+                            },
+                            'total': {'$sum': 1}
+                        }}
+                    ],
+                    'premier_jour': [
+                        {'$match': {'date_rdv': {'$lt': fin_premier_jour}}},
+                        {'$sort': {'heure_rdv': 1}},
+                        {'$limit': limit_first_day}
+                    ]
+                }}
+            ]), None)
+            
+            par_jour = {}
+            if result is None:
+                return par_jour, []
+            for group in result['par_jour']:
+                statuts = par_jour.setdefault(group['_id']['jour'], {})
+                statuts[group['_id']['statut']] = group['total']
+            
+            return par_jour, [RendezVous._from_dict(rdv_data) for rdv_data in result['premier_jour']]
+        except Exception:
+            logger.exception("Erreur lors de la synthèse des rendez-vous")
+            return {}, []
+    
     @staticmethod
     def check_disponibilite(medecin_id, date_rdv, heure_rdv):
         """
@@ -264,7 +335,7 @@ class RendezVous:
             medecin_id: ID du médecin
             date_rdv: Date du rendez-vous
             heure_rdv: Heure du rendez-vous
-            
+        
         Returns:
             True si disponible, False sinon
         """
@@ -286,8 +357,8 @@ class RendezVous:
             })
             
             return existing_rdv is None
-        except Exception as e:
-            print(f"Erreur lors de la vérification de disponibilité: {e}")
+        except Exception:
+            logger.exception("Erreur lors de la vérification de disponibilité")
             return False
     
     @staticmethod
@@ -297,21 +368,9 @@ class RendezVous:
         
         Args:
             rdv_data: Dictionnaire contenant les données du rendez-vous
-            
+        
         Returns:
             Instance RendezVous
         """
-        rdv = RendezVous(
-            patient_id=rdv_data['patient_id'],
-            medecin_id=rdv_data['medecin_id'],
-            date_rdv=rdv_data['date_rdv'],
-            heure_rdv=rdv_data['heure_rdv'],
-            motif=rdv_data.get('motif'),
-            statut=rdv_data.get('statut', RendezVous.STATUT_DEMANDE),
-            notes=rdv_data.get('notes'),
-            _id=rdv_data['_id']
-        )
-        rdv.created_at = rdv_data.get('created_at')
-        rdv.updated_at = rdv_data.get('updated_at')
-        return rdv
+        return SCHEMA.decode(rdv_data)
 
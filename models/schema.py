@@ -0,0 +1,143 @@
+"""
+Schéma déclaratif des modèles: conversion document MongoDB <-> instance <-> vue JSON
+
+Chaque modèle déclare ses champs une seule fois; le schéma génère à la
+définition de la classe trois fonctions spécialisées (sans boucle ni
+introspection à l'exécution):
+- decode: document MongoDB -> instance, sans appeler __init__ (ni
+  datetime.utcnow(), ni conversion d'identifiants à l'hydratation)
+- to_document: instance -> document MongoDB (ObjectId, dates BSON)
+- to_json: instance -> vue JSON de l'API (identifiants en texte, dates ISO)
+
+Utilisation:
+    SCHEMA = Schema('RendezVous', [Field('_id', ID), Field('date_rdv', DATE), ...])
+    
+    @SCHEMA.bind
+    class RendezVous:
+        __slots__ = SCHEMA.slots
+"""
+
+from datetime import datetime
+
+from models.fields import to_datetime
+
+# Types de champs
+ID = 'id'          # Identifiant du document (_id)
+REF = 'ref'        # Référence ObjectId vers un autre document (texte dans la vue JSON)
+DATE = 'date'      # Date BSON (ISO dans la vue JSON)
+ISO = 'iso'        # Valeur stockée telle que saisie, ISO dans la vue JSON si c'est un datetime
+VALUE = 'value'    # Valeur stockée et exposée telle quelle
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _text_id(value):
+    return None if value is None else str(value)
+
+class Field:
+    """
+    Champ d'un modèle
+    
+    Args:
+        name: Nom de l'attribut et de la clé du document
+        kind: ID, REF, DATE, ISO ou VALUE
+        default: Valeur si la clé est absente du document
+        default_factory: Fabrique de la valeur par défaut (valeurs mutables)
+        public: False pour exclure le champ de la vue JSON (mots de passe, fichiers)
+        omit_none: Clé absente du document stocké si la valeur est None
+            (un $set partiel n'efface pas un fichier non chargé)
+    """
+    
+    __slots__ = ('name', 'kind', 'default', 'default_factory', 'public', 'omit_none')
+    
+    def __init__(self, name, kind=VALUE, default=None, default_factory=None, public=True, omit_none=False):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.default_factory = default_factory
+        self.public = public
+        self.omit_none = omit_none
+
+class Schema:
+    """
+    Fonctions de conversion générées pour un modèle
+    
+    Args:
+        model: Nom du modèle (messages d'erreur et traces)
+        fields: Liste de Field
+    """
+    
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = list(fields)
+        # Attributs des instances (__slots__ du modèle)
+        self.slots = tuple(field.name for field in self.fields)
+        self.to_document = self._compile_to_document()
+        self.to_json = self._compile_to_json()
+        self.decode = None
+    
+    def bind(self, cls):
+        """
+        Décorateur de classe: génère la fonction decode de la classe
+        """
+        self.decode = self._compile_decode(cls)
+        return cls
+    
+    def _compile(self, name, lines, namespace):
+        source = '\n'.join(lines)
+        exec(compile(source, f"<schema {self.model}.{name}>", 'exec'), namespace)
+        return namespace[name]
+    
+    def _compile_decode(self, cls):
+        namespace = {'_new': object.__new__, '_cls': cls}
+        lines = ['def decode(data):', '    obj = _new(_cls)', '    get = data.get']
+        for field in self.fields:
+            if field.kind == ID:
+                lines.append(f"    obj.{field.name} = data[{field.name!r}]")
+            elif field.default_factory is not None:
+                namespace[f'_factory_{field.name}'] = field.default_factory
+                lines.append(f"    value = get({field.name!r})")
+                lines.append(f"    obj.{field.name} = _factory_{field.name}() if value is None else value")
+            elif field.default is not None:
+                namespace[f'_default_{field.name}'] = field.default
+                lines.append(f"    obj.{field.name} = get({field.name!r}, _default_{field.name})")
+            else:
+                lines.append(f"    obj.{field.name} = get({field.name!r})")
+        lines.append('    return obj')
+        return self._compile('decode', lines, namespace)
+    
+    def _compile_to_document(self):
+        namespace = {'_to_datetime': to_datetime}
+        items = []
+        optional = []
+        for field in self.fields:
+            value = f"obj.{field.name}"
+            if field.kind == DATE:
+                value = f"_to_datetime({value})"
+            if field.omit_none:
+                optional.append(field.name)
+            else:
+                items.append(f"        {field.name!r}: {value},")
+        lines = ['def to_document(obj):', '    document = {', *items, '    }']
+        for name in optional:
+            lines.append(f"    if obj.{name} is not None:")
+            lines.append(f"        document[{name!r}] = obj.{name}")
+        lines.append('    return document')
+        return self._compile('to_document', lines, namespace)
+    
+    def _compile_to_json(self):
+        namespace = {'_iso': _iso, '_text_id': _text_id}
+        items = []
+        for field in self.fields:
+            if not field.public:
+                continue
+            value = f"obj.{field.name}"
+            if field.kind == ID:
+                value = f"str({value})"
+            elif field.kind == REF:
+                value = f"_text_id({value})"
+            elif field.kind in (DATE, ISO):
+                value = f"_iso({value})"
+            items.append(f"        {field.name!r}: {value},")
+        lines = ['def to_json(obj):', '    return {', *items, '    }']
+        return self._compile('to_json', lines, namespace)
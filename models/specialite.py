@@ -0,0 +1,118 @@
+"""
+Modèle Specialite - Catalogue des spécialités médicales
+
+Collection specialites (nom unique) avec le nombre de médecins actifs de
+chaque spécialité, recalculé à l'écriture des médecins et de leurs comptes.
+Les listes publiques et admin sont servies depuis le cache des catalogues
+(services/catalog_service.py), sans requête par appel
+"""
+
+from datetime import datetime
+import unicodedata
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from config.database import get_db
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+COLLECTION = 'specialites'
+
+def _sort_key(nom):
+    """
+    Clé de tri alphabétique française: accents et casse ignorés
+    ('Pédiatrie' avant 'Pneumologie', et non après 'Psychiatrie' comme en ordre binaire)
+    """
+    decomposed = unicodedata.normalize('NFD', nom)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold(), nom
+
+class Specialite:
+    """
+    Spécialité médicale et nombre de médecins actifs
+    """
+    
+    @staticmethod
+    def create(nom):
+        """
+        Ajoute une spécialité au catalogue
+        
+        Args:
+            nom: Nom de la spécialité
+        
+        Returns:
+            True si la spécialité a été créée, False si elle existait déjà
+        """
+        db = get_db()
+        now = datetime.utcnow()
+        try:
+            db[COLLECTION].insert_one({'nom': nom, 'nb_medecins': 0, 'created_at': now, 'updated_at': now})
+        except DuplicateKeyError:
+            return False
+        return True
+    
+    @staticmethod
+    def find_all():
+        """
+        Spécialités du catalogue, par ordre alphabétique
+        
+        Returns:
+            Liste de dictionnaires {nom, nb_medecins}
+        """
+        db = get_db()
+        # Tri en Python (catalogue de quelques dizaines d'entrées): ordre identique
+        # quel que soit le support des collations du serveur
+        specialites = db[COLLECTION].find({}, {'_id': 0, 'nom': 1, 'nb_medecins': 1})
+        return sorted(
+            (
+                {'nom': specialite['nom'], 'nb_medecins': specialite.get('nb_medecins', 0)}
+                for specialite in specialites
+            ),
+            key=lambda specialite: _sort_key(specialite['nom'])
+        )
+    
+    @staticmethod
+    def recount(db=None):
+        """
+        Recalcule le nombre de médecins actifs de chaque spécialité
+        
+        Une seule agrégation sur les médecins (peu nombreux) et leurs comptes:
+        un changement de spécialité ou une désactivation de compte est pris en
+        compte sans connaître l'état précédent. Les spécialités des médecins
+        absentes du catalogue y sont ajoutées
+        
+        Args:
+            db: Base de données MongoDB (base courante si None)
+        
+        Returns:
+            Dictionnaire nom -> nombre de médecins actifs
+        """
+        db = db if db is not None else get_db()
+        now = datetime.utcnow()
+        
+        counts = {}
+        for group in db.medecins.aggregate([
+            {'$lookup': {'from': 'users', 'localField': 'user_id', 'foreignField': '_id', 'as': 'user'}},
+            {'$unwind': '$user'},
+            {'$group': {
+                '_id': '$specialite',
+                'nb_medecins': {'$sum': {'$cond': [{'$eq': ['$user.is_active', False]}, 0, 1]}}
+            }}
+        ]):
+            if group['_id']:
+                counts[group['_id']] = group['nb_medecins']
+        
+        operations = [
+            UpdateOne(
+                {'nom': nom},
+                {'$set': {'nb_medecins': count, 'updated_at': now}, '$setOnInsert': {'created_at': now}},
+                upsert=True
+            )
+            for nom, count in counts.items()
+        ]
+        # Spécialités sans médecin
+        operations.append(UpdateMany(
+            {'nom': {'$nin': list(counts)}, 'nb_medecins': {'$ne': 0}},
+            {'$set': {'nb_medecins': 0, 'updated_at': now}}
+        ))
+        db[COLLECTION].bulk_write(operations, ordered=False)
+        return counts
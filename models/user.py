@@ -4,14 +4,39 @@ Modèle User - Gestion des utilisateurs du système
 
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from config.database import get_db
-import bcrypt
+from config.logger import get_logger
+from models.schema import Schema, Field, ID, DATE
+from models.specialite import Specialite
+from services.password_service import PasswordService, PasswordServiceBusy
+from services.catalog_service import CatalogService, MEDECINS, SPECIALITES
 
+logger = get_logger(__name__)
+
+SCHEMA = Schema('User', [
+    Field('_id', ID),
+    Field('email'),
+    Field('role'),
+    Field('nom'),
+    Field('prenom'),
+    Field('telephone'),
+    Field('is_active', default=True),
+    Field('created_at', DATE),
+    Field('updated_at', DATE),
+    # Données d'authentification (vue JSON: to_dict(include_password=True))
+    Field('password_hash', public=False),
+    Field('auth_version', default=0, public=False)
+])
+
+@SCHEMA.bind
 class User:
     """
     Classe représentant un utilisateur du système
     """
     
+    __slots__ = SCHEMA.slots
+    
     def __init__(self, email, password, role, nom=None, prenom=None, telephone=None, is_active=True, _id=None):
         """
         Initialise un utilisateur
@@ -34,36 +59,66 @@ class User:
         self.prenom = prenom
         self.telephone = telephone
         self.is_active = is_active
+        self.auth_version = 0  # Incrémentée pour révoquer les jetons émis
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
     
     def _hash_password(self, password):
         """
-        Hash le mot de passe avec bcrypt
+        Hash le mot de passe avec bcrypt (pool de threads du PasswordService)
         
         Args:
             password: Mot de passe en clair
-            
+        
         Returns:
             Mot de passe hashé
         """
-        import os
-        rounds = int(os.getenv('BCRYPT_ROUNDS', 12))
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+        return PasswordService.hash(password)
     
     def verify_password(self, password):
         """
         Vérifie si le mot de passe correspond
         
+        Un hachage calculé avec un autre coût que BCRYPT_ROUNDS est recalculé
+        et enregistré après une vérification réussie
+        
         Args:
             password: Mot de passe à vérifier
-            
+        
         Returns:
             True si le mot de passe est correct, False sinon
+        
+        Raises:
+            PasswordServiceBusy: Trop de calculs bcrypt en attente
         """
-        if not self.password_hash:
+        if not PasswordService.verify(password, self.password_hash):
             return False
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash)
+        
+        if PasswordService.needs_rehash(self.password_hash):
+            self._rehash_password(password)
+        return True
+    
+    def _rehash_password(self, password):
+        """
+        Remplace le hachage par un hachage au coût courant (sans révoquer les jetons)
+        
+        Args:
+            password: Mot de passe en clair, déjà vérifié
+        """
+        try:
+            new_hash = PasswordService.hash(password)
+        except PasswordServiceBusy:
+            # Mise à niveau reportée à la prochaine connexion
+            return
+        
+        db = get_db()
+        # Filtre sur l'ancien hachage: un changement de mot de passe concurrent l'emporte
+        result = db.users.update_one(
+            {'_id': self._id, 'password_hash': self.password_hash},
+            {'$set': {'password_hash': new_hash}}
+        )
+        if result.modified_count:
+            self.password_hash = new_hash
     
     def to_dict(self, include_password=False):
         """
@@ -71,27 +126,27 @@ class User:
         
         Args:
             include_password: Si True, inclut le hash du mot de passe
-            
+        
         Returns:
             Dictionnaire représentant l'utilisateur
         """
-        data = {
-            '_id': str(self._id),
-            'email': self.email,
-            'role': self.role,
-            'nom': self.nom,
-            'prenom': self.prenom,
-            'telephone': self.telephone,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            'updated_at': self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
-        }
+        data = SCHEMA.to_json(self)
         
         if include_password:
             data['password_hash'] = self.password_hash
+            data['auth_version'] = self.auth_version
         
         return data
     
+    def to_document(self):
+        """
+        Document MongoDB tel que stocké (identifiants en ObjectId, dates BSON)
+        
+        Returns:
+            Dictionnaire prêt pour insert_one/insert_many
+        """
+        return SCHEMA.to_document(self)
+    
     def save(self):
         """
         Sauvegarde l'utilisateur dans la base de données
@@ -102,10 +157,11 @@ class User:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        user_dict = self.to_dict(include_password=True)
-        user_dict['_id'] = self._id
-        
+        user_dict = self.to_document()
         result = db.users.insert_one(user_dict)
+        
+        # Pas de recomptage: aucun médecin ne référence encore ce compte
+        # (Medecin.save met à jour la liste publique et les spécialités)
         return str(result.inserted_id)
     
     def update(self):
@@ -118,15 +174,30 @@ class User:
         db = get_db()
         self.updated_at = datetime.utcnow()
         
-        user_dict = self.to_dict(include_password=True)
+        user_dict = self.to_document()
         # Ne pas inclure _id dans la mise à jour
         user_dict.pop('_id', None)
+        # Données d'authentification modifiées uniquement par reset_password/revoke_tokens:
+        # une copie chargée avant une révocation ne doit pas la réécrire
+        user_dict.pop('password_hash', None)
+        user_dict.pop('auth_version', None)
         
-        result = db.users.update_one(
+        # État précédent: liste publique et spécialités mises à jour seulement si elles changent
+        previous = db.users.find_one_and_update(
             {'_id': self._id},
-            {'$set': user_dict}
+            {'$set': user_dict},
+            projection={'nom': 1, 'prenom': 1, 'is_active': 1},
+            return_document=ReturnDocument.BEFORE
         )
-        return result.modified_count > 0
+        
+        if previous is not None and self.role == 'medecin':
+            if previous.get('is_active', True) != self.is_active:
+                # Médecins actifs par spécialité
+                Specialite.recount()
+                CatalogService.invalidate(MEDECINS, SPECIALITES)
+            elif (previous.get('nom'), previous.get('prenom')) != (self.nom, self.prenom):
+                CatalogService.invalidate(MEDECINS)
+        return previous is not None
     
     @staticmethod
     def find_by_email(email):
@@ -135,7 +206,7 @@ class User:
         
         Args:
             email: Email de l'utilisateur
-            
+        
         Returns:
             Instance User ou None
         """
@@ -143,20 +214,7 @@ class User:
         user_data = db.users.find_one({'email': email})
         
         if user_data:
-            user = User(
-                email=user_data['email'],
-                password=None,  # Ne pas charger le mot de passe
-                role=user_data['role'],
-                nom=user_data.get('nom'),
-                prenom=user_data.get('prenom'),
-                telephone=user_data.get('telephone'),
-                is_active=user_data.get('is_active', True),
-                _id=user_data['_id']
-            )
-            user.password_hash = user_data.get('password_hash')
-            user.created_at = user_data.get('created_at')
-            user.updated_at = user_data.get('updated_at')
-            return user
+            return User._from_dict(user_data)
         return None
     
     @staticmethod
@@ -166,7 +224,7 @@ class User:
         
         Args:
             user_id: ID de l'utilisateur (string ou ObjectId)
-            
+        
         Returns:
             Instance User ou None
         """
@@ -176,24 +234,32 @@ class User:
             user_data = db.users.find_one({'_id': _id})
             
             if user_data:
-                user = User(
-                    email=user_data['email'],
-                    password=None,
-                    role=user_data['role'],
-                    nom=user_data.get('nom'),
-                    prenom=user_data.get('prenom'),
-                    telephone=user_data.get('telephone'),
-                    is_active=user_data.get('is_active', True),
-                    _id=user_data['_id']
-                )
-                user.password_hash = user_data.get('password_hash')
-                user.created_at = user_data.get('created_at')
-                user.updated_at = user_data.get('updated_at')
-                return user
-        except Exception as e:
-            print(f"Erreur lors de la recherche de l'utilisateur: {e}")
+                return User._from_dict(user_data)
+        except Exception:
+            logger.exception("Erreur lors de la recherche de l'utilisateur")
         return None
     
+    @staticmethod
+    def find_by_ids(user_ids):
+        """
+        Trouve plusieurs utilisateurs en une requête
+        
+        Args:
+            user_ids: IDs des utilisateurs (string ou ObjectId)
+            
+        Returns:
+            Dictionnaire ID (ObjectId) -> instance User
+        """
+        db = get_db()
+        ids = [ObjectId(user_id) if isinstance(user_id, str) else user_id for user_id in user_ids]
+        if not ids:
+            return {}
+        
+        users = {}
+        for user_data in db.users.find({'_id': {'$in': ids}}):
+            users[user_data['_id']] = User._from_dict(user_data)
+        return users
+    
     @staticmethod
     def find_all(role=None, is_active=None):
         """
@@ -206,6 +272,20 @@ class User:
         Returns:
             Liste d'instances User
         """
+        return list(User.iter_all(role=role, is_active=is_active))
+    
+    @staticmethod
+    def iter_all(role=None, is_active=None):
+        """
+        Parcourt les utilisateurs au fil du curseur (réponses diffusées)
+        
+        Args:
+            role: Filtrer par rôle
+            is_active: Filtrer par statut actif
+            
+        Returns:
+            Générateur d'instances User
+        """
         db = get_db()
         query = {}
         
@@ -214,25 +294,8 @@ class User:
         if is_active is not None:
             query['is_active'] = is_active
         
-        users_data = db.users.find(query)
-        users = []
-        
-        for user_data in users_data:
-            user = User(
-                email=user_data['email'],
-                password=None,
-                role=user_data['role'],
-                nom=user_data.get('nom'),
-                prenom=user_data.get('prenom'),
-                telephone=user_data.get('telephone'),
-                is_active=user_data.get('is_active', True),
-                _id=user_data['_id']
-            )
-            user.created_at = user_data.get('created_at')
-            user.updated_at = user_data.get('updated_at')
-            users.append(user)
-        
-        return users
+        for user_data in db.users.find(query):
+            yield User._from_dict(user_data)
     
     def reset_password(self, new_password):
         """
@@ -241,6 +304,43 @@ class User:
         Args:
             new_password: Nouveau mot de passe en clair
         """
-        self.password_hash = self._hash_password(new_password)
-        self.update()
-
+        new_hash = self._hash_password(new_password)
+        self.updated_at = datetime.utcnow()
+        
+        db = get_db()
+        # Un changement de mot de passe invalide les jetons existants ($inc: sans
+        # écraser une révocation concurrente)
+        db.users.update_one(
+            {'_id': self._id},
+            {'$set': {'password_hash': new_hash, 'updated_at': self.updated_at}, '$inc': {'auth_version': 1}}
+        )
+        self.password_hash = new_hash
+        self.auth_version += 1
+    
+    def revoke_tokens(self):
+        """
+        Révoque tous les jetons émis en incrémentant la version d'authentification
+        
+        Returns:
+            True si la mise à jour a réussi
+        """
+        db = get_db()
+        result = db.users.update_one(
+            {'_id': self._id},
+            {'$inc': {'auth_version': 1}}
+        )
+        self.auth_version += 1
+        return result.modified_count > 0
+    
+    @staticmethod
+    def _from_dict(user_data):
+        """
+        Crée une instance User à partir d'un dictionnaire
+        
+        Args:
+            user_data: Dictionnaire contenant les données de l'utilisateur
+        
+        Returns:
+            Instance User
+        """
+        return SCHEMA.decode(user_data)
@@ -2,10 +2,18 @@
 Routes Médecin
 """
 
+from flask import request
 from controllers.medecin_controller import bp
 from middleware.auth import role_required
 
-# Appliquer la protection médecin à toutes les routes
-for endpoint, view_func in bp.view_functions.items():
-    bp.view_functions[endpoint] = role_required('medecin')(view_func)
+@role_required('medecin')
+def verifier_acces():
+    return None
 
+# Appliquer la protection médecin à toutes les routes
+# (un Blueprint n'utilise pas ses view_functions à l'enregistrement: la
+#  vérification est donc faite avant chaque requête, hors pré-requêtes CORS)
+@bp.before_request
+def proteger_routes():
+    if request.method != 'OPTIONS':
+        return verifier_acces()
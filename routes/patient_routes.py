@@ -2,11 +2,17 @@
 Routes Patient
 """
 
+from flask import request
 from controllers.patient_controller import bp
 from middleware.auth import login_required
 
-# Appliquer la protection login à toutes les routes sauf inscription
-for endpoint, view_func in bp.view_functions.items():
-    if endpoint != 'register':
-        bp.view_functions[endpoint] = login_required(view_func)
+@login_required
+def verifier_connexion():
+    return None
 
+# Appliquer la protection login à toutes les routes sauf inscription
+# (hors pré-requêtes CORS)
+@bp.before_request
+def proteger_routes():
+    if request.method != 'OPTIONS' and request.endpoint != 'patient.register':
+        return verifier_connexion()
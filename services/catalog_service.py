@@ -0,0 +1,221 @@
+"""
+Service des catalogues publics (informations de la clinique, médecins, spécialités)
+
+Les réponses sont encodées une fois puis servies depuis la mémoire du
+processus avec leur ETag. Une modification (configuration, médecin)
+invalide le catalogue localement et incrémente sa version dans MongoDB:
+les autres workers relisent les versions au plus toutes les
+CATALOG_VERSION_CHECK_SECONDS secondes
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+import time
+
+from config.database import get_db
+from config.logger import get_logger
+from middleware.json_response import dumps
+
+logger = get_logger(__name__)
+
+# Durée de vie maximale d'un catalogue en mémoire
+CATALOG_CACHE_SECONDS = float(os.getenv('CATALOG_CACHE_SECONDS', 300))
+# Intervalle de lecture des versions (invalidations des autres workers)
+CATALOG_VERSION_CHECK_SECONDS = float(os.getenv('CATALOG_VERSION_CHECK_SECONDS', 5))
+# Entrées conservées (variantes issues des paramètres de requête: mémoire bornée)
+CATALOG_MAX_ENTRIES = int(os.getenv('CATALOG_MAX_ENTRIES', 256))
+
+VERSIONS_COLLECTION = 'catalog_versions'
+
+CLINIQUE = 'clinique'
+MEDECINS = 'medecins'
+SPECIALITES = 'specialites'
+
+# Informations affichées tant qu'aucune configuration n'est enregistrée
+DEFAULT_CLINIQUE_INFO = {
+    'nom': 'Clinique Médicale',
+    'description': 'Votre santé est notre priorité. Nous offrons des soins médicaux de qualité avec une équipe de professionnels expérimentés.',
+    'adresse': '123 Rue de la Santé, 75000 Paris',
+    'telephone': '+33 1 23 45 67 89',
+    'email': 'contact@clinique-medicale.fr',
+    'horaires': {
+        'lundi': '08:00 - 18:00',
+        'mardi': '08:00 - 18:00',
+        'mercredi': '08:00 - 18:00',
+        'jeudi': '08:00 - 18:00',
+        'vendredi': '08:00 - 18:00',
+        'samedi': '09:00 - 13:00',
+        'dimanche': 'Fermé'
+    },
+    'services': [
+        'Consultation générale',
+        'Médecine spécialisée',
+        'Examens médicaux',
+        'Suivi médical',
+        'Urgences'
+    ]
+}
+
+class CatalogService:
+    """
+    Cache des catalogues publics, par processus
+    """
+    
+    _lock = threading.Lock()
+    # (catalogue, variante) -> (corps JSON, etag, version, date de chargement), ordre LRU
+    _entries = OrderedDict()
+    # catalogue -> version connue (collection catalog_versions)
+    _versions = {}
+    _versions_checked_at = float('-inf')
+    
+    @staticmethod
+    def get(catalog, variant, loader):
+        """
+        Corps JSON encodé et ETag d'un catalogue, chargé si absent ou périmé
+        
+        Args:
+            catalog: Nom du catalogue (CLINIQUE, MEDECINS, SPECIALITES)
+            variant: Variante de la réponse (ex: filtre), None sinon
+            loader: Fonction sans argument renvoyant l'objet à encoder
+        
+        Returns:
+            Tuple (corps JSON en bytes, etag)
+        """
+        CatalogService._refresh_versions()
+        key = (catalog, variant)
+        version = CatalogService._versions.get(catalog, 0)
+        now = time.monotonic()
+        
+        with CatalogService._lock:
+            entry = CatalogService._entries.get(key)
+            if entry is not None and entry[2] == version and now - entry[3] < CATALOG_CACHE_SECONDS:
+                CatalogService._entries.move_to_end(key)
+                return entry[0], entry[1]
+        
+        body = dumps(loader())
+        etag = hashlib.sha1(body).hexdigest()
+        with CatalogService._lock:
+            CatalogService._entries[key] = (body, etag, version, now)
+            CatalogService._entries.move_to_end(key)
+            # Variantes arbitraires (ex: ?specialite=...): les moins récentes sont évincées
+            while len(CatalogService._entries) > CATALOG_MAX_ENTRIES:
+                CatalogService._entries.popitem(last=False)
+        return body, etag
+    
+    @staticmethod
+    def invalidate(*catalogs):
+        """
+        Invalide des catalogues dans ce processus et dans les autres workers
+        
+        Args:
+            catalogs: Noms des catalogues modifiés
+        """
+        with CatalogService._lock:
+            for key in [key for key in CatalogService._entries if key[0] in catalogs]:
+                del CatalogService._entries[key]
+        
+        try:
+            db = get_db()
+            for catalog in catalogs:
+                db[VERSIONS_COLLECTION].update_one({'_id': catalog}, {'$inc': {'version': 1}}, upsert=True)
+        except Exception:
+            # Les autres workers rechargeront à l'expiration (CATALOG_CACHE_SECONDS)
+            logger.exception("Erreur lors de l'invalidation des catalogues")
+        
+        # Versions relues à la prochaine requête
+        CatalogService._versions_checked_at = float('-inf')
+    
+    @staticmethod
+    def _refresh_versions():
+        """
+        Relit les versions des catalogues, au plus une fois par intervalle
+        """
+        now = time.monotonic()
+        if now - CatalogService._versions_checked_at < CATALOG_VERSION_CHECK_SECONDS:
+            return
+        
+        with CatalogService._lock:
+            # Un seul thread relit les versions
+            if now - CatalogService._versions_checked_at < CATALOG_VERSION_CHECK_SECONDS:
+                return
+            CatalogService._versions_checked_at = now
+        
+        try:
+            versions = {doc['_id']: doc.get('version', 0) for doc in get_db()[VERSIONS_COLLECTION].find()}
+        except Exception:
+            logger.exception("Erreur lors de la lecture des versions des catalogues")
+            return
+        CatalogService._versions = versions
+    
+    @staticmethod
+    def clinique_info():
+        """
+        Informations publiques de la clinique (configuration ou valeurs par défaut)
+        """
+        config = get_db().clinique_config.find_one({})
+        if not config:
+            return DEFAULT_CLINIQUE_INFO
+        
+        return {
+            'nom': config.get('nom', 'Clinique Médicale'),
+            'description': config.get('description', ''),
+            'adresse': config.get('adresse', ''),
+            'telephone': config.get('telephone', ''),
+            'email': config.get('email', ''),
+            'horaires': config.get('horaires', {}),
+            'services': config.get('services', [])
+        }
+    
+    @staticmethod
+    def medecins(specialite=None):
+        """
+        Médecins dont le compte est actif (deux requêtes, sans les signatures)
+        
+        Args:
+            specialite: Filtrer par spécialité
+        """
+        from models.medecin import Medecin
+        from models.user import User
+        
+        if specialite:
+            medecins = Medecin.find_by_specialite(specialite, include_signature=False)
+        else:
+            medecins = Medecin.find_all(include_signature=False)
+        
+        users = User.find_by_ids([medecin.user_id for medecin in medecins])
+        
+        medecins_list = []
+        for medecin in medecins:
+            user = users.get(medecin.user_id)
+            if user and user.is_active:
+                medecins_list.append({
+                    '_id': str(medecin._id),
+                    'user_id': str(medecin.user_id),
+                    'nom': user.nom,
+                    'prenom': user.prenom,
+                    'specialite': medecin.specialite,
+                    'numero_ordre': medecin.numero_ordre
+                })
+        
+        return {'medecins': medecins_list}
+    
+    @staticmethod
+    def specialites(disponibles=False):
+        """
+        Spécialités du catalogue et nombre de médecins actifs de chacune
+        
+        Args:
+            disponibles: Si True, seulement les spécialités ayant au moins un médecin actif
+        """
+        from models.specialite import Specialite
+        
+        specialites = Specialite.find_all()
+        if disponibles:
+            specialites = [specialite for specialite in specialites if specialite['nb_medecins'] > 0]
+        
+        return {
+            'specialites': [specialite['nom'] for specialite in specialites],
+            'medecins_par_specialite': {specialite['nom']: specialite['nb_medecins'] for specialite in specialites}
+        }
@@ -0,0 +1,158 @@
+"""
+Service de synthèse des dashboards
+
+Le dashboard médecin est calculé en une seule agrégation sur l'index
+(medecin_id, date_rdv) et le nombre de patients est lu dans le compteur
+tenu à jour par MedecinPatient: le coût ne dépend plus de l'historique du médecin
+
+Les requêtes indépendantes du dashboard patient sont exécutées en parallèle
+dans un pool de threads: la latence est celle de la plus lente, pas leur somme
+"""
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models.document_medical import DocumentMedical
+from models.dossier_medical import DossierMedical
+from models.medecin_patient import MedecinPatient
+from models.notification import Notification
+from models.ordonnance import Ordonnance
+from models.patient import Patient
+from models.rendezvous import RendezVous
+
+# Nombre de jours couverts par les rendez-vous à venir (aujourd'hui inclus)
+DASHBOARD_DAYS = int(os.getenv('DASHBOARD_DAYS', 7))
+# Nombre de rendez-vous du jour renvoyés en détail
+DASHBOARD_TODAY_LIMIT = 5
+
+# Threads du pool partagé par les requêtes (une connexion MongoDB chacun au plus)
+DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', 8))
+# Nombre d'éléments récents renvoyés par liste du dashboard patient
+DASHBOARD_RECENT_LIMIT = 5
+
+STATUTS_ACTIFS = (RendezVous.STATUT_CONFIRME, RendezVous.STATUT_DEMANDE)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def _actifs(statuts):
+    return sum(statuts.get(statut, 0) for statut in STATUTS_ACTIFS)
+
+def _get_executor():
+    global _executor, _executor_pid
+    # Pool créé dans chaque worker (les threads ne survivent pas au fork)
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix='dashboard')
+            _executor_pid = os.getpid()
+        return _executor
+
+def _run_concurrently(tasks):
+    """
+    Exécute des fonctions sans argument en parallèle
+    
+    Chaque tâche s'exécute dans une copie du contexte de l'appelant: ses
+    commandes MongoDB restent attribuées à la requête en cours
+    (Server-Timing, journal des requêtes lentes)
+    
+    Args:
+        tasks: Dictionnaire nom -> fonction
+    
+    Returns:
+        Dictionnaire nom -> résultat
+    """
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, task)
+        for name, task in tasks.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+class DashboardService:
+    """
+    Service pour les statistiques des dashboards
+    """
+    
+    @staticmethod
+    def medecin_summary(medecin_id, today=None):
+        """
+        Statistiques du dashboard médecin
+        
+        Args:
+            medecin_id: ID du médecin
+            today: Date du jour (par défaut aujourd'hui, UTC)
+        
+        Returns:
+            Dictionnaire des compteurs et des premiers rendez-vous du jour
+        """
+        today = today or datetime.utcnow().date()
+        debut = datetime.combine(today, datetime.min.time())
+        fin = debut + timedelta(days=DASHBOARD_DAYS)
+        
+        par_jour, rdvs_today = RendezVous.summary_by_medecin(
+            medecin_id, debut, fin, limit_first_day=DASHBOARD_TODAY_LIMIT
+        )
+        
+        return {
+            'rdvs_aujourdhui': _actifs(par_jour.get(debut.strftime('%Y-%m-%d'), {})),
+            'rdvs_prochains': sum(_actifs(statuts) for statuts in par_jour.values()),
+            'nb_patients': MedecinPatient.count_by_medecin(medecin_id),
+            'rdvs_today': [rdv.to_dict() for rdv in rdvs_today],
+            'rdvs_par_jour': par_jour
+        }
+    
+    @staticmethod
+    def patient_summary(user_id):
+        """
+        Données du dashboard patient
+        
+        Deux étapes parallèles: patient et notifications (par utilisateur),
+        puis rendez-vous, ordonnances, documents et compteurs (par patient).
+        Les fichiers et PDF (base64) ne sont pas lus
+        
+        Args:
+            user_id: ID de l'utilisateur patient
+        
+        Returns:
+            Dictionnaire du dashboard, ou None si le patient est introuvable
+        """
+        first = _run_concurrently({
+            'patient': lambda: Patient.find_by_user_id(user_id),
+            'notifications': lambda: Notification.count_unread(user_id)
+        })
+        patient = first['patient']
+        if not patient:
+            return None
+        
+        patient_id = patient._id
+        results = _run_concurrently({
+            'rendezvous': lambda: RendezVous.find_by_patient(
+                patient_id, statut=RendezVous.STATUT_CONFIRME, limit=DASHBOARD_RECENT_LIMIT
+            ),
+            'ordonnances': lambda: Ordonnance.find_by_patient(
+                patient_id, limit=DASHBOARD_RECENT_LIMIT, include_pdf=False
+            ),
+            'documents': lambda: DocumentMedical.find_by_patient(
+                patient_id, limit=DASHBOARD_RECENT_LIMIT, include_file_data=False
+            ),
+            'nb_dossiers': lambda: DossierMedical.count_by_patient(patient_id),
+            'nb_ordonnances': lambda: Ordonnance.count_by_patient(patient_id)
+        })
+        
+        return {
+            'patient': patient.to_dict(),
+            'prochains_rendezvous': [rdv.to_dict() for rdv in results['rendezvous']],
+            'dernieres_ordonnances': [ordonnance.to_dict() for ordonnance in results['ordonnances']],
+            'derniers_documents': [document.to_dict() for document in results['documents']],
+            'notifications_non_lues': first['notifications'],
+            'dossiers': {
+                'total': results['nb_dossiers']
+            },
+            'ordonnances': {
+                'total': results['nb_ordonnances']
+            }
+        }
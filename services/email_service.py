@@ -1,15 +1,37 @@
 """
 Service d'envoi d'emails pour la plateforme
 Gère l'envoi des identifiants, notifications, etc.
+
+L'envoi SMTP (connexion, TLS, authentification: plusieurs centaines de ms)
+est confié à un pool de threads: la requête rend la main dès le message
+construit. EMAIL_ASYNC=False conserve l'envoi dans la requête
 """
 
-import smtplib
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from dotenv import load_dotenv
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.logger import get_logger
+from services.metrics_service import metrics, EMAIL_IN_FLIGHT, EMAILS_TOTAL
+
+logger = get_logger(__name__)
+
+EMAIL_ASYNC = os.getenv('EMAIL_ASYNC', 'True').lower() == 'true'
+# Envois SMTP simultanés par worker
+EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 2))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
 
-load_dotenv()
+def _get_executor():
+    global _executor, _executor_pid
+    # Pool créé dans chaque worker (les threads ne survivent pas au fork)
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix='email')
+            _executor_pid = os.getpid()
+        return _executor
 
 class EmailService:
     """
@@ -28,7 +50,7 @@ class EmailService:
     
     def send_email(self, to_email, subject, body_html, body_text=None):
         """
-        Envoie un email
+        Envoie un email (en arrière-plan si EMAIL_ASYNC)
         
         Args:
             to_email: Email du destinataire
@@ -37,9 +59,14 @@ class EmailService:
             body_text: Corps de l'email en texte (optionnel)
             
         Returns:
-            True si l'email a été envoyé avec succès, False sinon
+            True si l'email a été envoyé (ou mis en file d'envoi), False sinon
         """
+        metrics.inc(EMAIL_IN_FLIGHT)
         try:
+            # Import différé: MIME n'est chargé qu'au premier envoi
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+            
             # Création du message
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
@@ -54,6 +81,28 @@ class EmailService:
             part2 = MIMEText(body_html, 'html', 'utf-8')
             msg.attach(part2)
             
+            if EMAIL_ASYNC:
+                _get_executor().submit(self._deliver, msg, to_email)
+                return True
+        except Exception:
+            logger.exception("Erreur lors de la préparation de l'email", extra={'fields': {'destinataire': to_email}})
+            metrics.inc(EMAILS_TOTAL, {'status': 'failed'})
+            metrics.dec(EMAIL_IN_FLIGHT)
+            return False
+        
+        return self._deliver(msg, to_email)
+    
+    def _deliver(self, msg, to_email):
+        """
+        Envoi SMTP d'un message construit
+        
+        Returns:
+            True si l'email a été envoyé avec succès, False sinon
+        """
+        try:
+            # Import différé: smtplib n'est chargé qu'au premier envoi
+            import smtplib
+            
             # Connexion et envoi
             with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
                 server.starttls()
@@ -61,12 +110,17 @@ class EmailService:
                     server.login(self.smtp_user, self.smtp_password)
                 server.send_message(msg)
             
-            print(f"✅ Email envoyé avec succès à {to_email}")
+            logger.info("Email envoyé", extra={'fields': {'destinataire': to_email}})
+            metrics.inc(EMAILS_TOTAL, {'status': 'sent'})
             return True
             
-        except Exception as e:
-            print(f"❌ Erreur lors de l'envoi de l'email à {to_email}: {e}")
+        except Exception:
+            logger.exception("Erreur lors de l'envoi de l'email", extra={'fields': {'destinataire': to_email}})
+            metrics.inc(EMAILS_TOTAL, {'status': 'failed'})
             return False
+        
+        finally:
+            metrics.dec(EMAIL_IN_FLIGHT)
     
     def send_account_credentials(self, to_email, nom, prenom, email, password):
         """
@@ -0,0 +1,127 @@
+"""
+Service de vérification de l'état de l'application (sondes liveness/readiness)
+"""
+
+import os
+import threading
+import time
+
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Seuils de la sonde de disponibilité (readiness)
+READINESS_MAX_DB_LATENCY_MS = float(os.getenv('READINESS_MAX_DB_LATENCY_MS', 250))
+READINESS_MAX_POOL_USAGE = float(os.getenv('READINESS_MAX_POOL_USAGE', 0.9))
+READINESS_MAX_EMAIL_IN_FLIGHT = int(os.getenv('READINESS_MAX_EMAIL_IN_FLIGHT', 20))
+# Durée maximale du ping MongoDB (la sonde ne doit pas bloquer un worker)
+READINESS_TIMEOUT_MS = int(os.getenv('READINESS_TIMEOUT_MS', 1000))
+# Durée de mise en cache du résultat (la sonde reste peu coûteuse)
+READINESS_CACHE_SECONDS = float(os.getenv('READINESS_CACHE_SECONDS', 5))
+
+class HealthService:
+    """
+    Service pour les sondes d'état de l'application
+    
+    La liveness indique seulement que le processus répond; la readiness
+    vérifie les dépendances (MongoDB, pool, envois en cours) par rapport
+    à des seuils configurables
+    """
+    
+    _lock = threading.Lock()
+    _cached = None
+    _cached_at = 0.0
+    
+    @staticmethod
+    def liveness():
+        """
+        Le processus répond (aucune dépendance vérifiée)
+        """
+        return {'status': 'ok', 'pid': os.getpid()}
+    
+    @staticmethod
+    def _check_mongo():
+        import pymongo
+        from config.database import get_client
+        
+        start = time.perf_counter()
+        try:
+            with pymongo.timeout(READINESS_TIMEOUT_MS / 1000):
+                get_client().admin.command('ping')
+        except Exception as e:
+            # Détail (hôtes, replica set, authentification) au journal seulement:
+            # la sonde est publique
+            logger.exception("Sonde readiness: MongoDB injoignable")
+            return {'ok': False, 'error': type(e).__name__}
+        
+        latency = (time.perf_counter() - start) * 1000
+        return {
+            'ok': latency <= READINESS_MAX_DB_LATENCY_MS,
+            'latency_ms': round(latency, 1),
+            'max_latency_ms': READINESS_MAX_DB_LATENCY_MS
+        }
+    
+    @staticmethod
+    def _check_pool():
+        from config.database import get_pool_stats
+        
+        stats = get_pool_stats()
+        usage = stats['connections_in_use'] / stats['max_pool_size'] if stats['max_pool_size'] else 0
+        return {
+            'ok': usage <= READINESS_MAX_POOL_USAGE,
+            'in_use': stats['connections_in_use'],
+            'max_pool_size': stats['max_pool_size'],
+            'usage': round(usage, 2),
+            'max_usage': READINESS_MAX_POOL_USAGE
+        }
+    
+    @staticmethod
+    def _check_email():
+        from services.metrics_service import metrics, EMAIL_IN_FLIGHT
+        
+        in_flight = metrics.get(EMAIL_IN_FLIGHT)
+        return {
+            'ok': in_flight <= READINESS_MAX_EMAIL_IN_FLIGHT,
+            'in_flight': in_flight,
+            'max_in_flight': READINESS_MAX_EMAIL_IN_FLIGHT
+        }
+    
+    @staticmethod
+    def readiness():
+        """
+        Vérifie les dépendances, avec mise en cache du résultat
+        
+        Un seul thread exécute les vérifications: les autres reçoivent le
+        dernier résultat connu pendant ce temps
+        
+        Returns:
+            Tuple (prêt: bool, détail: dict)
+        """
+        now = time.monotonic()
+        cached = HealthService._cached
+        if cached is not None and now - HealthService._cached_at < READINESS_CACHE_SECONDS:
+            return cached
+        
+        if not HealthService._lock.acquire(blocking=cached is None):
+            return cached
+        try:
+            # Résultat rafraîchi par un autre thread pendant l'attente
+            if HealthService._cached is not None and time.monotonic() - HealthService._cached_at < READINESS_CACHE_SECONDS:
+                return HealthService._cached
+            
+            checks = {
+                'mongodb': HealthService._check_mongo(),
+                'pool': HealthService._check_pool(),
+                'email': HealthService._check_email()
+            }
+            ready = all(check['ok'] for check in checks.values())
+            result = (ready, {
+                'status': 'ok' if ready else 'unavailable',
+                'checks': checks,
+                'checked_at': time.time()
+            })
+            HealthService._cached = result
+            HealthService._cached_at = time.monotonic()
+            return result
+        finally:
+            HealthService._lock.release()
@@ -0,0 +1,300 @@
+"""
+Service de métriques au format Prometheus (exposées sur /metrics)
+
+Fonctionne avec plusieurs workers gunicorn: si METRICS_MULTIPROC_DIR est
+défini, chaque processus écrit périodiquement ses valeurs dans un fichier
+de ce répertoire et /metrics agrège les fichiers de tous les workers
+(compteurs et histogrammes additionnés, jauges étiquetées par pid)
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Répertoire partagé entre workers (à vider au démarrage du serveur)
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR')
+# Intervalle minimal entre deux écritures du fichier d'un worker (secondes)
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+
+# Bornes des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsService:
+    """
+    Registre de métriques du processus (compteurs, jauges, histogrammes)
+    
+    Les étiquettes sont stockées sous forme de tuples triés (clé, valeur)
+    """
+    
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.definitions = {}
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self):
+        self._pid = os.getpid()
+        self._values = {}
+        self._last_flush = 0.0
+    
+    def _check_pid(self):
+        # Valeurs héritées du processus parent (fork gunicorn): repartir de zéro
+        if self._pid != os.getpid():
+            self._reset()
+    
+    def register(self, name, kind, description, buckets=None):
+        """
+        Déclare une métrique
+        
+        Args:
+            name: Nom Prometheus (ex: clinique_http_requests_total)
+            kind: counter, gauge ou histogram
+            description: Texte d'aide (# HELP)
+            buckets: Bornes des histogrammes
+        """
+        self.definitions[name] = {'type': kind, 'help': description, 'buckets': buckets}
+    
+    def inc(self, name, labels=None, value=1):
+        """
+        Incrémente un compteur (ou une jauge)
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._check_pid()
+            self._values[key] = self._values.get(key, 0) + value
+    
+    def dec(self, name, labels=None, value=1):
+        self.inc(name, labels, -value)
+    
+    def set(self, name, value, labels=None):
+        """
+        Fixe la valeur d'une jauge
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._check_pid()
+            self._values[key] = value
+    
+    def observe(self, name, value, labels=None):
+        """
+        Ajoute une observation à un histogramme
+        """
+        buckets = self.definitions[name]['buckets']
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._check_pid()
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+    
+    def get(self, name, labels=None):
+        """
+        Valeur courante d'un compteur ou d'une jauge du processus
+        """
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._check_pid()
+            return self._values.get(key, 0)
+    
+    @contextmanager
+    def timer(self, name, labels=None):
+        """
+        Mesure la durée d'un bloc dans un histogramme
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+    
+    def timed(self, name, labels=None):
+        """
+        Décorateur mesurant la durée d'une fonction dans un histogramme
+        """
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, labels):
+                    return f(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def snapshot(self):
+        """
+        Valeurs du processus, sérialisables en JSON
+        """
+        with self._lock:
+            self._check_pid()
+            return [
+                [name, [list(label) for label in labels], value]
+                for (name, labels), value in self._values.items()
+            ]
+    
+    def _path(self, pid):
+        return os.path.join(self.directory, f"metrics_{pid}.json")
+    
+    def flush(self, force=False):
+        """
+        Écrit les valeurs du processus dans le répertoire partagé (mode multi-processus)
+        """
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(os.getpid())
+        # Écriture atomique: le lecteur ne voit jamais un fichier partiel
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+    
+    def _load(self):
+        """
+        Valeurs de tous les processus: liste de (pid, snapshot)
+        """
+        if not self.directory:
+            return [(os.getpid(), self.snapshot())]
+        
+        self.flush(force=True)
+        processes = []
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith('metrics_') and filename.endswith('.json')):
+                continue
+            try:
+                pid = int(filename[len('metrics_'):-len('.json')])
+                with open(os.path.join(self.directory, filename)) as f:
+                    processes.append((pid, json.load(f)))
+            except (ValueError, OSError):
+                continue
+        return processes
+    
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+    
+    def collect(self):
+        """
+        Agrège les valeurs de tous les workers
+        
+        Compteurs et histogrammes des workers arrêtés sont conservés (totaux
+        monotones); les jauges ne sont gardées que pour les workers vivants
+        """
+        merged = {}
+        for pid, values in self._load():
+            alive = None
+            for name, labels, value in values:
+                definition = self.definitions.get(name)
+                if definition is None:
+                    continue
+                labels = tuple(tuple(label) for label in labels)
+                
+                if definition['type'] == GAUGE:
+                    if alive is None:
+                        alive = pid == os.getpid() or self._alive(pid)
+                    if not alive:
+                        continue
+                    if self.directory:
+                        labels = labels + (('pid', str(pid)),)
+                    merged[(name, labels)] = value
+                elif definition['type'] == HISTOGRAM:
+                    state = merged.setdefault((name, labels), {
+                        'buckets': [0] * len(definition['buckets']), 'sum': 0.0, 'count': 0
+                    })
+                    state['buckets'] = [a + b for a, b in zip(state['buckets'], value['buckets'])]
+                    state['sum'] += value['sum']
+                    state['count'] += value['count']
+                else:
+                    merged[(name, labels)] = merged.get((name, labels), 0) + value
+        return merged
+    
+    def render(self):
+        """
+        Format d'exposition texte Prometheus (version 0.0.4)
+        """
+        merged = self.collect()
+        lines = []
+        for name, definition in sorted(self.definitions.items()):
+            series = sorted((labels, value) for (metric, labels), value in merged.items() if metric == name)
+            lines.append(f"# HELP {name} {definition['help']}")
+            lines.append(f"# TYPE {name} {definition['type']}")
+            for labels, value in series:
+                if definition['type'] != HISTOGRAM:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+                # Les compteurs de buckets sont déjà cumulatifs (value <= bound)
+                for bound, count in zip(definition['buckets'], value['buckets']):
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsService(METRICS_MULTIPROC_DIR)
+
+# Métriques HTTP
+HTTP_REQUEST_DURATION = 'clinique_http_request_duration_seconds'
+HTTP_REQUESTS_TOTAL = 'clinique_http_requests_total'
+metrics.register(HTTP_REQUEST_DURATION, HISTOGRAM, "Durée des requêtes HTTP par blueprint/endpoint", LATENCY_BUCKETS)
+metrics.register(HTTP_REQUESTS_TOTAL, COUNTER, "Requêtes HTTP par endpoint et code de statut")
+
+# Métriques MongoDB
+MONGO_COMMAND_DURATION = 'clinique_mongo_command_duration_seconds'
+MONGO_POOL_CONNECTIONS = 'clinique_mongo_pool_connections'
+MONGO_POOL_CHECKOUT_FAILURES = 'clinique_mongo_pool_checkout_failures'
+metrics.register(MONGO_COMMAND_DURATION, HISTOGRAM, "Durée des commandes MongoDB par collection", DB_BUCKETS)
+metrics.register(MONGO_POOL_CONNECTIONS, GAUGE, "Connexions du pool MongoDB (ouvertes, utilisées)")
+metrics.register(MONGO_POOL_CHECKOUT_FAILURES, GAUGE, "Échecs d'obtention d'une connexion du pool depuis le démarrage du worker")
+
+# Métriques des services
+PDF_RENDER_DURATION = 'clinique_pdf_render_duration_seconds'
+EMAIL_IN_FLIGHT = 'clinique_email_in_flight'
+EMAILS_TOTAL = 'clinique_emails_total'
+metrics.register(PDF_RENDER_DURATION, HISTOGRAM, "Durée de génération des PDF", LATENCY_BUCKETS)
+metrics.register(EMAIL_IN_FLIGHT, GAUGE, "Emails en cours d'envoi")
+metrics.register(EMAILS_TOTAL, COUNTER, "Emails envoyés par statut")
+
+# Métriques du hachage des mots de passe (bcrypt)
+PASSWORD_HASH_QUEUE_SECONDS = 'clinique_password_hash_queue_seconds'
+PASSWORD_HASH_DURATION = 'clinique_password_hash_duration_seconds'
+PASSWORD_HASH_IN_FLIGHT = 'clinique_password_hash_in_flight'
+PASSWORD_HASH_REJECTED = 'clinique_password_hash_rejected_total'
+metrics.register(PASSWORD_HASH_QUEUE_SECONDS, HISTOGRAM, "Attente d'un thread bcrypt par opération", LATENCY_BUCKETS)
+metrics.register(PASSWORD_HASH_DURATION, HISTOGRAM, "Durée des calculs bcrypt par opération", LATENCY_BUCKETS)
+metrics.register(PASSWORD_HASH_IN_FLIGHT, GAUGE, "Opérations bcrypt en cours ou en attente")
+metrics.register(PASSWORD_HASH_REJECTED, COUNTER, "Opérations bcrypt refusées (file d'attente pleine)")
@@ -0,0 +1,139 @@
+"""
+Service de hachage des mots de passe (bcrypt)
+
+Les calculs bcrypt (~250 ms à cost 12) s'exécutent dans un pool de threads
+borné: bcrypt libère le GIL, le thread de la requête attend sans bloquer
+les autres. Le nombre d'opérations en cours ou en attente est limité: au-delà,
+PasswordServiceBusy est levée et la requête est refusée (503) au lieu
+d'occuper un worker pendant une vague de connexions
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from services.metrics_service import (
+    metrics, PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_REJECTED
+)
+
+# Coût bcrypt des nouveaux hachages (les hachages existants sont mis à niveau à la connexion)
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+# Threads bcrypt par worker (un cœur chacun)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+# Opérations en cours ou en attente au-delà desquelles les suivantes sont refusées
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 4))
+# Attente maximale d'un résultat (secondes)
+PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+class PasswordServiceBusy(Exception):
+    """
+    Trop d'opérations bcrypt en attente: réessayer plus tard
+    """
+
+def _get_executor():
+    global _executor, _executor_pid
+    # Pool créé dans chaque worker (les threads ne survivent pas au fork)
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='bcrypt')
+            _executor_pid = os.getpid()
+        return _executor
+
+def _run(operation, function, *args):
+    """
+    Exécute un calcul bcrypt dans le pool, avec limite de concurrence
+    
+    Raises:
+        PasswordServiceBusy: File d'attente pleine
+    """
+    if not _slots.acquire(blocking=False):
+        metrics.inc(PASSWORD_HASH_REJECTED, {'operation': operation})
+        raise PasswordServiceBusy()
+    
+    metrics.inc(PASSWORD_HASH_IN_FLIGHT)
+    submitted = time.perf_counter()
+    
+    def task():
+        started = time.perf_counter()
+        metrics.observe(PASSWORD_HASH_QUEUE_SECONDS, started - submitted, {'operation': operation})
+        try:
+            return function(*args)
+        finally:
+            metrics.observe(PASSWORD_HASH_DURATION, time.perf_counter() - started, {'operation': operation})
+    
+    def release(future):
+        # Place libérée à la fin du calcul, même si l'appelant a cessé d'attendre
+        metrics.dec(PASSWORD_HASH_IN_FLIGHT)
+        _slots.release()
+    
+    try:
+        future = _get_executor().submit(task)
+    except Exception:
+        release(None)
+        raise
+    future.add_done_callback(release)
+    
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT)
+    except FuturesTimeoutError:
+        raise PasswordServiceBusy()
+
+class PasswordService:
+    """
+    Hachage et vérification des mots de passe
+    """
+    
+    @staticmethod
+    def hash(password):
+        """
+        Hache un mot de passe au coût BCRYPT_ROUNDS
+        
+        Args:
+            password: Mot de passe en clair
+        
+        Returns:
+            Hachage bcrypt (bytes)
+        """
+        import bcrypt
+        salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+        return _run('hash', bcrypt.hashpw, password.encode('utf-8'), salt)
+    
+    @staticmethod
+    def verify(password, password_hash):
+        """
+        Vérifie un mot de passe contre son hachage
+        
+        Args:
+            password: Mot de passe en clair
+            password_hash: Hachage bcrypt stocké
+        
+        Returns:
+            True si le mot de passe est correct
+        """
+        if not password_hash:
+            return False
+        import bcrypt
+        return _run('verify', bcrypt.checkpw, password.encode('utf-8'), password_hash)
+    
+    @staticmethod
+    def needs_rehash(password_hash):
+        """
+        Le hachage a-t-il été calculé avec un autre coût que BCRYPT_ROUNDS ?
+        
+        Args:
+            password_hash: Hachage bcrypt ($2b$<coût>$...)
+        """
+        if isinstance(password_hash, bytes):
+            password_hash = password_hash.decode('ascii', 'replace')
+        parts = (password_hash or '').split('$')
+        try:
+            return int(parts[2]) != BCRYPT_ROUNDS
+        except (IndexError, ValueError):
+            return False
@@ -13,6 +13,11 @@ from reportlab.pdfgen import canvas
 from datetime import datetime
 import os
 
+from config.logger import get_logger
+from services.metrics_service import metrics, PDF_RENDER_DURATION
+
+logger = get_logger(__name__)
+
 class PDFService:
     """
     Service pour la génération de PDF d'ordonnances médicales
@@ -46,6 +51,7 @@ class PDFService:
         canvas_obj.restoreState()
     
     @staticmethod
+    @metrics.timed(PDF_RENDER_DURATION, {'document': 'ordonnance'})
     def generate_ordonnance(ordonnance, patient, medecin_user, medecin_info):
         """
         Génère un PDF d'ordonnance professionnelle et retourne les données en base64
@@ -368,8 +374,8 @@ class PDFService:
                               ParagraphStyle('SigAuth', parent=normal_style, fontSize=8, 
                                            textColor=colors.HexColor('#16a34a'), alignment=TA_CENTER))]
                 ]
-            except Exception as e:
-                print(f"Erreur chargement signature: {e}")
+            except Exception:
+                logger.exception("Erreur chargement signature")
                 signature_content = [
                     [Paragraph(f"<b>{medecin_nom}</b><br/>{specialite}<br/>N° Ordre: {numero_ordre}", 
                               ParagraphStyle('SigInfo', parent=normal_style, fontSize=9, alignment=TA_CENTER))],
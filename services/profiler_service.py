@@ -0,0 +1,250 @@
+"""
+Service de profilage à la demande des workers en production
+
+Deux modes, déclenchés depuis l'API admin:
+- requests: cProfile sur les N prochaines requêtes d'un endpoint (fichiers .prof/pstats)
+- duration: échantillonnage des piles de tous les threads pendant T secondes
+  (fichier .folded au format collapsed-stack, pour flamegraph/speedscope)
+
+La commande est écrite dans un fichier de contrôle partagé: chaque worker
+gunicorn la lit au plus une fois par PROFILE_POLL_SECONDS, le coût au repos
+se limite donc à une comparaison d'horloge par requête
+"""
+
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'clinique_profiles'))
+PROFILE_POLL_SECONDS = float(os.getenv('PROFILE_POLL_SECONDS', 1))
+PROFILE_MAX_REQUESTS = int(os.getenv('PROFILE_MAX_REQUESTS', 100))
+PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', 300))
+
+CONTROL_FILE = 'control.json'
+MODE_REQUESTS = 'requests'
+MODE_DURATION = 'duration'
+MODE_STOP = 'stop'
+
+class ProfilerService:
+    """
+    Service de profilage (état propre à chaque worker)
+    """
+    
+    # Commande appliquée par ce worker
+    _applied_id = None
+    _control_mtime = None
+    _next_poll = 0.0
+    
+    # Mode requests: endpoint ciblé et nombre de requêtes restantes
+    endpoint = None
+    _remaining = 0
+    _state_lock = threading.Lock()
+    # Un seul cProfile actif à la fois par processus
+    _profile_lock = threading.Lock()
+    
+    # Mode duration: arrêt du thread d'échantillonnage
+    _sampler_stop = None
+    
+    @staticmethod
+    def _control_path():
+        return os.path.join(PROFILE_DIR, CONTROL_FILE)
+    
+    @staticmethod
+    def _output_path(label, extension):
+        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        return os.path.join(PROFILE_DIR, f"{timestamp}_{label}_{os.getpid()}.{extension}")
+    
+    @staticmethod
+    def arm(mode, endpoint=None, count=1, seconds=10, interval_ms=5):
+        """
+        Déclenche un profilage sur tous les workers
+        
+        Args:
+            mode: 'requests', 'duration' ou 'stop'
+            endpoint: Endpoint Flask ciblé en mode requests (ex: medecin.get_dashboard)
+            count: Nombre de requêtes à profiler (par worker)
+            seconds: Durée de l'échantillonnage en mode duration
+            interval_ms: Intervalle d'échantillonnage en mode duration
+        
+        Returns:
+            Commande enregistrée
+        """
+        if mode not in (MODE_REQUESTS, MODE_DURATION, MODE_STOP):
+            raise ValueError(f"Mode inconnu: {mode}")
+        if mode == MODE_REQUESTS and not endpoint:
+            raise ValueError("Endpoint requis en mode requests")
+        
+        command = {
+            'id': uuid.uuid4().hex,
+            'mode': mode,
+            'endpoint': endpoint,
+            'count': max(1, min(int(count), PROFILE_MAX_REQUESTS)),
+            'seconds': max(1, min(int(seconds), PROFILE_MAX_SECONDS)),
+            'interval_ms': max(1, int(interval_ms)),
+            'created_at': time.time()
+        }
+        
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        tmp_path = f"{ProfilerService._control_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(command, f)
+        os.replace(tmp_path, ProfilerService._control_path())
+        
+        # Application immédiate dans le worker qui a reçu la commande
+        ProfilerService._apply(command)
+        return command
+    
+    @staticmethod
+    def poll():
+        """
+        Lit la commande partagée (au plus une fois par PROFILE_POLL_SECONDS)
+        """
+        now = time.monotonic()
+        if now < ProfilerService._next_poll:
+            return
+        ProfilerService._next_poll = now + PROFILE_POLL_SECONDS
+        
+        try:
+            mtime = os.stat(ProfilerService._control_path()).st_mtime
+        except OSError:
+            return
+        if mtime == ProfilerService._control_mtime:
+            return
+        ProfilerService._control_mtime = mtime
+        
+        try:
+            with open(ProfilerService._control_path()) as f:
+                command = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        # Commande trop ancienne (ex: worker démarré après son expiration)
+        if time.time() - command.get('created_at', 0) > PROFILE_MAX_SECONDS:
+            return
+        ProfilerService._apply(command)
+    
+    @staticmethod
+    def _apply(command):
+        with ProfilerService._state_lock:
+            if command['id'] == ProfilerService._applied_id:
+                return
+            ProfilerService._applied_id = command['id']
+            
+            # Toute nouvelle commande remplace la précédente
+            ProfilerService.endpoint = None
+            ProfilerService._remaining = 0
+            if ProfilerService._sampler_stop is not None:
+                ProfilerService._sampler_stop.set()
+                ProfilerService._sampler_stop = None
+            
+            if command['mode'] == MODE_REQUESTS:
+                ProfilerService.endpoint = command['endpoint']
+                ProfilerService._remaining = command['count']
+            elif command['mode'] == MODE_DURATION:
+                stop = threading.Event()
+                ProfilerService._sampler_stop = stop
+                threading.Thread(
+                    target=ProfilerService._sample,
+                    args=(command['seconds'], command['interval_ms'] / 1000, stop),
+                    name='profiler-sampler',
+                    daemon=True
+                ).start()
+    
+    @staticmethod
+    def start_request(endpoint):
+        """
+        Démarre cProfile si la requête doit être profilée
+        
+        Returns:
+            Instance cProfile.Profile ou None
+        """
+        if endpoint != ProfilerService.endpoint:
+            return None
+        if not ProfilerService._profile_lock.acquire(blocking=False):
+            return None
+        
+        with ProfilerService._state_lock:
+            if endpoint != ProfilerService.endpoint or ProfilerService._remaining <= 0:
+                ProfilerService._profile_lock.release()
+                return None
+            ProfilerService._remaining -= 1
+            if ProfilerService._remaining == 0:
+                ProfilerService.endpoint = None
+        
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+    
+    @staticmethod
+    def stop_request(profile, endpoint):
+        """
+        Arrête cProfile et écrit le fichier pstats
+        """
+        try:
+            profile.disable()
+            profile.dump_stats(ProfilerService._output_path(endpoint, 'prof'))
+        finally:
+            ProfilerService._profile_lock.release()
+    
+    @staticmethod
+    def _sample(seconds, interval, stop):
+        """
+        Échantillonne les piles de tous les threads (hors échantillonneur)
+        """
+        own_id = threading.get_ident()
+        stacks = Counter()
+        deadline = time.monotonic() + seconds
+        
+        while not stop.is_set() and time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stacks[';'.join(reversed(stack))] += 1
+            stop.wait(interval)
+        
+        with open(ProfilerService._output_path('sampler', 'folded'), 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+    
+    @staticmethod
+    def status():
+        """
+        Commande courante et fichiers de profilage disponibles
+        """
+        command = None
+        try:
+            with open(ProfilerService._control_path()) as f:
+                command = json.load(f)
+        except (OSError, ValueError):
+            pass
+        
+        files = []
+        if os.path.isdir(PROFILE_DIR):
+            for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+                if name.endswith(('.prof', '.folded')):
+                    path = os.path.join(PROFILE_DIR, name)
+                    files.append({'nom': name, 'taille': os.path.getsize(path)})
+        
+        return {'commande': command, 'fichiers': files}
+    
+    @staticmethod
+    def file_path(name):
+        """
+        Chemin d'un fichier de profilage (None si invalide ou absent)
+        """
+        if os.path.basename(name) != name or not name.endswith(('.prof', '.folded')):
+            return None
+        path = os.path.join(PROFILE_DIR, name)
+        return path if os.path.isfile(path) else None
@@ -0,0 +1,266 @@
+"""
+Limitation du nombre de tentatives (connexion, mot de passe oublié)
+
+Fenêtre glissante approchée par deux fenêtres fixes consécutives: le compte
+de la fenêtre précédente est pondéré par la part encore couverte par la
+fenêtre glissante. Les compteurs sont partagés entre workers dans la
+collection rate_limits (documents expirés par un index TTL) et recopiés en
+mémoire: une clé bloquée est refusée sans aucune requête MongoDB ni calcul
+bcrypt jusqu'à la fin de son blocage
+"""
+
+from datetime import datetime
+import hashlib
+import math
+import os
+import threading
+import time
+
+from pymongo import ReturnDocument
+
+from config.database import get_db
+from config.logger import get_logger
+
+logger = get_logger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+# Tentatives de connexion par fenêtre, par adresse IP et par email
+LOGIN_RATE_LIMIT_IP = int(os.getenv('LOGIN_RATE_LIMIT_IP', 30))
+LOGIN_RATE_LIMIT_EMAIL = int(os.getenv('LOGIN_RATE_LIMIT_EMAIL', 5))
+LOGIN_RATE_WINDOW = int(os.getenv('LOGIN_RATE_WINDOW', 300))
+# Demandes de réinitialisation par fenêtre, par adresse IP et par email
+RESET_RATE_LIMIT_IP = int(os.getenv('RESET_RATE_LIMIT_IP', 10))
+RESET_RATE_LIMIT_EMAIL = int(os.getenv('RESET_RATE_LIMIT_EMAIL', 3))
+RESET_RATE_WINDOW = int(os.getenv('RESET_RATE_WINDOW', 3600))
+# Nombre de proxies de confiance devant l'application (X-Forwarded-For), 0: adresse du client direct
+RATE_LIMIT_PROXY_HOPS = int(os.getenv('RATE_LIMIT_PROXY_HOPS', 0))
+# Clés conservées en mémoire au-delà desquelles les fenêtres terminées sont purgées
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 10000))
+
+COLLECTION = 'rate_limits'
+
+def client_ip(request):
+    """
+    Adresse IP du client, en ne faisant confiance qu'aux RATE_LIMIT_PROXY_HOPS derniers proxies
+    """
+    forwarded = request.headers.get('X-Forwarded-For')
+    if RATE_LIMIT_PROXY_HOPS and forwarded:
+        route = [address.strip() for address in forwarded.split(',') if address.strip()]
+        if route:
+            return route[-RATE_LIMIT_PROXY_HOPS] if len(route) >= RATE_LIMIT_PROXY_HOPS else route[0]
+    return request.remote_addr or 'inconnu'
+
+class SlidingWindowLimiter:
+    """
+    Compteur de tentatives par clé sur une fenêtre glissante
+    
+    Args:
+        scope: Nom du compteur (préfixe des documents MongoDB)
+        limit: Nombre de tentatives autorisées par fenêtre
+        window: Durée de la fenêtre (secondes)
+    """
+    
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        # clé -> [index de la fenêtre, compte courant, compte précédent]
+        self._counts = {}
+        # clé -> fin du blocage (time.time())
+        self._blocked = {}
+    
+    def _doc_id(self, key, index):
+        return f"{self.scope}:{key}:{index}"
+    
+    def _estimate(self, now, index, current, previous):
+        # Part de la fenêtre précédente encore couverte par la fenêtre glissante
+        elapsed = now / self.window - index
+        # Arrondi: une tentative faite à l'issue de Retry-After est comptée à la limite, pas au-delà
+        return round(previous * (1 - elapsed) + current, 6)
+    
+    def _retry_after(self, now, index, current, previous):
+        """
+        Secondes avant que l'estimation repasse sous la limite
+        """
+        if current >= self.limit:
+            # Fin de la fenêtre courante, puis décroissance de son compte
+            wait = (index + 1) * self.window - now + self.window * (1 - (self.limit - 1) / current)
+        else:
+            # Décroissance du compte de la fenêtre précédente
+            target = (self.limit - 1 - current) / previous if previous else 1
+            wait = (index + 1 - target) * self.window - now
+        # Même arrondi que _estimate: 200.00000000000003 ne doit pas donner 201
+        return max(1, math.ceil(round(wait, 6)))
+    
+    def blocked(self, key):
+        """
+        Durée restante du blocage de la clé en mémoire (None si non bloquée)
+        """
+        with self._lock:
+            until = self._blocked.get(key)
+        if until is None:
+            return None
+        remaining = until - time.time()
+        return math.ceil(remaining) if remaining > 0 else None
+    
+    def hit(self, key):
+        """
+        Compte une tentative et indique si elle dépasse la limite
+        
+        Args:
+            key: Clé du compteur (IP, empreinte de l'email)
+        
+        Returns:
+            None si la tentative est autorisée, sinon le délai (secondes)
+            avant la prochaine tentative possible
+        """
+        now = time.time()
+        index = int(now // self.window)
+        counts = self._shared_hit(key, now, index)
+        if counts is None:
+            # MongoDB indisponible: compteur du processus seul
+            counts = self._local_hit(key, index)
+        
+        current, previous = counts
+        if self._estimate(now, index, current, previous) <= self.limit:
+            return None
+        
+        retry_after = self._retry_after(now, index, current, previous)
+        with self._lock:
+            self._blocked[key] = now + retry_after
+        return retry_after
+    
+    def reset(self, key):
+        """
+        Efface le compteur d'une clé (ex: connexion réussie)
+        """
+        with self._lock:
+            self._counts.pop(key, None)
+            self._blocked.pop(key, None)
+        index = int(time.time() // self.window)
+        try:
+            get_db()[COLLECTION].delete_many({'_id': {'$in': [self._doc_id(key, index), self._doc_id(key, index - 1)]}})
+        except Exception:
+            logger.exception("Erreur lors de la réinitialisation du compteur de tentatives")
+    
+    def _local_hit(self, key, index):
+        with self._lock:
+            self._prune(index)
+            state = self._counts.get(key)
+            if state is None or state[0] < index - 1:
+                state = [index, 0, 0]
+            elif state[0] == index - 1:
+                state = [index, 0, state[1]]
+            state[1] += 1
+            self._counts[key] = state
+            return state[1], state[2]
+    
+    def _shared_hit(self, key, now, index):
+        """
+        Incrémente le compteur partagé de la fenêtre courante
+        
+        Le compte de la fenêtre précédente (terminée, donc figé) est lu une
+        seule fois puis conservé en mémoire
+        
+        Returns:
+            Tuple (compte courant, compte précédent), None si MongoDB est indisponible
+        """
+        try:
+            collection = get_db()[COLLECTION]
+            # Document conservé jusqu'à la fin de la fenêtre suivante (pondération)
+            expires_at = datetime.utcfromtimestamp((index + 2) * self.window)
+            document = collection.find_one_and_update(
+                {'_id': self._doc_id(key, index)},
+                {'$inc': {'count': 1}, '$setOnInsert': {'expires_at': expires_at}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            current = document['count']
+            
+            with self._lock:
+                state = self._counts.get(key)
+            if state is not None and state[0] == index:
+                previous = state[2]
+            else:
+                previous_doc = collection.find_one({'_id': self._doc_id(key, index - 1)}, {'count': 1})
+                previous = previous_doc['count'] if previous_doc else 0
+        except Exception:
+            logger.exception("Erreur du compteur de tentatives partagé")
+            return None
+        
+        with self._lock:
+            self._prune(index)
+            self._counts[key] = [index, current, previous]
+        return current, previous
+    
+    def _prune(self, index):
+        # Appelé sous verrou: borne la mémoire lors d'une attaque sur de nombreuses clés
+        if len(self._counts) + len(self._blocked) <= RATE_LIMIT_MAX_KEYS:
+            return
+        now = time.time()
+        self._counts = {key: state for key, state in self._counts.items() if state[0] >= index - 1}
+        self._blocked = {key: until for key, until in self._blocked.items() if until > now}
+
+def _email_key(email):
+    # Empreinte: les emails ne sont pas stockés en clair dans rate_limits
+    return hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()[:32]
+
+LOGIN_BY_IP = SlidingWindowLimiter('login:ip', LOGIN_RATE_LIMIT_IP, LOGIN_RATE_WINDOW)
+LOGIN_BY_EMAIL = SlidingWindowLimiter('login:email', LOGIN_RATE_LIMIT_EMAIL, LOGIN_RATE_WINDOW)
+RESET_BY_IP = SlidingWindowLimiter('reset:ip', RESET_RATE_LIMIT_IP, RESET_RATE_WINDOW)
+RESET_BY_EMAIL = SlidingWindowLimiter('reset:email', RESET_RATE_LIMIT_EMAIL, RESET_RATE_WINDOW)
+
+class RateLimitService:
+    """
+    Limitation des tentatives de connexion et de réinitialisation
+    """
+    
+    @staticmethod
+    def _check(by_ip, by_email, ip, email):
+        if not RATE_LIMIT_ENABLED:
+            return None
+        
+        email_key = _email_key(email)
+        # Clé déjà bloquée dans ce processus: refus sans accès à la base
+        for limiter, key in ((by_ip, ip), (by_email, email_key)):
+            remaining = limiter.blocked(key)
+            if remaining:
+                return remaining
+        
+        retry_after = by_ip.hit(ip)
+        if retry_after:
+            return retry_after
+        return by_email.hit(email_key)
+    
+    @staticmethod
+    def check_login(ip, email):
+        """
+        Compte une tentative de connexion
+        
+        Args:
+            ip: Adresse IP du client
+            email: Email saisi
+        
+        Returns:
+            None si la tentative est autorisée, sinon le délai (secondes) à respecter
+        """
+        return RateLimitService._check(LOGIN_BY_IP, LOGIN_BY_EMAIL, ip, email)
+    
+    @staticmethod
+    def login_succeeded(email):
+        """
+        Remet à zéro le compteur de l'email après une connexion réussie
+        """
+        if RATE_LIMIT_ENABLED:
+            LOGIN_BY_EMAIL.reset(_email_key(email))
+    
+    @staticmethod
+    def check_password_reset(ip, email):
+        """
+        Compte une demande de réinitialisation du mot de passe
+        
+        Returns:
+            None si la demande est autorisée, sinon le délai (secondes) à respecter
+        """
+        return RateLimitService._check(RESET_BY_IP, RESET_BY_EMAIL, ip, email)
@@ -0,0 +1,133 @@
+"""
+Service de jetons d'authentification signés (mode sans état)
+Les jetons sont vérifiés en mémoire (HMAC-SHA256), sans accès à la base
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+
+# Activation du mode jeton (Authorization: Bearer <token>)
+AUTH_TOKENS_ENABLED = os.getenv('AUTH_TOKENS_ENABLED', 'False').lower() == 'true'
+ACCESS_TOKEN_TTL = int(os.getenv('ACCESS_TOKEN_TTL', 900))
+REFRESH_TOKEN_TTL = int(os.getenv('REFRESH_TOKEN_TTL', 7 * 24 * 3600))
+
+TYPE_ACCESS = 'access'
+TYPE_REFRESH = 'refresh'
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+class TokenService:
+    """
+    Service pour l'émission et la vérification des jetons signés
+    
+    Format: base64url(payload JSON).base64url(signature HMAC-SHA256)
+    Le payload contient l'ID utilisateur, le rôle et la version d'authentification
+    """
+    
+    @staticmethod
+    def _secret():
+        secret = os.getenv('AUTH_TOKEN_SECRET') or os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+        return secret.encode('utf-8')
+    
+    @staticmethod
+    def _digest(payload):
+        return hmac.new(TokenService._secret(), payload, hashlib.sha256).digest()
+    
+    @staticmethod
+    def _sign(payload_b64):
+        return _b64encode(TokenService._digest(payload_b64.encode('ascii')))
+    
+    @staticmethod
+    def encode(claims, ttl):
+        """
+        Signe un ensemble de claims
+        
+        Args:
+            claims: Dictionnaire des claims
+            ttl: Durée de validité en secondes
+        
+        Returns:
+            Jeton signé (string)
+        """
+        payload = dict(claims, exp=int(time.time()) + ttl)
+        payload_b64 = _b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        return f"{payload_b64}.{TokenService._sign(payload_b64)}"
+    
+    @staticmethod
+    def decode(token, token_type=TYPE_ACCESS):
+        """
+        Vérifie un jeton et retourne ses claims
+        
+        Args:
+            token: Jeton signé
+            token_type: Type attendu (access ou refresh)
+        
+        Returns:
+            Dictionnaire des claims ou None si invalide/expiré
+        """
+        # Jeton fourni par le client: toute valeur mal formée (non ASCII comprise) est refusée
+        try:
+            payload_b64, signature = token.split('.', 1)
+            payload = payload_b64.encode('ascii')
+            signature = signature.encode('ascii')
+        except (AttributeError, TypeError, ValueError):
+            return None
+        
+        if not hmac.compare_digest(signature, _b64encode(TokenService._digest(payload)).encode('ascii')):
+            return None
+        
+        try:
+            claims = json.loads(_b64decode(payload_b64))
+        except ValueError:
+            return None
+        
+        if not isinstance(claims, dict):
+            return None
+        if claims.get('typ') != token_type or claims.get('exp', 0) < time.time():
+            return None
+        return claims
+    
+    @staticmethod
+    def issue_tokens(user):
+        """
+        Génère une paire de jetons (accès + rafraîchissement) pour un utilisateur
+        
+        Args:
+            user: Instance User
+        
+        Returns:
+            Dictionnaire avec access_token, refresh_token et expires_in
+        """
+        claims = {
+            'sub': str(user._id),
+            'role': user.role,
+            'eml': user.email,
+            'ver': user.auth_version
+        }
+        return {
+            'access_token': TokenService.encode(dict(claims, typ=TYPE_ACCESS), ACCESS_TOKEN_TTL),
+            'refresh_token': TokenService.encode(dict(claims, typ=TYPE_REFRESH), REFRESH_TOKEN_TTL),
+            'token_type': 'Bearer',
+            'expires_in': ACCESS_TOKEN_TTL
+        }
+    
+    @staticmethod
+    def from_request(request):
+        """
+        Extrait et vérifie le jeton d'accès de l'en-tête Authorization
+        
+        Returns:
+            Dictionnaire des claims ou None
+        """
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            return None
+        return TokenService.decode(header[7:].strip(), TYPE_ACCESS)
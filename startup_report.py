@@ -0,0 +1,98 @@
+"""
+Rapport du coût d'import au démarrage de l'application
+Exécuter: python startup_report.py [--top 20] [--json historique.jsonl]
+
+S'appuie sur `python -X importtime` dans un sous-processus: aucun accès
+MongoDB n'est nécessaire (seuls les modules sont importés)
+"""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Code exécuté dans le sous-processus: import de l'app et de toutes les routes
+IMPORT_SCRIPT = (
+    "import importlib, app; "
+    "[importlib.import_module(name) for name, _ in app.ROUTE_MODULES]"
+)
+
+def measure_imports():
+    """
+    Lance l'import de l'application avec -X importtime
+    
+    Returns:
+        Liste de tuples (module, temps propre en µs, temps cumulé en µs)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_SCRIPT],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise RuntimeError("Échec de l'import de l'application")
+    
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+def build_report(modules):
+    """
+    Agrège les temps d'import par paquet racine
+    
+    Returns:
+        Dictionnaire avec le total et le détail par paquet (en ms)
+    """
+    packages = {}
+    for name, self_us, _ in modules:
+        root = name.split('.')[0]
+        packages[root] = packages.get(root, 0) + self_us
+    
+    return {
+        'date': datetime.utcnow().isoformat(),
+        'total_ms': round(sum(self_us for _, self_us, _ in modules) / 1000, 1),
+        'packages': {
+            root: round(us / 1000, 1)
+            for root, us in sorted(packages.items(), key=lambda item: -item[1])
+        }
+    }
+
+def main():
+    top = 20
+    if '--top' in sys.argv:
+        top = int(sys.argv[sys.argv.index('--top') + 1])
+    
+    modules = measure_imports()
+    report = build_report(modules)
+    
+    print("=" * 60)
+    print("⏱️  Coût d'import au démarrage")
+    print("=" * 60)
+    print(f"Total: {report['total_ms']} ms\n")
+    
+    print("Par paquet (temps propre):")
+    for root, ms in list(report['packages'].items())[:top]:
+        print(f"   {root:<36} {ms:8.1f} ms")
+    
+    print("\nModules les plus coûteux (temps cumulé):")
+    for name, _, cumulative_us in sorted(modules, key=lambda m: -m[2])[:top]:
+        print(f"   {name:<36} {cumulative_us / 1000:8.1f} ms")
+    
+    # Historique pour suivre l'évolution d'un déploiement à l'autre
+    if '--json' in sys.argv:
+        path = sys.argv[sys.argv.index('--json') + 1]
+        with open(path, 'a') as f:
+            f.write(json.dumps(report) + '\n')
+        print(f"\n✅ Rapport ajouté à {path}")
+
+if __name__ == '__main__':
+    main()
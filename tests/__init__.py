@@ -0,0 +1,16 @@
+# Tests sans serveur (base MongoDB en mémoire mongomock, client de test Flask)
+
+import os
+
+def configure_environment():
+    """
+    Configuration des tests, à appliquer avant tout import de l'application
+    """
+    os.environ.setdefault('MONGODB_DB_NAME', 'clinique_test')
+    os.environ.setdefault('BCRYPT_ROUNDS', '4')
+    os.environ.setdefault('SESSION_BACKEND', 'mongodb')
+    os.environ.setdefault('AUTH_TOKENS_ENABLED', 'True')
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'True')
+    # Tous les clients de test partagent l'adresse 127.0.0.1: seule la limite par email est testée
+    os.environ.setdefault('LOGIN_RATE_LIMIT_IP', '1000')
+    os.environ.setdefault('LOG_LEVEL', 'CRITICAL')
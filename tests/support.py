@@ -0,0 +1,71 @@
+"""
+Outils communs des tests: base en mémoire, application et utilisateurs
+
+Exécution depuis la racine du backend (pip install mongomock):
+    python -m pytest -q tests
+    python -m tests.test_tokens
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from tests import configure_environment
+
+configure_environment()
+
+from benchmarks.harness import use_mongomock
+
+use_mongomock()
+
+from config.database import get_client, get_db, MONGODB_DB_NAME
+from config.migrations import migrate
+
+PASSWORD = 'Test1234!'
+
+_app = None
+
+def get_app():
+    """
+    Application Flask partagée par les tests
+    """
+    global _app
+    if _app is None:
+        from app import create_app
+        _app = create_app()
+    return _app
+
+def reset_database():
+    """
+    Base vide au schéma courant
+    """
+    get_client().drop_database(MONGODB_DB_NAME)
+    migrate(get_db())
+
+def create_user(email, role='patient', **fields):
+    from models.user import User
+    
+    user = User(email=email, password=PASSWORD, role=role, nom='Test', prenom='Test', is_active=True, **fields)
+    user.save()
+    return user
+
+def login(client, email, **extra):
+    return client.post('/api/auth/login', json=dict({'email': email, 'password': PASSWORD}, **extra))
+
+def run_tests(namespace):
+    """
+    Exécute les fonctions test_* d'un module (python -m tests.<module>)
+    """
+    tests = [(name, test) for name, test in sorted(namespace.items()) if name.startswith('test_') and callable(test)]
+    failures = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"✅ {name}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__} {e}")
+    print(f"\n{len(tests) - failures}/{len(tests)} tests réussis")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,132 @@
+"""
+Passerelle ASGI: réponses complètes et diffusées, déconnexion du client et arrêt du worker
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from unittest import mock
+
+from tests.support import get_app, reset_database, run_tests
+
+import config.database as database
+from middleware.asgi_bridge import WSGIBridge
+
+current_request = contextvars.ContextVar('current_request', default=None)
+
+def _scope(path):
+    return {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+        'headers': [(b'host', b'localhost')], 'http_version': '1.1', 'scheme': 'http'
+    }
+
+async def _call(bridge, scope):
+    messages = []
+    
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    
+    async def send(message):
+        messages.append(message)
+    
+    await bridge(scope, receive, send)
+    return messages
+
+def test_flask_response():
+    reset_database()
+    messages = asyncio.run(_call(WSGIBridge(get_app()), _scope('/api/public/info')))
+    assert messages[0]['type'] == 'http.response.start'
+    assert messages[0]['status'] == 200
+    assert b''.join(message.get('body', b'') for message in messages[1:]).startswith(b'{')
+    assert messages[-1] == {'type': 'http.response.body', 'body': b''}
+
+def test_streamed_response():
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return iter([b'a', b'b', b'c'])
+    
+    messages = asyncio.run(_call(WSGIBridge(app, threads=2), _scope('/')))
+    assert [message.get('body') for message in messages[1:]] == [b'a', b'b', b'c', b'']
+
+def test_cancel_while_chunk_pending():
+    # Fragment en cours de calcul quand la requête est annulée: close() attend
+    # la fin du thread au lieu de réentrer le contexte ou le générateur
+    producing = threading.Event()
+    release = threading.Event()
+    closed = []
+    
+    def app(environ, start_response):
+        current_request.set(environ['PATH_INFO'])
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        
+        def chunks():
+            try:
+                yield b'premier'
+                producing.set()
+                release.wait(5)
+                yield b'second'
+            finally:
+                closed.append(current_request.get())
+        return chunks()
+    
+    async def scenario():
+        bridge = WSGIBridge(app, threads=4)
+        sent = []
+        
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        
+        async def send(message):
+            sent.append(message)
+        
+        task = asyncio.create_task(bridge(_scope('/flux'), receive, send))
+        await asyncio.get_running_loop().run_in_executor(None, producing.wait, 5)
+        task.cancel()
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return sent
+    
+    sent = asyncio.run(scenario())
+    assert [message.get('body') for message in sent[1:]] == [b'premier']
+    assert closed == ['/flux']
+
+def test_lifespan_shutdown_does_not_block_loop():
+    bridge = WSGIBridge(lambda environ, start_response: [], threads=1)
+    # Requête en cours dans le pool au moment de l'arrêt
+    bridge._get_executor().submit(time.sleep, 0.2)
+    
+    async def scenario():
+        ticks = 0
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+        
+        async def receive():
+            return messages.pop(0)
+        
+        async def send(message):
+            sent.append(message['type'])
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticking = asyncio.create_task(ticker())
+        with mock.patch.object(database, 'close_client') as close_client:
+            await bridge({'type': 'lifespan'}, receive, send)
+        ticking.cancel()
+        return ticks, sent, close_client.call_count
+    
+    ticks, sent, closed = asyncio.run(scenario())
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert closed == 1
+    # Boucle d'événements restée disponible pendant l'attente du pool
+    assert ticks >= 5
+
+if __name__ == '__main__':
+    run_tests(globals())
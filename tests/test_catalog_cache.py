@@ -0,0 +1,79 @@
+"""
+Catalogues publics: cache par processus, ETag/304 et invalidation
+"""
+
+from unittest import mock
+
+from tests.support import create_user, get_app, reset_database, run_tests
+
+import services.catalog_service as catalog_service
+from config.database import get_db
+from models.medecin import Medecin
+from services.catalog_service import CatalogService, VERSIONS_COLLECTION, MEDECINS
+
+def _fresh():
+    reset_database()
+    CatalogService._entries.clear()
+    CatalogService._versions = {}
+    CatalogService._versions_checked_at = float('-inf')
+
+def test_etag_and_not_modified():
+    _fresh()
+    client = get_app().test_client()
+    
+    response = client.get('/api/public/info')
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert 'public' in response.headers['Cache-Control']
+    
+    # Revalidation avec l'ETag fort, ou faible (réponse compressée)
+    for value in (etag, f'W/{etag}'):
+        response = client.get('/api/public/info', headers={'If-None-Match': value})
+        assert response.status_code == 304
+        assert response.get_data() == b''
+    
+    assert client.get('/api/public/info', headers={'If-None-Match': '"autre"'}).status_code == 200
+
+def test_loader_called_once():
+    _fresh()
+    loader = mock.Mock(return_value={'valeur': 1})
+    first = CatalogService.get('essai', None, loader)
+    second = CatalogService.get('essai', None, loader)
+    assert first == second
+    assert loader.call_count == 1
+
+def test_local_invalidation_on_medecin_change():
+    _fresh()
+    client = get_app().test_client()
+    etag = client.get('/api/public/medecins').headers['ETag']
+    
+    user = create_user('cardio@test.com', role='medecin')
+    Medecin(user_id=str(user._id), specialite='Cardiologie', numero_ordre='42').save()
+    
+    response = client.get('/api/public/medecins', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [m['numero_ordre'] for m in response.get_json()['medecins']] == ['42']
+    assert response.headers['ETag'] != etag
+
+def test_invalidation_from_other_worker():
+    _fresh()
+    loader = mock.Mock(side_effect=[{'valeur': 1}, {'valeur': 2}])
+    assert CatalogService.get(MEDECINS, 'x', loader)[0] == b'{"valeur":1}'
+    
+    # Autre worker: version incrémentée en base, relue après l'intervalle de contrôle
+    get_db()[VERSIONS_COLLECTION].update_one({'_id': MEDECINS}, {'$inc': {'version': 1}}, upsert=True)
+    assert CatalogService.get(MEDECINS, 'x', loader)[0] == b'{"valeur":1}'
+    CatalogService._versions_checked_at = float('-inf')
+    assert CatalogService.get(MEDECINS, 'x', loader)[0] == b'{"valeur":2}'
+
+def test_variants_bounded():
+    _fresh()
+    client = get_app().test_client()
+    with mock.patch.object(catalog_service, 'CATALOG_MAX_ENTRIES', 3):
+        for index in range(10):
+            client.get(f'/api/public/medecins?specialite=inconnue{index}')
+    assert len(CatalogService._entries) == 3
+    assert (MEDECINS, 'inconnue9') in CatalogService._entries
+
+if __name__ == '__main__':
+    run_tests(globals())
@@ -0,0 +1,114 @@
+"""
+Compression des réponses: négociation Accept-Encoding, seuils et réponses diffusées
+"""
+
+import gzip
+import json
+from unittest import mock
+
+from flask import Flask, Response
+
+from tests.support import run_tests
+
+import middleware.compression as compression
+from middleware.compression import init_compression, COMPRESS_MIN_SIZE
+from middleware.json_response import stream_json
+
+LARGE = {'items': ['x' * 20] * 100}
+
+def _app():
+    app = Flask(__name__)
+    
+    @app.route('/grand')
+    def grand():
+        return LARGE
+    
+    @app.route('/petit')
+    def petit():
+        return {'ok': True}
+    
+    @app.route('/image')
+    def image():
+        return Response(b'\x89PNG' + b'0' * 2000, mimetype='image/png')
+    
+    @app.route('/public')
+    def public():
+        response = Response(json.dumps(LARGE), mimetype='application/json')
+        response.set_etag('v1')
+        response.headers['Cache-Control'] = 'public, max-age=60'
+        return response
+    
+    @app.route('/diffuse')
+    def diffuse():
+        return stream_json('items', ({'index': index} for index in range(500)))
+    
+    init_compression(app)
+    return app.test_client()
+
+def _get(client, path, accept):
+    return client.get(path, headers={'Accept-Encoding': accept} if accept is not None else {})
+
+def test_gzip_negotiated():
+    response = _get(_app(), '/grand', 'gzip, deflate')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.get_data())) == LARGE
+
+def test_no_compression_without_accept():
+    for accept in (None, 'identity', 'gzip;q=0', 'deflate'):
+        response = _get(_app(), '/grand', accept)
+        assert 'Content-Encoding' not in response.headers, accept
+        assert response.get_json() == LARGE
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+def test_wildcard_and_quality():
+    assert _get(_app(), '/grand', '*').headers['Content-Encoding'] == 'gzip'
+    assert _get(_app(), '/grand', 'br;q=0, gzip;q=0.5').headers['Content-Encoding'] == 'gzip'
+
+def test_brotli_preferred_when_installed():
+    class FakeBrotli:
+        @staticmethod
+        def compress(data, quality):
+            return b'br:' + data
+    
+    with mock.patch.object(compression, 'brotli', FakeBrotli):
+        response = _get(_app(), '/grand', 'gzip, br')
+        assert response.headers['Content-Encoding'] == 'br'
+        # Réponse diffusée: gzip (compressé au fil de l'eau)
+        assert _get(_app(), '/diffuse', 'gzip, br').headers['Content-Encoding'] == 'gzip'
+    
+    # brotli absent: gzip
+    with mock.patch.object(compression, 'brotli', None):
+        assert _get(_app(), '/grand', 'br, gzip').headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Encoding' not in _get(_app(), '/grand', 'br').headers
+
+def test_thresholds_and_types():
+    small = _get(_app(), '/petit', 'gzip')
+    assert len(small.get_data()) < COMPRESS_MIN_SIZE
+    assert 'Content-Encoding' not in small.headers
+    
+    image = _get(_app(), '/image', 'gzip')
+    assert 'Content-Encoding' not in image.headers
+    assert image.get_data().startswith(b'\x89PNG')
+    
+    head = _app().head('/grand', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in head.headers
+
+def test_streamed_response_compressed():
+    response = _get(_app(), '/diffuse', 'gzip')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    data = json.loads(gzip.decompress(response.get_data()))
+    assert len(data['items']) == 500
+
+def test_public_etag_cached_and_weakened():
+    compression._cache.clear()
+    client = _app()
+    first = _get(client, '/public', 'gzip')
+    second = _get(client, '/public', 'gzip')
+    assert first.headers['ETag'] == 'W/"v1"'
+    assert first.get_data() == second.get_data()
+    assert len(compression._cache) == 1
+
+if __name__ == '__main__':
+    run_tests(globals())
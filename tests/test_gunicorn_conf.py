@@ -0,0 +1,38 @@
+"""
+Hooks gunicorn: client MongoDB fermé autour des forks sans importer l'application
+"""
+
+import os
+import runpy
+import subprocess
+import sys
+from unittest import mock
+
+from tests.support import BACKEND_DIR, run_tests
+
+import config.database as database
+
+CONF_PATH = os.path.join(BACKEND_DIR, 'gunicorn.conf.py')
+
+def test_hooks_close_loaded_client():
+    hooks = runpy.run_path(CONF_PATH)
+    with mock.patch.object(database, 'close_client') as close_client:
+        hooks['pre_fork'](None, None)
+        hooks['worker_exit'](None, None)
+    assert close_client.call_count == 2
+
+def test_hooks_without_application():
+    # Maître sans preload: aucun module de l'application chargé par les hooks
+    code = (
+        "import runpy, sys\n"
+        f"hooks = runpy.run_path({CONF_PATH!r})\n"
+        "hooks['pre_fork'](None, None)\n"
+        "hooks['worker_exit'](None, None)\n"
+        "loaded = [name for name in ('config.database', 'services.metrics_service', 'pymongo') if name in sys.modules]\n"
+        "sys.exit(1 if loaded else 0)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True)
+    assert result.returncode == 0, result.stderr.decode()
+
+if __name__ == '__main__':
+    run_tests(globals())
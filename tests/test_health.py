@@ -0,0 +1,48 @@
+"""
+Sondes liveness/readiness: seuils, cache et détail des erreurs
+"""
+
+from unittest import mock
+
+from tests.support import get_app, run_tests
+
+from pymongo.errors import ServerSelectionTimeoutError
+from services.health_service import HealthService
+
+def _fresh():
+    HealthService._cached = None
+    HealthService._cached_at = 0.0
+
+def test_liveness():
+    response = get_app().test_client().get('/api/health/live')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ok'
+
+def test_readiness_ok():
+    _fresh()
+    response = get_app().test_client().get('/api/health/ready')
+    assert response.status_code == 200
+    assert response.get_json()['checks']['mongodb']['ok'] is True
+
+def test_readiness_hides_driver_details():
+    _fresh()
+    error = ServerSelectionTimeoutError("db-0.interne:27017: timed out, replicaset rs-prod")
+    with mock.patch('config.database.get_client', side_effect=error):
+        response = get_app().test_client().get('/api/health/ready')
+    
+    assert response.status_code == 503
+    mongodb = response.get_json()['checks']['mongodb']
+    assert mongodb == {'ok': False, 'error': 'ServerSelectionTimeoutError'}
+    assert 'interne' not in response.get_data(as_text=True)
+    _fresh()
+
+def test_readiness_cached():
+    _fresh()
+    with mock.patch.object(HealthService, '_check_mongo', wraps=HealthService._check_mongo) as check:
+        HealthService.readiness()
+        HealthService.readiness()
+    assert check.call_count == 1
+    _fresh()
+
+if __name__ == '__main__':
+    run_tests(globals())
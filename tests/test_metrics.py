@@ -0,0 +1,64 @@
+"""
+Métriques Prometheus: rendu, agrégation multi-processus et coût par requête
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+
+from tests.support import get_app, run_tests
+
+import config.database as database
+from services.metrics_service import MetricsService, COUNTER, GAUGE, HISTOGRAM
+
+def _service(directory=None):
+    service = MetricsService(directory)
+    service.register('t_total', COUNTER, 'Compteur')
+    service.register('t_gauge', GAUGE, 'Jauge')
+    service.register('t_seconds', HISTOGRAM, 'Durées', buckets=(0.1, 1.0))
+    return service
+
+def test_render_histogram():
+    service = _service()
+    service.inc('t_total', {'status': '200'})
+    service.inc('t_total', {'status': '200'})
+    for value in (0.05, 0.5, 2.0):
+        service.observe('t_seconds', value)
+    
+    text = service.render()
+    assert 't_total{status="200"} 2' in text
+    # Buckets cumulatifs
+    assert 't_seconds_bucket{le="0.1"} 1' in text
+    assert 't_seconds_bucket{le="1.0"} 2' in text
+    assert 't_seconds_bucket{le="+Inf"} 3' in text
+    assert 't_seconds_count 3' in text
+
+def test_multiprocess_aggregation():
+    with tempfile.TemporaryDirectory() as directory:
+        service = _service(directory)
+        service.inc('t_total', value=3)
+        service.set('t_gauge', 7)
+        
+        # Worker arrêté: son compteur reste dans le total, sa jauge disparaît
+        dead_pid = 2 ** 22 + 12345
+        with open(os.path.join(directory, f"metrics_{dead_pid}.json"), 'w') as f:
+            json.dump([['t_total', [], 4], ['t_gauge', [], 9]], f)
+        
+        merged = service.collect()
+        assert merged[('t_total', ())] == 7
+        gauges = {labels: value for (name, labels), value in merged.items() if name == 't_gauge'}
+        assert gauges == {(('pid', str(os.getpid())),): 7}
+
+def test_request_does_not_probe_compressors():
+    # Compresseurs déterminés au chargement: aucun import retenté par requête
+    with mock.patch.object(database, '_available_compressors', side_effect=AssertionError("appel par requête")):
+        response = get_app().test_client().get('/api/public/info')
+        assert response.status_code == 200
+        assert database.get_pool_stats()['compressors'] == database.AVAILABLE_COMPRESSORS
+    
+    text = get_app().test_client().get('/metrics').get_data(as_text=True)
+    assert 'clinique_http_requests_total' in text
+
+if __name__ == '__main__':
+    run_tests(globals())
@@ -0,0 +1,71 @@
+"""
+Migrations versionnées: reprise, idempotence et indépendance vis-à-vis des modèles
+"""
+
+from datetime import datetime
+from unittest import mock
+
+from tests.support import run_tests
+
+from bson import ObjectId
+from config.database import get_client, get_db, MONGODB_DB_NAME
+from config.migrations import migrate, latest_version, MIGRATIONS, SCHEMA_COLLECTION, SCHEMA_DOC_ID, SPECIALITES_V6
+
+MEDECIN_ID = ObjectId()
+PATIENT_IDS = [ObjectId(), ObjectId()]
+
+def _legacy_database():
+    """
+    Base antérieure aux migrations: dates ISO et identifiants texte
+    """
+    get_client().drop_database(MONGODB_DB_NAME)
+    db = get_db()
+    db.rendezvous.insert_many([
+        {
+            'patient_id': str(patient_id),
+            'medecin_id': str(MEDECIN_ID),
+            'date_rdv': '2026-01-05T09:30:00',
+            'statut': 'en_attente',
+            'created_at': '2026-01-01T08:00:00'
+        }
+        for patient_id in PATIENT_IDS
+    ])
+    user_id = db.users.insert_one({'email': 'medecin@test.com', 'role': 'medecin', 'is_active': True}).inserted_id
+    db.medecins.insert_one({'user_id': user_id, 'specialite': 'Cardiologie'})
+    return db
+
+def test_migrations_idempotent():
+    db = _legacy_database()
+    
+    assert migrate(db) == [version for version, _, _ in MIGRATIONS]
+    assert migrate(db) == []
+    
+    # Reprise après une interruption: migrations 5 et suivantes rejouées sans effet
+    db[SCHEMA_COLLECTION].update_one({'_id': SCHEMA_DOC_ID}, {'$set': {'version': 4}})
+    assert migrate(db) == list(range(5, latest_version() + 1))
+    
+    rdv = db.rendezvous.find_one()
+    assert rdv['date_rdv'] == datetime(2026, 1, 5, 9, 30)
+    assert isinstance(rdv['patient_id'], ObjectId)
+    assert db.rendezvous.count_documents({}) == 2
+    assert db.specialites.count_documents({}) == len(SPECIALITES_V6)
+
+def test_target_version():
+    db = _legacy_database()
+    assert migrate(db, target=2) == [1, 2]
+    assert migrate(db) == list(range(3, latest_version() + 1))
+
+def test_migrations_do_not_use_models():
+    # Migrations figées: une évolution des modèles ne change pas leur résultat
+    db = _legacy_database()
+    with mock.patch('models.medecin_patient.MedecinPatient.rebuild', side_effect=AssertionError("modèle utilisé")), \
+            mock.patch('models.specialite.Specialite.recount', side_effect=AssertionError("modèle utilisé")):
+        migrate(db)
+    
+    # Relations reconstruites (avant la conversion des identifiants, migration 4)
+    assert db.medecin_patients.count_documents({}) == 2
+    assert db.medecin_stats.find_one()['nb_patients'] == 2
+    assert db.specialites.find_one({'nom': 'Cardiologie'})['nb_medecins'] == 1
+
+if __name__ == '__main__':
+    run_tests(globals())
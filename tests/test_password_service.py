@@ -0,0 +1,78 @@
+"""
+Hachage bcrypt: refus (503) quand la file d'attente est pleine et mise à niveau du coût
+"""
+
+import threading
+from unittest import mock
+
+from tests.support import create_user, get_app, login, reset_database, run_tests
+
+import services.password_service as password_service
+from config.database import get_db
+from models.patient import Patient
+from models.user import User
+
+def _saturated():
+    # Aucune place libre: toute opération bcrypt est refusée
+    return mock.patch.object(password_service, '_slots', threading.Semaphore(0))
+
+def _cost(email):
+    return int(User.find_by_email(email).password_hash.decode().split('$')[2])
+
+def test_login_busy():
+    reset_database()
+    create_user('occupe@test.com')
+    client = get_app().test_client()
+    
+    with _saturated():
+        response = login(client, 'occupe@test.com')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_account_creation_busy():
+    reset_database()
+    create_user('admin@test.com', role='admin')
+    secretaire = create_user('secretaire@test.com', role='secretaire')
+    patient = Patient(nom='Test', prenom='Test', email='patient@test.com')
+    patient.save()
+    
+    admin_client = get_app().test_client()
+    assert login(admin_client, 'admin@test.com').status_code == 200
+    secretaire_client = get_app().test_client()
+    assert login(secretaire_client, 'secretaire@test.com').status_code == 200
+    
+    with _saturated():
+        responses = [
+            admin_client.post('/api/admin/users', json={'email': 'nouveau@test.com', 'role': 'secretaire'}),
+            admin_client.post(f'/api/admin/users/{secretaire._id}/reset-password'),
+            secretaire_client.post(f'/api/secretaire/patients/{patient._id}/compte')
+        ]
+    for response in responses:
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    assert User.find_by_email('nouveau@test.com') is None
+
+def test_rehash_on_login():
+    reset_database()
+    create_user('cout@test.com')
+    client = get_app().test_client()
+    cost = _cost('cout@test.com')
+    
+    with mock.patch.object(password_service, 'BCRYPT_ROUNDS', cost + 1):
+        assert login(client, 'cout@test.com').status_code == 200
+    assert _cost('cout@test.com') == cost + 1
+    assert login(client, 'cout@test.com').status_code == 200
+
+def test_rehash_skipped_when_busy():
+    reset_database()
+    user = create_user('report@test.com')
+    previous_hash = get_db().users.find_one({'_id': user._id})['password_hash']
+    
+    # Vérification acceptée, nouveau hachage refusé: connexion réussie, hachage inchangé
+    with mock.patch.object(password_service, 'BCRYPT_ROUNDS', 5), \
+         mock.patch.object(password_service.PasswordService, 'hash', side_effect=password_service.PasswordServiceBusy()):
+        assert login(get_app().test_client(), 'report@test.com').status_code == 200
+    assert get_db().users.find_one({'_id': user._id})['password_hash'] == previous_hash
+
+if __name__ == '__main__':
+    run_tests(globals())
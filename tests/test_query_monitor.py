@@ -0,0 +1,45 @@
+"""
+Instrumentation MongoDB par requête: formes répétées (N+1) et octets reçus
+"""
+
+from tests.support import get_app, run_tests
+
+from bson import encode
+from config.database import QueryCollector
+
+REPLY = {'ok': 1, 'cursor': {'firstBatch': [{'nom': 'x' * 100}]}}
+
+def _run(collector, count, filter_value):
+    for request_id in range(count):
+        collector.started(request_id, 'users', 'find', {'find': 'users', 'filter': {'_id': filter_value(request_id)}})
+        collector.finished(request_id, 1500, REPLY)
+
+def test_repeated_shapes():
+    collector = QueryCollector()
+    # Valeurs différentes, même forme de filtre: motif N+1
+    _run(collector, 6, lambda index: index)
+    
+    assert collector.commands == 6
+    assert abs(collector.duration - 0.009) < 1e-9
+    [(shape, count)] = collector.repeated(5)
+    assert shape[:2] == ('users', 'find') and count == 6
+    assert collector.repeated(6) == []
+
+def test_bytes_counted_on_demand():
+    # Par défaut: aucune réponse réencodée
+    collector = QueryCollector()
+    _run(collector, 2, lambda index: index)
+    assert collector.bytes is None
+    
+    collector = QueryCollector(count_bytes=True)
+    _run(collector, 2, lambda index: index)
+    assert collector.bytes == 2 * len(encode(REPLY))
+
+def test_server_timing_header():
+    response = get_app().test_client().get('/api/public/specialites')
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=') and 'app;dur=' in timing
+    assert 'db-bytes' not in timing
+
+if __name__ == '__main__':
+    run_tests(globals())
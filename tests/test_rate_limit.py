@@ -0,0 +1,104 @@
+"""
+Limitation des tentatives de connexion: blocage, remise à zéro et délai Retry-After
+"""
+
+import time
+from unittest import mock
+
+from tests.support import create_user, get_app, login, reset_database, run_tests, PASSWORD
+
+import services.rate_limit_service as rate_limit_service
+from services.rate_limit_service import SlidingWindowLimiter, LOGIN_RATE_LIMIT_EMAIL
+
+LIMIT = 5
+WINDOW = 300
+
+def _after(limiter, now, index, current, previous, delay):
+    """
+    Estimation de la tentative suivante, faite delay secondes plus tard
+    """
+    later = now + delay
+    later_index = int(later // limiter.window)
+    if later_index == index:
+        counts = (current + 1, previous)
+    elif later_index == index + 1:
+        counts = (1, current)
+    else:
+        counts = (1, 0)
+    return limiter._estimate(later, later_index, *counts)
+
+def test_login_lockout():
+    reset_database()
+    create_user('blocage@test.com')
+    client = get_app().test_client()
+    
+    for _ in range(LOGIN_RATE_LIMIT_EMAIL):
+        response = login(client, 'blocage@test.com', password='mauvais')
+        assert response.status_code == 401
+    
+    # Bloqué, même avec le bon mot de passe
+    response = login(client, 'blocage@test.com', password=PASSWORD)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+def test_login_success_resets_counter():
+    reset_database()
+    create_user('remise@test.com')
+    client = get_app().test_client()
+    
+    for _ in range(LOGIN_RATE_LIMIT_EMAIL - 1):
+        login(client, 'remise@test.com', password='mauvais')
+    assert login(client, 'remise@test.com').status_code == 200
+    
+    # Compteur remis à zéro par la connexion réussie
+    assert login(client, 'remise@test.com', password='mauvais').status_code == 401
+
+def test_retry_after_current_window_full():
+    limiter = SlidingWindowLimiter('essai', LIMIT, WINDOW)
+    # 6 tentatives dès le début de la fenêtre 0: fin de fenêtre (300 s), puis
+    # décroissance de 6 à 4 tentatives pondérées (1/3 de fenêtre, 100 s)
+    assert limiter._retry_after(0, 0, 6, 0) == 400
+    assert _after(limiter, 0, 0, 6, 0, 400) <= LIMIT
+    assert _after(limiter, 0, 0, 6, 0, 399) > LIMIT
+
+def test_retry_after_previous_window_decay():
+    limiter = SlidingWindowLimiter('essai', LIMIT, WINDOW)
+    now = 10 * WINDOW + 30
+    # 6 * 0,9 + 2 = 7,4 > 5: attendre que 6 * (1 - e) + 2 <= 4, soit e = 2/3 (200 s)
+    assert limiter._estimate(now, 10, 2, 6) > LIMIT
+    assert limiter._retry_after(now, 10, 2, 6) == 170
+
+def test_retry_after_is_minimal():
+    limiter = SlidingWindowLimiter('essai', LIMIT, WINDOW)
+    for index in (0, 7):
+        for elapsed in (0, 0.1, 0.5, 0.9, 0.999):
+            now = (index + elapsed) * WINDOW
+            for current in range(1, 12):
+                for previous in range(0, 12):
+                    if limiter._estimate(now, index, current, previous) <= LIMIT:
+                        continue
+                    retry_after = limiter._retry_after(now, index, current, previous)
+                    # Tentative suivante autorisée après le délai, refusée une seconde plus tôt
+                    assert _after(limiter, now, index, current, previous, retry_after) <= LIMIT
+                    if retry_after > 1:
+                        assert _after(limiter, now, index, current, previous, retry_after - 1) > LIMIT
+
+def test_hit_blocks_until_retry_after():
+    reset_database()
+    limiter = SlidingWindowLimiter('essai', LIMIT, WINDOW)
+    # Horloge au début d'une fenêtre à venir (documents non expirés par l'index TTL)
+    clock = mock.Mock(return_value=(int(time.time() // WINDOW) + 1) * WINDOW + 10)
+    
+    with mock.patch.object(rate_limit_service.time, 'time', clock):
+        for _ in range(LIMIT):
+            assert limiter.hit('cle') is None
+        retry_after = limiter.hit('cle')
+        assert retry_after > 0
+        assert limiter.blocked('cle') == retry_after
+        
+        clock.return_value += retry_after
+        assert limiter.blocked('cle') is None
+        assert limiter.hit('cle') is None
+
+if __name__ == '__main__':
+    run_tests(globals())
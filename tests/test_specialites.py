@@ -0,0 +1,65 @@
+"""
+Catalogue des spécialités: nombre de médecins actifs, ordre alphabétique et index
+"""
+
+from unittest import mock
+
+from tests.support import create_user, reset_database, run_tests
+
+from config.database import get_db
+from models.medecin import Medecin
+from models.specialite import Specialite
+
+def _count(nom):
+    return {specialite['nom']: specialite['nb_medecins'] for specialite in Specialite.find_all()}.get(nom)
+
+def _create_medecin(email, specialite):
+    user = create_user(email, role='medecin')
+    medecin = Medecin(user_id=str(user._id), specialite=specialite, numero_ordre='1')
+    medecin.save()
+    return user, medecin
+
+def test_recount_on_create_deactivate_and_change():
+    reset_database()
+    user, medecin = _create_medecin('cardio@test.com', 'Cardiologie')
+    assert _count('Cardiologie') == 1
+    
+    # Changement de spécialité
+    medecin.specialite = 'Dermatologie'
+    medecin.update()
+    assert _count('Cardiologie') == 0
+    assert _count('Dermatologie') == 1
+    
+    # Compte désactivé: plus compté
+    user.is_active = False
+    user.update()
+    assert _count('Dermatologie') == 0
+
+def test_no_recount_on_unrelated_changes():
+    reset_database()
+    user, medecin = _create_medecin('neuro@test.com', 'Neurologie')
+    
+    with mock.patch.object(Specialite, 'recount') as recount:
+        medecin.signature_data = 'aGVsbG8='
+        medecin.signature_type = 'image/png'
+        medecin.update()
+        user.telephone = '0600000000'
+        user.update()
+    assert recount.call_count == 0
+
+def test_french_ordering():
+    reset_database()
+    for nom in ('Psychiatrie', 'Pédiatrie', 'pneumologie', 'Ophtalmologie'):
+        Specialite.create(nom)
+    noms = [specialite['nom'] for specialite in Specialite.find_all()]
+    subset = [nom for nom in noms if nom in ('Psychiatrie', 'Pédiatrie', 'pneumologie', 'Ophtalmologie')]
+    assert subset == ['Ophtalmologie', 'Pédiatrie', 'pneumologie', 'Psychiatrie']
+
+def test_medecins_indexes():
+    reset_database()
+    indexes = get_db().medecins.index_information()
+    assert 'specialite_1' in indexes
+    assert 'user_id_1' in indexes
+
+if __name__ == '__main__':
+    run_tests(globals())
@@ -0,0 +1,95 @@
+"""
+Réponses JSON diffusées (stream_json) et listes de rendez-vous chargées par lots
+"""
+
+from flask import Flask
+
+from tests.support import get_app, reset_database, run_tests
+
+from benchmarks.generator import generate, BENCH_PASSWORD
+from benchmarks.harness import BenchClient, BenchResults
+from middleware.json_response import stream_json, JSON_STREAM_BATCH_SIZE
+
+def _stream_app():
+    app = Flask(__name__)
+    # Erreurs provoquées par les tests: pas de trace dans la sortie
+    app.logger.disabled = True
+    
+    def failing(after):
+        for index in range(after):
+            yield {'index': index}
+        raise RuntimeError("curseur interrompu")
+    
+    @app.route('/complet')
+    def complet():
+        items = ({'index': index} for index in range(JSON_STREAM_BATCH_SIZE * 2 + 1))
+        return stream_json('items', items, meta={'page': 1}, count_key='total')
+    
+    @app.route('/vide')
+    def vide():
+        return stream_json('items', iter(()), meta={'page': 1})
+    
+    @app.route('/erreur-initiale')
+    def erreur_initiale():
+        return stream_json('items', failing(0))
+    
+    @app.route('/erreur-diffusion')
+    def erreur_diffusion():
+        return stream_json('items', failing(JSON_STREAM_BATCH_SIZE))
+    
+    return app
+
+def test_stream_json_complete():
+    response = _stream_app().test_client().get('/complet')
+    data = response.get_json()
+    assert response.status_code == 200
+    assert len(data['items']) == JSON_STREAM_BATCH_SIZE * 2 + 1
+    assert data['total'] == JSON_STREAM_BATCH_SIZE * 2 + 1
+    assert data['page'] == 1
+
+def test_stream_json_empty():
+    assert _stream_app().test_client().get('/vide').get_json() == {'items': [], 'page': 1}
+
+def test_stream_json_initial_error():
+    # Erreur avant le premier lot: réponse 500, aucun en-tête 200 envoyé
+    response = _stream_app().test_client().get('/erreur-initiale')
+    assert response.status_code == 500
+
+def test_stream_json_error_after_headers():
+    # En-têtes déjà envoyés: la diffusion est interrompue, pas de JSON tronqué valide
+    try:
+        _stream_app().test_client().get('/erreur-diffusion').get_data()
+    except RuntimeError:
+        return
+    raise AssertionError("réponse diffusée terminée malgré l'erreur")
+
+def _queries(dataset, role, url):
+    """
+    Réponse et nombre de requêtes MongoDB d'un appel (corps lu compris)
+    """
+    results = BenchResults()
+    client = BenchClient(get_app(), results)
+    client.post('/api/auth/login', 'login', json={'email': dataset[role][0]['email'], 'password': BENCH_PASSWORD})
+    response = client.get(url, 'liste')
+    return response, results.endpoints['liste'].queries
+
+def test_rendezvous_listings_batched():
+    reset_database()
+    dataset = generate(150)
+    
+    response, queries = _queries(dataset, 'secretaires', '/api/secretaire/rendezvous')
+    rdvs = response.get_json()['rendezvous']
+    assert len(rdvs) == 100
+    assert all(rdv['patient'] and rdv['medecin'] for rdv in rdvs)
+    # Session, compte, rendez-vous, patients et médecins: pas une requête par ligne
+    assert queries <= 8, queries
+    
+    response, queries = _queries(dataset, 'medecins', '/api/medecin/rendezvous')
+    rdvs = response.get_json()['rendezvous']
+    assert len(rdvs) > JSON_STREAM_BATCH_SIZE
+    assert all('patient' in rdv for rdv in rdvs)
+    # Une requête de patients par lot de JSON_STREAM_BATCH_SIZE rendez-vous
+    assert queries <= 6 + len(rdvs) // JSON_STREAM_BATCH_SIZE, queries
+
+if __name__ == '__main__':
+    run_tests(globals())
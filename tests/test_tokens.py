@@ -0,0 +1,69 @@
+"""
+Jetons signés: renouvellement, révocation et jetons mal formés
+"""
+
+from tests.support import create_user, get_app, login, reset_database, run_tests
+
+from models.user import User
+from services.token_service import TokenService, TYPE_ACCESS
+
+def test_refresh_token():
+    reset_database()
+    create_user('jeton@test.com')
+    client = get_app().test_client()
+    
+    response = login(client, 'jeton@test.com', mode='token')
+    assert response.status_code == 200
+    tokens = response.get_json()
+    
+    response = client.post('/api/auth/refresh', json={'refresh_token': tokens['refresh_token']})
+    assert response.status_code == 200
+    assert response.get_json()['access_token']
+    
+    # Jeton d'accès présenté comme jeton de rafraîchissement
+    response = client.post('/api/auth/refresh', json={'refresh_token': tokens['access_token']})
+    assert response.status_code == 401
+    
+    response = client.post('/api/auth/refresh', json={'refresh_token': 'invalide'})
+    assert response.status_code == 401
+
+def test_revoke_tokens():
+    reset_database()
+    user = create_user('revocation@test.com')
+    client = get_app().test_client()
+    
+    refresh_token = login(client, 'revocation@test.com', mode='token').get_json()['refresh_token']
+    
+    # Copie chargée avant la révocation: sa mise à jour ne doit pas l'annuler
+    stale = User.find_by_id(str(user._id))
+    User.find_by_id(str(user._id)).revoke_tokens()
+    stale.telephone = '0600000000'
+    stale.update()
+    
+    assert User.find_by_id(str(user._id)).auth_version == 1
+    response = client.post('/api/auth/refresh', json={'refresh_token': refresh_token})
+    assert response.status_code == 401
+
+def test_access_token_authenticates():
+    reset_database()
+    create_user('acces@test.com')
+    client = get_app().test_client()
+    
+    access_token = login(client, 'acces@test.com', mode='token').get_json()['access_token']
+    response = get_app().test_client().get('/api/auth/me', headers={'Authorization': f'Bearer {access_token}'})
+    assert response.status_code == 200
+    assert response.get_json()['user']['email'] == 'acces@test.com'
+
+def test_malformed_tokens_rejected():
+    client = get_app().test_client()
+    payload = TokenService.encode({'sub': 'x', 'role': 'admin', 'typ': TYPE_ACCESS}, 60).split('.')[0]
+    
+    for token in ('é.é', 'sans-point', '..', f'{payload}.signature', 'W10.W10'):
+        assert TokenService.decode(token) is None
+        response = client.get('/api/auth/me', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 401, token
+    
+    assert TokenService.decode(None) is None
+
+if __name__ == '__main__':
+    run_tests(globals())